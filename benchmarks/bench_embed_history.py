@@ -0,0 +1,83 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Compares the per-edit cost of `copy.deepcopy` with `EmbedHistory.push`
+on a 25 field embed close to the 6000 character limit.
+
+Run with `python -m benchmarks.bench_embed_history`
+"""
+
+import copy
+import timeit
+import tracemalloc
+
+import discord
+
+from exts.util.embed_history import EmbedHistory
+
+ROUNDS = 2000
+
+
+def make_embed() -> discord.Embed:
+    embed = discord.Embed(
+        title="T" * 256,
+        description="D" * 1500,
+        color=0x755AE0,
+        url="http://example.com",
+    )
+    embed.set_author(name="A" * 100, icon_url="http://example.com/a.png")
+    embed.set_footer(text="F" * 100, icon_url="http://example.com/f.png")
+    embed.set_image(url="http://example.com/i.png")
+
+    for i in range(25):
+        embed.add_field(name=f"Field {i:02}" + "n" * 20, value="v" * 133)
+
+    return embed
+
+
+def allocated(func) -> int:
+    tracemalloc.start()
+    func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    embed = make_embed()
+    print(f"embed: {len(embed)} characters, {len(embed.fields)} fields")
+
+    history = EmbedHistory(embed)
+    kept = []
+
+    def edit_deepcopy():
+        kept.append(copy.deepcopy(embed))
+
+    def edit_history():
+        history.push(embed)
+
+    for name, func in (("deepcopy", edit_deepcopy), ("history", edit_history)):
+        seconds = timeit.timeit(func, number=ROUNDS) / ROUNDS
+        kept.clear()
+        size = allocated(lambda: [func() for _ in range(25)]) / 25
+        print(f"{name:<9} {seconds * 1e6:8.1f} us/edit {size:10,.0f} B retained/edit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Imports 100k generated tags into a scratch database through `import_tags`.
+
+Run with `python -m benchmarks.bench_tag_import [count]`
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+
+import asqlite
+
+from exts.util.storage import SqliteTagStore
+from exts.util.tag_io import import_tags, iter_json_array
+
+
+def write_tags(fp, count: int) -> None:
+    fp.write("[")
+    for i in range(count):
+        fp.write("\n" if i == 0 else ",\n")
+        fp.write(
+            json.dumps(
+                {
+                    "name": f"tag-{i}",
+                    "content": f"Content of tag {i}. " * 20,
+                    "author": 767115163127906334,
+                    "created_at": 1700000000 + i,
+                }
+            )
+        )
+    fp.write("\n]\n")
+
+
+async def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        json_path = os.path.join(tmp, "tags.json")
+
+        with open(json_path, "w", encoding="utf-8") as fp:
+            write_tags(fp, count)
+
+        async with asqlite.create_pool(db_path) as pool:
+            async with pool.acquire() as c:
+                with open("./db/schema.sql") as f:
+                    await c.executescript(f.read())
+
+            store = SqliteTagStore(pool)
+
+            for conflict in ("skip", "rename"):
+                with open(json_path, encoding="utf-8") as fp:
+                    start = time.perf_counter()
+                    result = await import_tags(
+                        store, 1, 1, iter_json_array(fp), conflict=conflict
+                    )
+                    elapsed = time.perf_counter() - start
+
+                print(
+                    f"import {count} tags (conflict={conflict}): {elapsed:.2f}s "
+                    f"({count / elapsed:,.0f} tags/s) "
+                    f"inserted={result.inserted} skipped={result.skipped} invalid={result.invalid}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
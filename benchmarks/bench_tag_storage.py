@@ -0,0 +1,116 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Reports the database size before and after moving tag bodies to `tag_contents`.
+
+Builds a database in the old layout, where every row of `tags` holds its own
+body, migrates it with `migrate_tag_contents` and compares the vacuumed sizes.
+
+Run with `python -m benchmarks.bench_tag_storage [guilds] [tags_per_guild]`
+"""
+
+import os
+import sys
+import random
+import asyncio
+import tempfile
+
+import asqlite
+
+from exts.util.tag_content import migrate_tag_contents
+
+LEGACY_SCHEMA = """
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    name TEXT,
+    content TEXT,
+    guild INTEGER,
+    author INTEGER,
+    created_at INTEGER
+);
+"""
+
+
+def make_bodies(count: int) -> list:
+    words = ["rule", "server", "please", "respect", "members", "no", "spam", "faq"]
+    rng = random.Random(0)
+
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(40, 300)))[:2000]
+        for _ in range(count)
+    ]
+
+
+async def vacuumed_size(pool, path: str) -> int:
+    async with pool.acquire() as c:
+        await c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        await c.execute("VACUUM")
+        await c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(path)
+
+
+async def main(guilds: int, per_guild: int) -> None:
+    # most guilds copy from a small pool of common bodies, some write their own
+    shared = make_bodies(50)
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "storage.db")
+
+        async with asqlite.create_pool(path) as pool:
+            async with pool.acquire() as c:
+                await c.executescript(LEGACY_SCHEMA)
+                async with c.transaction():
+                    await c.executemany(
+                        "INSERT INTO tags (name, content, guild, author, created_at) VALUES ($1, $2, $3, $4, $5)",
+                        [
+                            (
+                                f"tag-{i}",
+                                rng.choice(shared)
+                                if rng.random() < 0.8
+                                else make_bodies(1)[0] + str(rng.random()),
+                                guild,
+                                1,
+                                0,
+                            )
+                            for guild in range(guilds)
+                            for i in range(per_guild)
+                        ],
+                    )
+
+            before = await vacuumed_size(pool, path)
+
+            async with pool.acquire() as c:
+                with open("./db/schema.sql") as f:
+                    await c.executescript(f.read())
+                migrated = await migrate_tag_contents(c)
+                blobs = (await c.fetchone("SELECT COUNT(*) FROM tag_contents"))[0]
+
+            after = await vacuumed_size(pool, path)
+
+    print(f"tags migrated:  {migrated} ({blobs} unique bodies)")
+    print(f"size before:    {before / 1024:,.0f} KiB")
+    print(f"size after:     {after / 1024:,.0f} KiB")
+    print(f"reduction:      {(1 - after / before) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args) if len(args) == 2 else main(200, 100))
@@ -0,0 +1,155 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Checks that a reply sent after the auto-defer budget keeps the visibility
+the handler asked for.
+
+Run with `python -m benchmarks.check_auto_defer`
+"""
+
+import sys
+import asyncio
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+import discord
+
+from exts.util.auto_defer import AutoDefer
+
+from .fakes import (
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeMessage,
+    FakeUser,
+    RecordingFollowup,
+    RecordingResponse,
+)
+
+BUDGET = 0.05  # seconds, short so the check runs quickly
+
+# (command marked as ephemeral, handler replies ephemerally)
+CASES = [(True, True), (True, False), (False, True), (False, False)]
+
+
+class DeferringResponse(RecordingResponse):
+    type: Optional[discord.InteractionResponseType] = None
+
+    async def defer(self, **kwargs) -> None:
+        await super().defer(**kwargs)
+        self.type = discord.InteractionResponseType.deferred_channel_message
+
+
+class Followup(RecordingFollowup):
+    # the response is swapped for one without a latency
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        self.calls.append(("followup", dict(kwargs, content=content)))
+        return FakeMessage(self._parent.channel)
+
+
+class DeferrableInteraction(FakeInteraction):
+    """
+    A :class:`FakeInteraction` whose response can be swapped like the real one.
+
+    Parameters
+    -----------
+    ephemeral: :class:`bool`
+        Whether its command is marked as replying ephemerally
+    """
+
+    def __init__(self, *, ephemeral: bool):
+        guild = FakeGuild()
+        super().__init__(
+            None, user=FakeUser("user"), guild=guild, channel=FakeChannel(guild)
+        )
+        self.response = DeferringResponse(self)
+        self.followup = Followup(self)
+        self.command = SimpleNamespace(extras={"ephemeral": ephemeral})
+        self.deleted = False
+
+    @property
+    def response(self) -> Any:
+        return self._cs_response
+
+    @response.setter
+    def response(self, value: Any) -> None:
+        self._cs_response = value
+
+    async def delete_original_response(self) -> None:
+        self.deleted = True
+
+
+async def run(marked: bool, reply_ephemeral: bool) -> Tuple[bool, bool, bool]:
+    """
+    Runs a handler that replies after the budget.
+
+    Returns
+    --------
+    Tuple[:class:`bool`, :class:`bool`, :class:`bool`]
+        Whether it was deferred ephemerally, whether the thinking message was
+        deleted and whether the reply was ephemeral
+    """
+    auto_defer = AutoDefer(BUDGET)
+    interaction = DeferrableInteraction(ephemeral=marked)
+    recorded = interaction.response
+
+    await auto_defer.on_interaction(interaction)
+    await asyncio.sleep(BUDGET * 2)
+    await interaction.response.send_message("reply", ephemeral=reply_ephemeral)
+
+    ((_, defer_kwargs),) = recorded.calls
+    ((_, reply_kwargs),) = interaction.followup.calls
+    return (
+        defer_kwargs.get("ephemeral", False),
+        interaction.deleted,
+        reply_kwargs.get("ephemeral", False),
+    )
+
+
+async def check() -> List[str]:
+    """The failures, empty when every case passed"""
+    failures = []
+
+    for marked, reply_ephemeral in CASES:
+        deferred, deleted, replied = await run(marked, reply_ephemeral)
+        case = f"marked={marked} ephemeral reply={reply_ephemeral}"
+
+        if deferred != marked:
+            failures.append(f"{case}: deferred with ephemeral={deferred}")
+        if replied != reply_ephemeral:
+            failures.append(f"{case}: replied with ephemeral={replied}")
+        # the thinking message only goes when its visibility is wrong
+        if deleted != (marked != reply_ephemeral):
+            failures.append(f"{case}: thinking message deleted={deleted}")
+
+    return failures
+
+
+def main() -> int:
+    failures = asyncio.run(check())
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(CASES)} cases checked, {len(failures)} failed")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Checks :func:`broadcast` against a fake HTTP layer: failed sends are reported
+per target, buckets and the concurrency cap are respected and progress ends
+with the total.
+
+Run with `python -m benchmarks.check_broadcast`
+"""
+
+import sys
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+import aiohttp
+import discord
+
+from exts.util.broadcast import broadcast
+
+from .fakes import FakeChannel, FakeGuild, FakeMessage
+
+CONCURRENCY = 3
+TARGETS = 8  # two per channel, so buckets are shared
+LATENCY = 0.01  # seconds every fake send takes
+
+# send number -> what the fake HTTP layer raises for it
+FAILURES = {
+    1: discord.HTTPException(
+        SimpleNamespace(status=403, reason="Forbidden"), "Missing Access"
+    ),
+    4: aiohttp.ClientConnectionError("Connection reset by peer"),
+    7: asyncio.TimeoutError(),
+}
+
+
+class FakeHTTP:
+    """Sends with a latency and fails some, tracking requests in flight"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # bucket -> requests in flight for it
+        self.buckets: Dict[int, int] = {}
+        self.max_per_bucket = 0
+
+    async def send(self, target: Tuple[int, FakeChannel]) -> FakeMessage:
+        number, channel = target
+
+        self.in_flight += 1
+        self.buckets[channel.id] = self.buckets.get(channel.id, 0) + 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.max_per_bucket = max(self.max_per_bucket, self.buckets[channel.id])
+        try:
+            await asyncio.sleep(LATENCY)
+            if number in FAILURES:
+                raise FAILURES[number]
+            return FakeMessage(channel)
+        finally:
+            self.in_flight -= 1
+            self.buckets[channel.id] -= 1
+
+
+async def check() -> List[str]:
+    """The failures, empty when every expectation held"""
+    failures = []
+
+    guild = FakeGuild()
+    channels = [FakeChannel(guild) for _ in range(TARGETS // 2)]
+    targets = [(number, channels[number % len(channels)]) for number in range(TARGETS)]
+
+    http = FakeHTTP()
+    progress: List[Tuple[int, int]] = []
+
+    async def on_progress(done: int, total: int) -> None:
+        progress.append((done, total))
+
+    results = await broadcast(
+        targets,
+        http.send,
+        bucket=lambda target: target[1].id,
+        concurrency=CONCURRENCY,
+        on_progress=on_progress,
+    )
+
+    if [result.target for result in results] != targets:
+        failures.append("results are not in the order of the targets")
+
+    for result in results:
+        number = result.target[0]
+        if result.ok == (number in FAILURES):
+            failures.append(f"send {number}: ok={result.ok}, error={result.error!r}")
+        elif not result.ok and not result.error:
+            failures.append(f"send {number}: failed without an error message")
+
+    if http.max_in_flight > CONCURRENCY:
+        failures.append(f"{http.max_in_flight} sends in flight, cap {CONCURRENCY}")
+    if http.max_per_bucket > 1:
+        failures.append(f"{http.max_per_bucket} sends in flight for one bucket")
+    if http.in_flight:
+        failures.append(f"{http.in_flight} sends still running after the broadcast")
+    if progress[-1:] != [(len(targets), len(targets))]:
+        failures.append(f"progress ended with {progress[-1:]}")
+
+    return failures
+
+
+def main() -> int:
+    failures = asyncio.run(check())
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"broadcast to {TARGETS} targets checked, {len(failures)} failed")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Checks the query plan of every registered query against the schema.
+
+Fails when a query doesn't compile, or when a hot query scans a table
+instead of searching an index.
+
+Run with `python -m benchmarks.check_queries [--database ./db/orbyt.db] [--hot]`
+"""
+
+import sys
+import sqlite3
+import argparse
+from typing import Iterable, List, Tuple
+
+from exts.util.queries import QUERIES, Query, hot_queries, param_count
+
+# plan steps that read a single row, not a table
+_HARMLESS_SCANS = ("SCAN CONSTANT ROW",)
+
+
+def query_plan(db: sqlite3.Connection, query: Query) -> List[str]:
+    """The `detail` column of `EXPLAIN QUERY PLAN`, one entry per step"""
+    params = (None,) * param_count(query.sql)
+    rows = db.execute(f"EXPLAIN QUERY PLAN {query.sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def check(
+    db: sqlite3.Connection, queries: Iterable[Query]
+) -> Tuple[List[str], List[str]]:
+    """
+    Parameters
+    -----------
+    db: :class:`sqlite3.Connection`
+        A database with the schema applied
+    queries: Iterable[:class:`Query`]
+        The queries to check
+
+    Returns
+    --------
+    Tuple[List[:class:`str`], List[:class:`str`]]
+        The report lines and the failures
+    """
+    report, failures = [], []
+
+    for query in queries:
+        try:
+            plan = query_plan(db, query)
+        except sqlite3.Error as exc:
+            failures.append(f"{query.name}: {exc}")
+            continue
+
+        scans = [
+            step
+            for step in plan
+            if step.startswith("SCAN") and not step.startswith(_HARMLESS_SCANS)
+        ]
+        if scans and query.hot:
+            failures.append(f"{query.name}: {'; '.join(scans)}")
+
+        label = "hot " if query.hot else "cold"
+        report.append(f"[{label}] {query.name}: {' | '.join(plan) or '(no plan)'}")
+
+    return report, failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--database",
+        help="check against this database instead of a fresh copy of db/schema.sql",
+    )
+    parser.add_argument(
+        "--hot", action="store_true", help="only check the user-facing queries"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.database or ":memory:")
+    if not args.database:
+        with open("./db/schema.sql") as f:
+            db.executescript(f.read())
+
+    queries = hot_queries() if args.hot else list(QUERIES.values())
+    report, failures = check(db, queries)
+    db.close()
+
+    if args.verbose:
+        print("\n".join(report))
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(queries)} queries checked, {len(failures)} failed")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
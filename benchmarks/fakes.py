@@ -0,0 +1,310 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Offline stand-ins for the Discord objects the cogs touch,
+so their callbacks can be driven without a gateway connection.
+"""
+
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from bot import Orbyt
+from exts.util.storage import SqliteTagStore
+
+_ids = itertools.count(1_000_000_000_000_000)
+
+Call = Tuple[str, Dict[str, Any]]
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+class FakeUser:
+    def __init__(self, name: str, *, bot: bool = False, user_id: Optional[int] = None):
+        self.id = user_id or next_id()
+        self.name = name
+        self.display_name = name
+        self.global_name = None
+        self.discriminator = "0"
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+        self.guild_permissions = discord.Permissions.all()
+        self.sent: List[Call] = []
+
+    def __str__(self) -> str:
+        return self.name
+
+    async def send(self, *args, **kwargs) -> "FakeMessage":
+        self.sent.append(("send", kwargs))
+        return FakeMessage(self)
+
+
+class FakeGuild:
+    def __init__(self, name: str = "Load Test", *, guild_id: Optional[int] = None):
+        self.id = guild_id or next_id()
+        self.name = name
+        self.filesize_limit = 25 * 1024 * 1024
+        self.members: List[FakeUser] = []
+
+
+class FakeChannel:
+    def __init__(self, guild: FakeGuild, name: str = "general"):
+        self.id = next_id()
+        self.name = name
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+        self.jump_url = f"https://discord.com/channels/{guild.id}/{self.id}"
+
+    def permissions_for(self, member: Any) -> discord.Permissions:
+        return discord.Permissions.all()
+
+    async def send(self, *args, **kwargs) -> "FakeMessage":
+        return FakeMessage(self)
+
+
+class FakeMessage:
+    def __init__(self, channel: Any):
+        self.id = next_id()
+        self.channel = channel
+        self.interaction = None
+        guild_id = getattr(getattr(channel, "guild", None), "id", "@me")
+        self.jump_url = (
+            f"https://discord.com/channels/{guild_id}/{channel.id}/{self.id}"
+        )
+
+    async def edit(self, **kwargs) -> "FakeMessage":
+        return self
+
+
+class RecordingResponse:
+    """
+    Records what a callback answered with, in place of
+    :class:`discord.InteractionResponse`.
+
+    Parameters
+    -----------
+    latency: :class:`float`
+        Seconds every call waits, standing in for the API round trip
+    """
+
+    def __init__(self, parent: "FakeInteraction", latency: float = 0.0):
+        self._parent = parent
+        self.latency = latency
+        self.calls: List[Call] = []
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _record(self, method: str, kwargs: Dict[str, Any]) -> None:
+        if self._done:
+            raise discord.InteractionResponded(self._parent)  # type: ignore
+
+        self._done = True
+        self.calls.append((method, kwargs))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        await self._record("send_message", dict(kwargs, content=content))
+
+    async def edit_message(self, **kwargs) -> None:
+        await self._record("edit_message", kwargs)
+
+    async def defer(self, **kwargs) -> None:
+        await self._record("defer", kwargs)
+
+    async def send_modal(self, modal: discord.ui.Modal) -> None:
+        await self._record("send_modal", {"modal": modal})
+
+
+class RecordingFollowup:
+    def __init__(self, parent: "FakeInteraction"):
+        self._parent = parent
+        self.calls: List[Call] = []
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        self.calls.append(("followup", dict(kwargs, content=content)))
+
+        if self._parent.response.latency:
+            await asyncio.sleep(self._parent.response.latency)
+        return FakeMessage(self._parent.channel)
+
+
+class FakeInteraction(discord.Interaction):
+    """
+    A :class:`discord.Interaction` that never touches the API.
+
+    It subclasses the real class so `isinstance` checks in the views pass,
+    the slots and properties it needs are shadowed by plain attributes.
+    """
+
+    # shadow the slot descriptors and properties of `discord.Interaction`
+    id = type = guild_id = channel = data = message = user = None
+    locale = guild_locale = discord.Locale.american_english
+    extras: Dict[Any, Any] = {}
+    command_failed = False
+    client = guild = response = followup = namespace = command = created_at = None
+
+    def __init__(
+        self,
+        client: commands.Bot,
+        *,
+        user: FakeUser,
+        guild: FakeGuild,
+        channel: FakeChannel,
+        message: Optional[FakeMessage] = None,
+        latency: float = 0.0,
+    ):
+        self.id = next_id()
+        self.type = discord.InteractionType.application_command
+        self.client = client
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.message = message or FakeMessage(channel)
+        self.extras = {}
+        self.created_at = discord.utils.utcnow()
+
+        self.response = RecordingResponse(self, latency)
+        self.followup = RecordingFollowup(self)
+        self.edits: List[Dict[str, Any]] = []
+
+    @property
+    def calls(self) -> List[Call]:
+        """Every response, followup and edit, in order"""
+        return (
+            self.response.calls
+            + self.followup.calls
+            + [("edit_original_response", kwargs) for kwargs in self.edits]
+        )
+
+    async def original_response(self) -> FakeMessage:
+        return self.message
+
+    async def edit_original_response(self, **kwargs) -> FakeMessage:
+        self.edits.append(kwargs)
+        return self.message
+
+
+class OfflineOrbyt(Orbyt):
+    """An :class:`Orbyt` that is never logged in, with a fixed gateway latency"""
+
+    latency = 0.042
+
+
+class MeasuredPool:
+    """
+    Wraps a pool to measure how long callers wait for a connection.
+
+    Parameters
+    -----------
+    pool
+        The :class:`asqlite.Pool` to wrap
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.waits: List[float] = []
+        self.locked = 0
+
+    def acquire(self) -> "_MeasuredAcquire":
+        return _MeasuredAcquire(self)
+
+    async def release(self, connection) -> None:
+        await self.pool.release(connection)
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+class _MeasuredAcquire:
+    def __init__(self, parent: MeasuredPool):
+        self.parent = parent
+        self.connection = None
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        self.connection = await self.parent.pool.acquire()
+        self.parent.waits.append(time.perf_counter() - start)
+        return self.connection
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and "locked" in str(exc):
+            self.parent.locked += 1
+        await self.parent.pool.release(self.connection)
+
+
+@asynccontextmanager
+async def offline_bot(
+    database: str,
+    extensions: Tuple[str, ...] = ("exts.tags", "exts.embed"),
+    storage: str = "sqlite",
+) -> AsyncIterator[OfflineOrbyt]:
+    """
+    An :class:`OfflineOrbyt` on `database` with `extensions` loaded,
+    its pool wrapped in a :class:`MeasuredPool`.
+    """
+    async with OfflineOrbyt(storage=storage) as bot:
+        # `close` signals the queue a gateway connection would have made
+        bot._AutoShardedClient__queue = asyncio.PriorityQueue()
+
+        await bot.setup_state(database)
+        bot.pool = MeasuredPool(bot.pool)
+        bot.view_states.pool = bot.pool
+        if isinstance(bot.tags, SqliteTagStore):
+            bot.tags.pool = bot.pool
+
+        for ext in extensions:
+            await bot.load_extension(ext)
+
+        yield bot
+
+
+async def seed_tags(
+    store, guild_id: int, count: int, *, author_id: int = 1
+) -> List[str]:
+    """Adds `count` tags to a guild of a :class:`TagStore` and returns their names"""
+    names = [f"tag-{i:06}" for i in range(count)]
+    now_timestamp = round(discord.utils.utcnow().timestamp())
+
+    await store.write_batch(
+        [
+            (
+                name,
+                f"Body of tag {i} " * (1 + i % 20),
+                guild_id,
+                author_id,
+                now_timestamp,
+            )
+            for i, name in enumerate(names)
+        ],
+        [],
+    )
+
+    return names
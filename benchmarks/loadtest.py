@@ -0,0 +1,340 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Offline load test of the cogs, driven by synthetic interactions.
+
+Fires a weighted mix of commands and button presses at the real callbacks
+from concurrent workers, then reports throughput, latency percentiles
+and how long callers waited for a database connection.
+
+Run with `python -m benchmarks.loadtest --requests 5000 --concurrency 50`
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import itertools
+import statistics
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from exts.embed import EmbedBuilderView, EmbedModal
+from exts.tags import AddTag
+from exts.util.storage import STORAGE_BACKENDS
+
+from .fakes import (
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeUser,
+    MeasuredPool,
+    OfflineOrbyt,
+    offline_bot,
+    seed_tags,
+)
+
+EXTENSIONS = ("exts.tags", "exts.embed", "exts.festive", "exts.info")
+
+DEFAULT_MIX = {
+    "tag_view": 50,
+    "tag_search": 10,
+    "tag_random": 10,
+    "tag_list": 10,
+    "tag_add": 5,
+    "embed_edit": 10,
+    "ping": 4,
+    "card": 1,
+}
+
+
+def percentile(samples: List[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def pool_report(pool: MeasuredPool, locked: int = 0) -> dict:
+    """How long callers waited for a connection of `pool`"""
+    return {
+        "acquires": len(pool.waits),
+        "wait_p50_ms": percentile(pool.waits, 50) * 1000,
+        "wait_p99_ms": percentile(pool.waits, 99) * 1000,
+        "wait_max_ms": max(pool.waits, default=0.0) * 1000,
+        "locked_errors": locked + pool.locked,
+    }
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parses `name=weight,name=weight` into a mix"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}, pick from {', '.join(DEFAULT_MIX)}"
+            )
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class LoadTest:
+    """
+    The scenarios of a load test against one guild.
+
+    Parameters
+    -----------
+    bot: :class:`OfflineOrbyt`
+        The bot with the cogs loaded
+    names: List[:class:`str`]
+        The names of the seeded tags
+    users: :class:`int`
+        How many distinct users send interactions
+    latency: :class:`float`
+        Simulated API round trip of every response, in seconds
+    """
+
+    def __init__(
+        self,
+        bot: OfflineOrbyt,
+        guild: FakeGuild,
+        names: List[str],
+        *,
+        users: int = 100,
+        latency: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.bot = bot
+        self.guild = guild
+        self.channel = FakeChannel(guild)
+        self.users = [FakeUser(f"user{i}") for i in range(users)]
+        self.names = names
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self._new_names = itertools.count()
+
+        self.tags = bot.get_cog("tag")
+        self.festive = bot.get_cog("Festive")
+        self.info = bot.get_cog("Info")
+
+    def interaction(self, user: Optional[FakeUser] = None) -> FakeInteraction:
+        return FakeInteraction(
+            self.bot,
+            user=user or self.rng.choice(self.users),
+            guild=self.guild,
+            channel=self.channel,
+            latency=self.latency,
+        )
+
+    def scenario(self, name: str) -> Callable[[], Awaitable[None]]:
+        return getattr(self, f"run_{name}")
+
+    async def run_tag_view(self) -> None:
+        await self.tags.tag_view.callback(
+            self.tags, self.interaction(), name=self.rng.choice(self.names)
+        )
+
+    async def run_tag_search(self) -> None:
+        query = self.rng.choice(self.names)[: self.rng.randint(5, 9)]
+        await self.tags.tag_search.callback(self.tags, self.interaction(), query=query)
+
+    async def run_tag_random(self) -> None:
+        await self.tags.tag_random.callback(self.tags, self.interaction())
+
+    async def run_tag_list(self) -> None:
+        # the command, then a press of its next page button
+        interaction = self.interaction()
+        await self.tags.tag_list.callback(self.tags, interaction)
+
+        view = interaction.response.calls[0][1]["view"]
+        await view.next_page.callback(self.interaction(interaction.user))
+
+    async def run_tag_add(self) -> None:
+        modal = AddTag(self.bot)
+        modal.name._value = f"load-{os.getpid()}-{next(self._new_names)}"
+        modal.content._value = "Added by the load test " * 10
+        await modal.on_submit(self.interaction())
+
+    async def run_embed_edit(self) -> None:
+        # open a builder, submit its embed modal, then undo the edit
+        interaction = self.interaction()
+        view = EmbedBuilderView(timeout=600, target=interaction)
+
+        modal = EmbedModal(_embed=view.embed, parent_view=view)
+        modal.em_title._value = "Load test"
+        modal.description._value = "Lorem ipsum dolor sit amet. " * 40
+        modal.color._value = "#755ae0"
+        await modal.on_submit(self.interaction(interaction.user))
+
+        await view.undo_btn.callback(self.interaction(interaction.user))
+
+    async def run_ping(self) -> None:
+        await self.info.ping.callback(self.info, self.interaction())
+
+    async def run_card(self) -> None:
+        author, to_user = self.rng.sample(self.users, 2)
+        await self.festive.christmas.callback(
+            self.festive,
+            self.interaction(author),
+            user=to_user,
+            color=self.rng.choice(["Blue", "Green", "Purple", "Red"]),
+        )
+
+
+async def run_load(
+    test: LoadTest, mix: Dict[str, int], *, requests: int, concurrency: int
+) -> dict:
+    """Runs `requests` scenarios picked from `mix` with `concurrency` workers"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = test.rng.choices(names, weights, k=requests)
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    locked = 0
+    queue = iter(plan)
+
+    async def worker():
+        nonlocal locked
+        for name in queue:
+            start = time.perf_counter()
+            try:
+                await test.scenario(name)()
+            except Exception as exc:
+                errors[name] += 1
+                locked += "locked" in str(exc)
+            else:
+                latencies[name].append(time.perf_counter() - start)
+
+    pool = test.bot.pool
+    pool.waits.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    everything = [s for samples in latencies.values() for s in samples]
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput": requests / elapsed,
+        "overall": summarize(everything),
+        "scenarios": {
+            name: dict(summarize(latencies[name]), errors=errors[name])
+            for name in names
+        },
+        "db": pool_report(pool, locked),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['requests']} requests, {report['concurrency']} workers: "
+        f"{report['seconds']:.2f}s, {report['throughput']:.0f} req/s"
+    )
+    print_table(report)
+
+
+def print_table(report: dict) -> None:
+    """The per scenario latencies and database waits of a report"""
+    print(
+        f"{'scenario':<16} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}"
+    )
+
+    rows = dict(report["scenarios"], overall=dict(report["overall"], errors=""))
+    for name, row in rows.items():
+        print(
+            f"{name:<16} {row['count']:>6} {row['p50_ms']:>7.2f}ms "
+            f"{row['p95_ms']:>7.2f}ms {row['p99_ms']:>7.2f}ms {row['errors']:>7}"
+        )
+
+    db = report["db"]
+    print(
+        f"db: {db['acquires']} acquires, wait p50 {db['wait_p50_ms']:.2f}ms "
+        f"p99 {db['wait_p99_ms']:.2f}ms max {db['wait_max_ms']:.2f}ms, "
+        f"{db['locked_errors']} locked errors"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        async with offline_bot(
+            os.path.join(tmp, "load.db"), EXTENSIONS, storage=args.storage
+        ) as bot:
+            guild = FakeGuild()
+            names = await seed_tags(bot.tags, guild.id, args.tags)
+
+            test = LoadTest(
+                bot,
+                guild,
+                names,
+                users=args.users,
+                latency=args.latency,
+                seed=args.seed,
+            )
+            report = await run_load(
+                test, args.mix, requests=args.requests, concurrency=args.concurrency
+            )
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tags", type=int, default=5000, help="tags seeded first")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="simulated API round trip (s)"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="weighted scenarios, e.g. tag_view=5,embed_edit=1",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_BACKENDS,
+        default="sqlite",
+        help="tag storage backend",
+    )
+    parser.add_argument("--output", help="also write the report as JSON here")
+
+    asyncio.run(main(parser.parse_args()))
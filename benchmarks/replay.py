@@ -0,0 +1,269 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Replays a recording made with `dev record` through the cogs, offline.
+
+Slash commands are sent to the real callbacks of an offline bot with
+seeded tags, at the recorded pace or faster. Anonymized tag names map
+to seeded tags consistently, so hot tags stay hot. Component and modal
+interactions need the live view they belonged to, so they are counted
+but not replayed.
+
+Run with `python -m benchmarks.replay recording.jsonl [--speed 10]`
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from exts.util.recorder import read_recording
+
+from .fakes import (
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeUser,
+    offline_bot,
+    seed_tags,
+)
+from .loadtest import EXTENSIONS, pool_report, print_table, summarize
+
+_STRING = discord.AppCommandOptionType.string.value
+_USER = discord.AppCommandOptionType.user.value
+_PLAIN = {
+    discord.AppCommandOptionType.integer.value,
+    discord.AppCommandOptionType.boolean.value,
+    discord.AppCommandOptionType.number.value,
+}
+
+
+class Unsupported(Exception):
+    """The record can't be replayed offline"""
+
+
+class Replayer:
+    """
+    Turns records back into callback invocations against one seeded guild.
+
+    Parameters
+    -----------
+    bot
+        The offline bot with the cogs loaded
+    names: List[:class:`str`]
+        The names of the seeded tags
+    """
+
+    def __init__(self, bot, guild: FakeGuild, names: List[str]):
+        self.bot = bot
+        self.guild = guild
+        self.channel = FakeChannel(guild)
+        self.names = names
+        self.users: Dict[int, FakeUser] = {}
+
+    def user(self, pseudonym: Optional[int]) -> FakeUser:
+        if pseudonym not in self.users:
+            self.users[pseudonym] = FakeUser(f"user{len(self.users)}")
+        return self.users[pseudonym]
+
+    def text(self, option: str, token: str) -> str:
+        # the same token always lands on the same seeded tag
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        name = self.names[int.from_bytes(digest, "big") % len(self.names)]
+
+        if option == "name":
+            return name
+        return name[: max(4, min(len(token), len(name)))]
+
+    def command(self, qualified_name: str) -> app_commands.Command:
+        parent, *children = qualified_name.split(" ")
+        command = self.bot.tree.get_command(parent)
+
+        for child in children:
+            if not isinstance(command, app_commands.Group):
+                break
+            command = command.get_command(child)
+
+        if not isinstance(command, app_commands.Command):
+            raise Unsupported(f"no command {qualified_name!r}")
+        return command
+
+    def arguments(
+        self, command: app_commands.Command, options: Dict[str, List[Any]]
+    ) -> Dict[str, Any]:
+        # the API names of options can differ from the callback's parameter names
+        params = {param.display_name: param for param in command.parameters}
+
+        kwargs = {}
+        for display_name, (kind, value) in options.items():
+            param = params.get(display_name)
+            if param is None:
+                raise Unsupported(
+                    f"no option {display_name!r} of {command.qualified_name!r}"
+                )
+
+            name = param.name
+            if kind == _STRING:
+                # choices are recorded verbatim, the rest are tokens
+                kwargs[name] = value if param.choices else self.text(name, value)
+            elif kind == _USER:
+                kwargs[name] = self.user(value)
+            elif kind in _PLAIN:
+                kwargs[name] = value
+            else:
+                raise Unsupported(f"option type {kind}")
+        return kwargs
+
+    async def replay(self, record: dict) -> None:
+        if record["k"] != discord.InteractionType.application_command.value:
+            raise Unsupported(f"interaction type {record['k']}")
+
+        command = self.command(record["c"])
+        kwargs = self.arguments(command, record.get("o", {}))
+
+        interaction = FakeInteraction(
+            self.bot,
+            user=self.user(record.get("u")),
+            guild=self.guild,
+            channel=self.channel,
+        )
+        await command.callback(command.binding, interaction, **kwargs)
+
+
+async def replay(
+    replayer: Replayer,
+    records: List[Tuple[float, dict]],
+    *,
+    speed: float,
+    concurrency: int,
+) -> dict:
+    """
+    Replays `records` at `speed` times their recorded pace,
+    or as fast as `concurrency` allows when `speed` is 0.
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Counter = Counter()
+    skipped: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(record: dict) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await replayer.replay(record)
+            except Unsupported as exc:
+                skipped[str(exc)] += 1
+                return
+            except Exception:
+                errors[record["c"]] += 1
+                latencies.setdefault(record["c"], [])
+                return
+
+            latencies.setdefault(record["c"], []).append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    first = records[0][0] if records else 0.0
+
+    for offset, record in records:
+        if speed:
+            delay = start + (offset - first) / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        tasks.append(asyncio.create_task(run(record)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    replayed = sum(len(samples) for samples in latencies.values())
+
+    return {
+        "records": len(records),
+        "replayed": replayed,
+        "speed": speed,
+        "seconds": elapsed,
+        "throughput": replayed / elapsed if elapsed else 0.0,
+        "overall": summarize([s for samples in latencies.values() for s in samples]),
+        "scenarios": {
+            name: dict(summarize(samples), errors=errors[name])
+            for name, samples in sorted(latencies.items())
+        },
+        "skipped": dict(skipped),
+        "db": pool_report(replayer.bot.pool),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    with open(args.recording, encoding="utf-8") as fp:
+        records = list(read_recording(fp))
+
+    if args.limit:
+        records = records[: args.limit]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        async with offline_bot(os.path.join(tmp, "replay.db"), EXTENSIONS) as bot:
+            guild = FakeGuild()
+            names = await seed_tags(bot.tags, guild.id, args.tags)
+
+            report = await replay(
+                Replayer(bot, guild, names),
+                records,
+                speed=args.speed,
+                concurrency=args.concurrency,
+            )
+
+    pace = f"{args.speed:g}x" if args.speed else "unpaced"
+    print(
+        f"{report['replayed']}/{report['records']} records replayed ({pace}): "
+        f"{report['seconds']:.2f}s, {report['throughput']:.0f} req/s"
+    )
+    print_table(report)
+    for reason, count in report["skipped"].items():
+        print(f"skipped {count}: {reason}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recording", help="a file written by `dev record`")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="pace multiplier, 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=50, help="interactions in flight at most"
+    )
+    parser.add_argument("--tags", type=int, default=5000, help="tags seeded first")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N")
+    parser.add_argument("--output", help="also write the report as JSON here")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,394 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Benchmark suite of the bot's hot paths, with regression checks.
+
+Results are written as JSON, and compared to an earlier run with
+`--baseline`. A benchmark whose median got slower than its ratio in
+`benchmarks/thresholds.json` is reported as a regression, and the run
+exits with status 1.
+
+Run with `python -m benchmarks.suite [--quick] [--baseline old.json]`
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import discord
+
+from exts.embed import EmbedBuilderView, EmbedModal
+from exts.festive import christmas_card
+from exts.tags import TagPages
+from exts.util.embed_limits import EmbedTally
+from exts.util.text_format import CustomFormatter
+
+from .bench_embed_history import make_embed
+from .fakes import (
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeUser,
+    OfflineOrbyt,
+    offline_bot,
+    seed_tags,
+)
+
+TAG_SIZES = (1_000, 10_000, 100_000)
+QUICK_TAG_SIZES = (1_000, 10_000)
+PAGINATOR_SIZES = (10_000, 100_000)
+
+MIN_TIME = 0.5  # seconds spent measuring each benchmark
+MIN_ROUNDS = 5
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), "thresholds.json")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+Step = Callable[[], Union[None, Awaitable[None]]]
+
+
+async def measure(step: Step, *, min_time: float = MIN_TIME) -> Dict[str, float]:
+    """Calls `step` for at least `min_time` seconds and summarises the durations"""
+    is_async = inspect.iscoroutinefunction(step)
+    durations: List[float] = []
+
+    deadline = time.perf_counter() + min_time
+    while len(durations) < MIN_ROUNDS or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if is_async:
+            await step()
+        else:
+            step()
+        durations.append(time.perf_counter() - start)
+
+    durations.sort()
+    return {
+        "rounds": len(durations),
+        "median_us": statistics.median(durations) * 1e6,
+        "mean_us": statistics.fmean(durations) * 1e6,
+        "min_us": durations[0] * 1e6,
+        "p95_us": durations[int(len(durations) * 0.95) - 1] * 1e6,
+    }
+
+
+class Context:
+    """Shared fixtures of a suite run, bots are made once per tag count"""
+
+    def __init__(self, stack: AsyncExitStack, tmp: str):
+        self.stack = stack
+        self.tmp = tmp
+        self.user = FakeUser("bench")
+        self._bots: Dict[int, Tuple[OfflineOrbyt, FakeGuild, List[str]]] = {}
+
+    async def tags(self, count: int) -> Tuple[OfflineOrbyt, FakeGuild, List[str]]:
+        if count not in self._bots:
+            bot = await self.stack.enter_async_context(
+                offline_bot(os.path.join(self.tmp, f"tags-{count}.db"))
+            )
+            guild = FakeGuild()
+            names = await seed_tags(bot.tags, guild.id, count)
+            self._bots[count] = (bot, guild, names)
+
+        return self._bots[count]
+
+    def interaction(self, bot, guild: FakeGuild) -> FakeInteraction:
+        return FakeInteraction(
+            bot, user=self.user, guild=guild, channel=FakeChannel(guild)
+        )
+
+
+def _rotating(values: List[Any]) -> Callable[[], Any]:
+    # a stride over the values, so consecutive rounds hit different rows
+    state = {"i": 0}
+
+    def take():
+        state["i"] = (state["i"] + 7919) % len(values)
+        return values[state["i"]]
+
+    return take
+
+
+async def bench_tag_lookup(ctx: Context, count: int) -> Step:
+    bot, guild, names = await ctx.tags(count)
+    cog = bot.get_cog("tag")
+    name = _rotating(names)
+
+    async def step():
+        await cog.tag_view.callback(cog, ctx.interaction(bot, guild), name=name())
+
+    return step
+
+
+async def bench_tag_search(ctx: Context, count: int) -> Step:
+    bot, guild, names = await ctx.tags(count)
+    cog = bot.get_cog("tag")
+    name = _rotating(names)
+
+    async def step():
+        await cog.tag_search.callback(
+            cog, ctx.interaction(bot, guild), query=name()[:8]
+        )
+
+    return step
+
+
+async def bench_tag_list(ctx: Context, count: int) -> Step:
+    bot, guild, _ = await ctx.tags(count)
+    cog = bot.get_cog("tag")
+
+    async def step():
+        await cog.tag_list.callback(cog, ctx.interaction(bot, guild))
+
+    return step
+
+
+async def bench_tag_random(ctx: Context, count: int) -> Step:
+    bot, guild, _ = await ctx.tags(count)
+    cog = bot.get_cog("tag")
+
+    async def step():
+        await cog.tag_random.callback(cog, ctx.interaction(bot, guild))
+
+    return step
+
+
+async def bench_paginator_build(ctx: Context, count: int) -> Step:
+    entries = [(f"tag-{i:06}", i) for i in range(count)]
+
+    def step():
+        TagPages(entries=entries, target=None, timeout=60)
+
+    return step
+
+
+async def bench_paginator_switch(ctx: Context, count: int) -> Step:
+    bot, guild, _ = await ctx.tags(QUICK_TAG_SIZES[0])
+    entries = [(f"tag-{i:06}", i) for i in range(count)]
+    view = TagPages(entries=entries, target=None, timeout=60)
+
+    async def step():
+        await view.next_page.callback(ctx.interaction(bot, guild))
+
+    return step
+
+
+async def bench_christmas_card(ctx: Context) -> Step:
+    def step():
+        christmas_card("bench_author", "bench_recipient", "Blue")
+
+    return step
+
+
+async def bench_embed_modal_submit(ctx: Context) -> Step:
+    bot, guild, _ = await ctx.tags(QUICK_TAG_SIZES[0])
+    view = EmbedBuilderView(timeout=600, target=ctx.interaction(bot, guild))
+    descriptions = _rotating([f"Description {i} " * 100 for i in range(16)])
+
+    async def step():
+        modal = EmbedModal(_embed=view.embed, parent_view=view)
+        modal.em_title._value = "Benchmark"
+        modal.description._value = descriptions()
+        modal.color._value = "#755ae0"
+        await modal.on_submit(ctx.interaction(bot, guild))
+
+    return step
+
+
+async def bench_embed_validation(ctx: Context) -> Step:
+    embed = make_embed()
+
+    def step():
+        EmbedTally(embed)
+
+    return step
+
+
+async def bench_log_format(ctx: Context) -> Step:
+    formatter = CustomFormatter(
+        "[{asctime}] [{levelname}] - {name}: {message}", "%H:%M:%S", "{"
+    )
+    record = logging.LogRecord(
+        "discord.gateway",
+        logging.INFO,
+        __file__,
+        1,
+        "Shard ID %s has connected",
+        (0,),
+        None,
+    )
+
+    def step():
+        formatter.format(record)
+
+    return step
+
+
+def collect(quick: bool) -> List[Tuple[str, Callable[[Context], Awaitable[Step]]]]:
+    """The benchmarks to run, as `(name, setup)` pairs"""
+    sizes = QUICK_TAG_SIZES if quick else TAG_SIZES
+    benches = []
+
+    for bench in (bench_tag_lookup, bench_tag_search, bench_tag_list, bench_tag_random):
+        for count in sizes:
+            benches.append(
+                (
+                    f"{bench.__name__[6:]}[{count}]",
+                    lambda ctx, b=bench, n=count: b(ctx, n),
+                )
+            )
+
+    for bench in (bench_paginator_build, bench_paginator_switch):
+        for count in PAGINATOR_SIZES:
+            benches.append(
+                (
+                    f"{bench.__name__[6:]}[{count}]",
+                    lambda ctx, b=bench, n=count: b(ctx, n),
+                )
+            )
+
+    for bench in (
+        bench_christmas_card,
+        bench_embed_modal_submit,
+        bench_embed_validation,
+        bench_log_format,
+    ):
+        benches.append((bench.__name__[6:], bench))
+
+    return benches
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(
+    results: Dict[str, dict], baseline: Dict[str, dict], thresholds: Dict[str, float]
+) -> List[str]:
+    """
+    Compares medians against `baseline`.
+
+    `thresholds` maps a benchmark name, or its name without the `[size]`
+    suffix, to the largest allowed slowdown ratio. `default` applies to the rest.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+
+        limit = thresholds.get(
+            name, thresholds.get(name.split("[")[0], thresholds.get("default", 1.25))
+        )
+        ratio = result["median_us"] / old["median_us"]
+        if ratio > limit:
+            regressions.append(
+                f"{name}: {old['median_us']:.1f}us -> {result['median_us']:.1f}us "
+                f"({ratio:.2f}x, allowed {limit:.2f}x)"
+            )
+
+    return regressions
+
+
+async def run_suite(args: argparse.Namespace) -> dict:
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        async with AsyncExitStack() as stack:
+            ctx = Context(stack, tmp)
+
+            for name, setup in collect(args.quick):
+                if args.filter and args.filter not in name:
+                    continue
+
+                step = await setup(ctx)
+                results[name] = await measure(step, min_time=args.min_time)
+                print(
+                    f"{name:<28} {results[name]['median_us']:>12,.1f} us median "
+                    f"({results[name]['rounds']} rounds)"
+                )
+
+    return {
+        "meta": {
+            "timestamp": round(discord.utils.utcnow().timestamp()),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="skip 100k tag tables")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="an earlier results file to compare with")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_suite(args))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{report['meta']['timestamp']}.json")
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+
+    regressions = find_regressions(report["results"], baseline, thresholds)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
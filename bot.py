@@ -17,19 +17,39 @@
 
 """Boilerplate code for Bot's root functionalities"""
 
+import os
+import asyncio
 import logging
 import sys
+import tempfile
+from typing import Optional
 
+import aiohttp
 import discord
 import jishaku
 import asqlite
-from discord.ext import commands
+from discord.ext import commands, tasks
 from termcolor import colored
 
 from logging.handlers import RotatingFileHandler
 from exts.util.text_format import spaced_padding, CustomFormatter
+from exts.util.tag_content import migrate_tag_contents
+from exts.util.webhooks import WebhookCache
+from exts.util.invalidation import InvalidationBus
+from exts.util.view_state import ViewStateStore
+from exts.util.views import ViewRegistry
+from exts.util.auto_defer import AutoDefer
+from exts.util.error_log import ErrorLog
+from exts.util.health import HealthServer
+from exts.util.admission import AdmissionController
+from exts.util.scheduler import Priority, Scheduler
+from exts.util.shutdown import DRAIN_TIMEOUT, DrainingTree, ShutdownReport, drain
+from exts.util.storage import MemoryTagStore, SqliteTagStore, TagStore
+from exts.util import queries
+from exts.util.cluster import CLUSTER_HEARTBEAT, ClusterInfo, write_heartbeat
 from config import DEBUG, PROD_TOKEN, DEBUG_BOT_TOKEN
 
+log = logging.getLogger("orbyt.cluster")
 
 INITIAL_EXTENSIONS = [
     "exts.info",
@@ -44,12 +64,41 @@ INITIAL_EXTENSIONS = [
 class Orbyt(commands.AutoShardedBot):
     """Base Class for the bot"""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        cluster: Optional[ClusterInfo] = None,
+        storage: str = "sqlite",
+        view_registry: Optional[ViewRegistry] = None,
+        health_port: Optional[int] = None,
+        **kwargs,
+    ):
+        self.cluster = cluster
+        self.storage = storage
+        # `/healthz` and `/readyz` are served on it, if set
+        self.health_port = health_port
+        self.health: Optional[HealthServer] = None
+        # caps on the live views of users and guilds
+        self.view_registry = view_registry or ViewRegistry()
+        # defers interactions of handlers that are slow to respond
+        self.auto_defer = AutoDefer()
+        # thread pools and database writes by priority
+        self.scheduler = Scheduler()
+        # unhandled errors by fingerprint, rate limited in the log
+        self.error_log = ErrorLog()
+        # set once shutting down, new interactions are refused from then on
+        self.draining = False
+        self.shutdown_report: Optional[ShutdownReport] = None
+        self._scratch: Optional[tempfile.TemporaryDirectory] = None
+        if cluster is not None:
+            kwargs.update(shard_ids=cluster.shard_ids, shard_count=cluster.shard_count)
+
         intents = discord.Intents.default()
         intents.members = True
 
         super().__init__(
             command_prefix=commands.when_mentioned,
+            tree_cls=DrainingTree,
             case_insensitive=True,
             strip_after_prefix=True,
             intents=discord.Intents.all() if DEBUG else intents,
@@ -74,15 +123,21 @@ class Orbyt(commands.AutoShardedBot):
 
         ## ----- Logging ----- ##
 
-        logger = logging.getLogger("discord")
-        logger.setLevel(logging.INFO)
+        # the bot's own "orbyt.*" loggers write where discord.py's do
+        loggers = [logging.getLogger("discord"), logging.getLogger("orbyt")]
         fmt = "[{asctime}] [{levelname}] - {name}: {message}"
         date_fmt = "%H:%M:%S"
         # Log to file
         f_formatter = logging.Formatter(fmt, date_fmt, "{")
 
+        # clusters can't share a file opened with mode="w"
+        log_file = (
+            "./logs/discord.log"
+            if self.cluster is None
+            else f"./logs/discord-{self.cluster.cluster_id}.log"
+        )
         file_handler = RotatingFileHandler(
-            "./logs/discord.log",
+            log_file,
             mode="w",
             encoding="utf-8",
             maxBytes=5 * 1024 * 1024,
@@ -98,15 +153,34 @@ class Orbyt(commands.AutoShardedBot):
         console_handler.setFormatter(c_formatter)
 
         # Add & Finish up
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        for logger in loggers:
+            logger.setLevel(logging.INFO)
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
 
-        ## ----- Database Setup ----- ##
+        await self.setup_state()
 
-        self.pool = await asqlite.create_pool("./db/orbyt.db")
-        async with self.pool.acquire() as c:
-            with open("./db/schema.sql") as f:
-                await c.executescript(f.read())
+        ## ----- Interactions ----- ##
+
+        self.add_listener(self.auto_defer.on_interaction, "on_interaction")
+
+        ## ----- Health Checks ----- ##
+
+        if self.health_port is not None:
+            self.health = HealthServer(
+                self, self.health_port, extensions=["jishaku", *INITIAL_EXTENSIONS]
+            )
+            try:
+                await self.health.start()
+            except OSError as exc:
+                self.health = None
+                print(colored(f"Failed to serve health checks: {exc}", "red"))
+
+        ## ----- Clustering ----- ##
+
+        if self.cluster is not None:
+            self._started_at = round(discord.utils.utcnow().timestamp())
+            self.cluster_heartbeat.start()
 
         ## ----- Load Extensions ----- ##
 
@@ -131,8 +205,100 @@ class Orbyt(commands.AutoShardedBot):
             )
         )
 
+    async def setup_state(self, database: str = "./db/orbyt.db"):
+        """Set up the database, the storage backend and the shared HTTP session
+
+        Parameters
+        -----------
+        database: :class:`str`
+            The path of the SQLite database, a throwaway one is used
+            with the memory storage backend
+        """
+
+        ## ----- Database Setup ----- ##
+
+        if self.storage == "memory":
+            # tables without a memory backend yet still need a database
+            self._scratch = tempfile.TemporaryDirectory(prefix="orbyt-")
+            database = os.path.join(self._scratch.name, "orbyt.db")
+
+        # `run_in_executor(None, ...)` and DNS lookups are interactive work
+        asyncio.get_running_loop().set_default_executor(
+            self.scheduler.executors[Priority.INTERACTIVE]
+        )
+
+        self.pool = await asqlite.create_pool(database)
+        async with self.pool.acquire() as c:
+            with open("./db/schema.sql") as f:
+                await c.executescript(f.read())
+
+            await migrate_tag_contents(c)
+
+        self.invalidations = InvalidationBus(self.pool)
+        await self.invalidations.start()
+
+        self.view_states = ViewStateStore(self.pool, self.scheduler)
+        self.view_states.start()
+
+        self.admission = AdmissionController(self.pool, self.scheduler)
+        self.admission.start()
+
+        ## ----- Storage ----- ##
+
+        self.tags: TagStore = (
+            MemoryTagStore()
+            if self.storage == "memory"
+            else SqliteTagStore(self.pool, self.invalidations, self.scheduler)
+        )
+
+        ## ----- HTTP ----- ##
+
+        self.session = aiohttp.ClientSession()
+        self.webhooks = WebhookCache(self.session)
+
+    @tasks.loop(seconds=CLUSTER_HEARTBEAT)
+    async def cluster_heartbeat(self):
+        try:
+            await write_heartbeat(self, self._started_at)
+        except Exception:
+            # a stopped loop would show this cluster as unresponsive for good
+            log.exception("Writing the cluster heartbeat failed, retrying")
+
+    @cluster_heartbeat.before_loop
+    async def before_cluster_heartbeat(self):
+        await self.wait_until_ready()
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT) -> ShutdownReport:
+        """
+        Refuses new interactions and waits up to `timeout` seconds for the
+        work in flight, see :func:`exts.util.shutdown.drain`.
+
+        Only drains once, later calls return the same report.
+        """
+        if self.shutdown_report is None:
+            self.draining = True
+            self.shutdown_report = await drain(self, timeout)
+        return self.shutdown_report
+
     async def close(self):
+        await self.drain()
+        # reported not ready while draining, so traffic moved away meanwhile
+        if self.health is not None:
+            await self.health.stop()
+
+        if self.cluster is not None:
+            self.cluster_heartbeat.cancel()
+            async with self.pool.acquire() as c:
+                await c.execute(queries.CLUSTER_REMOVE, self.cluster.cluster_id)
+
+        self.invalidations.stop()
+        self.view_states.stop()
+        self.admission.stop()
         await self.pool.close()
+        await self.session.close()
+        self.scheduler.shutdown()
+        if self._scratch is not None:
+            self._scratch.cleanup()
         await super().close()
 
     async def on_ready(self):
@@ -148,6 +314,7 @@ class Orbyt(commands.AutoShardedBot):
                 ("Jishaku", jishaku.__version__),
                 ("Guilds", len(self.guilds)),
                 ("Shards", self.shard_count),
+                ("Cluster", self.cluster.label if self.cluster else "None"),
                 ("Debug Mode", DEBUG),
             ]
         ]
@@ -1,9 +1,91 @@
+CREATE TABLE IF NOT EXISTS tag_contents (
+    hash BLOB PRIMARY KEY,
+
+    data BLOB,
+    compressed INTEGER DEFAULT 0,
+    refs INTEGER DEFAULT 0
+);
+
 CREATE TABLE IF NOT EXISTS tags (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
 
     name TEXT,
-    content TEXT,
+    content_hash BLOB REFERENCES tag_contents (hash),
     guild INTEGER,
     author INTEGER,
     created_at INTEGER
-)
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS tags_guild_name_idx ON tags (guild, name);
+
+-- Reference counting of shared bodies, blobs are dropped with their last tag
+CREATE TRIGGER IF NOT EXISTS tags_content_ref AFTER INSERT ON tags
+BEGIN
+    UPDATE tag_contents SET refs = refs + 1 WHERE hash = new.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tags_content_reref AFTER UPDATE OF content_hash ON tags
+BEGIN
+    UPDATE tag_contents SET refs = refs + 1 WHERE hash = new.content_hash;
+    UPDATE tag_contents SET refs = refs - 1 WHERE hash = old.content_hash;
+    DELETE FROM tag_contents WHERE hash = old.content_hash AND refs <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tags_content_unref AFTER DELETE ON tags
+BEGIN
+    UPDATE tag_contents SET refs = refs - 1 WHERE hash = old.content_hash;
+    DELETE FROM tag_contents WHERE hash = old.content_hash AND refs <= 0;
+END;
+
+CREATE TABLE IF NOT EXISTS tag_usage (
+    tag_id INTEGER PRIMARY KEY REFERENCES tags (id) ON DELETE CASCADE,
+
+    guild INTEGER,
+    uses INTEGER DEFAULT 0,
+    last_used INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS tag_usage_guild_uses_idx ON tag_usage (guild, uses DESC);
+
+CREATE TABLE IF NOT EXISTS embed_templates (
+    guild INTEGER,
+    name TEXT,
+
+    data TEXT,
+    characters INTEGER,
+    fields INTEGER,
+    author INTEGER,
+    created_at INTEGER,
+
+    PRIMARY KEY (guild, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cluster_stats (
+    cluster_id INTEGER PRIMARY KEY,
+
+    pid INTEGER,
+    shards TEXT,
+    guilds INTEGER,
+    latency REAL,
+    started_at INTEGER,
+    updated_at INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS cache_invalidations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    origin INTEGER,
+    cache TEXT,
+    key TEXT,
+    created_at INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS view_states (
+    key TEXT PRIMARY KEY,
+
+    kind TEXT,
+    data TEXT,
+    expires_at INTEGER
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS view_states_expires_idx ON view_states (expires_at);
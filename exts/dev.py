@@ -21,14 +21,20 @@ Commands for developers only
 """
 
 
+import io
+import math
 from typing import List, Optional, Literal
 
 import discord
 from discord.ext import commands
 
 from bot import Orbyt
+from .util.constants import EMOJIS
 from .util.views import ConfirmView
 from .util.paginator import CustomPaginator
+from .util.recorder import InteractionRecorder
+from .util.concurrency import LIMITS
+from .util.cluster import fetch_cluster_stats
 
 
 class thispagething(CustomPaginator):
@@ -71,6 +77,17 @@ class Developer(commands.Cog, command_attrs=dict(hidden=True)):
 
     def __init__(self, bot: Orbyt):
         self.bot: Orbyt = bot
+        self.recorder: Optional[InteractionRecorder] = None
+
+    async def cog_unload(self) -> None:
+        self._stop_recording()
+
+    def _stop_recording(self) -> Optional[InteractionRecorder]:
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            self.bot.remove_listener(recorder.on_interaction, "on_interaction")
+            recorder.close()
+        return recorder
 
     async def cog_before_invoke(self, ctx: commands.Context) -> bool:
         return ctx.author.id in self.bot.owner_ids
@@ -137,6 +154,172 @@ class Developer(commands.Cog, command_attrs=dict(hidden=True)):
                 )
                 continue
 
+    @dev.command("webhooks", aliases=["wh"])
+    @commands.is_owner()
+    async def webhooks(self, ctx: commands.Context):
+        """dev webhooks: Send stats of cached webhook clients"""
+        stats = self.bot.webhooks.stats
+        if not stats:
+            return await ctx.send("No webhook sends yet.")
+
+        lines = [
+            f"`{wh_id}`: {s.sends} sends, {s.failures} failed, "
+            f"{s.average_latency * 1000:.0f}ms avg"
+            + (f" (last error: {s.last_error})" if s.last_error else "")
+            for wh_id, s in sorted(
+                stats.items(), key=lambda item: item[1].sends, reverse=True
+            )[:20]
+        ]
+        await ctx.send("\n".join(lines)[:2000])
+
+    @dev.command("clusters", aliases=["cl"])
+    @commands.is_owner()
+    async def clusters(self, ctx: commands.Context):
+        """dev clusters: Send the last heartbeat of every cluster and their totals"""
+        if self.bot.cluster is None:
+            return await ctx.send("Not running as a cluster.")
+
+        now = round(discord.utils.utcnow().timestamp())
+        stats = await fetch_cluster_stats(self.bot.pool)
+        alive = [s for s in stats if s.alive]
+
+        lines = [
+            f"{EMOJIS['online'] if s.alive else EMOJIS['dnd']} {s.shards}, "
+            f"pid {s.pid}: {s.guilds} guilds, "
+            + (f"{s.latency * 1000:.0f}ms" if math.isfinite(s.latency) else "N/A")
+            + f", up {(now - s.started_at) // 60}m, "
+            f"seen {now - s.updated_at}s ago"
+            for s in stats
+        ]
+        lines.append(
+            f"**Total:** {len(alive)}/{len(stats)} clusters alive, "
+            f"{sum(s.guilds for s in alive)} guilds"
+        )
+        await ctx.send("\n".join(lines)[:2000])
+
+    @dev.command("views")
+    @commands.is_owner()
+    async def views(self, ctx: commands.Context):
+        """dev views: Send counts of live views and their approximate memory"""
+        registry = self.bot.view_registry
+        stats = registry.stats()
+
+        lines = [
+            f"{stats.views} live views of {stats.users} users "
+            f"in {stats.guilds} guilds, ~{stats.memory / 1024:.0f} KiB, "
+            f"{stats.evicted} evicted",
+            f"caps: {registry.per_user}/user, {registry.per_guild}/guild, "
+            f"{registry.max_memory // (1024 * 1024)} MiB",
+        ] + [
+            f"`{kind}`: {count}"
+            for kind, count in sorted(
+                stats.kinds.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+        await ctx.send("\n".join(lines)[:2000])
+
+    @dev.command("defers")
+    @commands.is_owner()
+    async def defers(self, ctx: commands.Context):
+        """dev defers: Send how many slow interactions were deferred automatically"""
+        auto_defer = self.bot.auto_defer
+        await ctx.send(
+            f"{auto_defer.deferred} interactions deferred after "
+            f"{auto_defer.budget:.1f}s, {auto_defer.missed} missed the deadline"
+        )
+
+    @dev.command("pressure")
+    @commands.is_owner()
+    async def pressure(self, ctx: commands.Context):
+        """dev pressure: Send the load and how expensive commands were admitted"""
+        admission = self.bot.admission
+        await ctx.send(
+            f"loop lag {admission.loop_lag * 1000:.1f}ms "
+            f"(max {admission.max_loop_lag * 1000:.0f}ms), "
+            f"executor backlog {admission.executor_backlog} "
+            f"(max {admission.max_executor_backlog}), "
+            f"db backlog {admission.db_backlog} (max {admission.max_db_backlog})\n"
+            f"{admission.admitted} admitted, {admission.queued} queued, "
+            f"{admission.rejected} rejected"
+            + (f"\nholding back: {admission.overload}" if admission.overload else "")
+            + "".join(
+                f"\n{priority.name.lower()}: {stats.jobs} jobs, "
+                f"{self.bot.scheduler.queued(priority)} queued, {stats.writes} writes "
+                f"waiting {stats.average_write_wait * 1000:.1f}ms avg"
+                for priority, stats in self.bot.scheduler.stats.items()
+            )
+        )
+
+    @dev.command("limits")
+    @commands.is_owner()
+    async def limits(self, ctx: commands.Context):
+        """dev limits: Send the runs, waits and rejections of limited commands"""
+        lines = [
+            f"`{name}`: {limit.running}/{limit.limit} running "
+            f"({limit.per_guild or '-'}/guild), {limit.waiting} waiting, "
+            f"{limit.runs} runs, {limit.rejected} rejected, "
+            f"wait avg {limit.average_wait * 1000:.0f}ms "
+            f"max {limit.max_wait * 1000:.0f}ms"
+            for name, limit in LIMITS.items()
+        ]
+        await ctx.send("\n".join(lines)[:2000] or "No limited commands.")
+
+    @dev.command("errors", aliases=["err"])
+    @commands.is_owner()
+    async def errors(self, ctx: commands.Context, fingerprint: Optional[str] = None):
+        """dev errors [fingerprint]: Send the most frequent unhandled errors
+
+        Args:
+            fingerprint: Send only the latest traceback of this error
+        """
+        error_log = self.bot.error_log
+
+        if fingerprint is not None:
+            group = error_log.get(fingerprint)
+            if group is None:
+                return await ctx.send(f"{EMOJIS['no']} - No error `{fingerprint}`.")
+
+            # the end of a traceback is the part that matters
+            return await ctx.send(f"```py\n{group.traceback[-1980:]}\n```")
+
+        groups = error_log.top(10)
+        if not groups:
+            return await ctx.send("No unhandled errors yet.")
+
+        lines = [
+            f"{error_log.total} unhandled errors, {len(error_log)} distinct, "
+            f"{error_log.suppressed} log lines suppressed"
+        ] + [
+            f"`{g.fingerprint}` {g.type} x{g.count} in {g.last_where}, "
+            f"last <t:{int(g.last_seen)}:R>: {g.last_message[:80]}"
+            for g in groups
+        ]
+        tracebacks = "\n".join(
+            f"[{g.fingerprint}] x{g.count}\n{g.traceback}" for g in groups
+        )
+        await ctx.send(
+            "\n".join(lines)[:2000],
+            file=discord.File(io.BytesIO(tracebacks.encode()), "errors.txt"),
+        )
+
+    @dev.command("record", aliases=["rec"])
+    @commands.is_owner()
+    async def record(self, ctx: commands.Context, path: Optional[str] = None):
+        """dev record [path]: Toggle recording anonymized interactions
+
+        Args:
+            path: File to append to (default: ./logs/interactions.jsonl)
+        """
+        recorder = self._stop_recording()
+        if recorder is not None:
+            return await ctx.send(
+                f"⏹️ Recorded {recorder.count} interactions to `{recorder.path}`"
+            )
+
+        self.recorder = InteractionRecorder(path or "./logs/interactions.jsonl")
+        self.bot.add_listener(self.recorder.on_interaction, "on_interaction")
+        await ctx.send(f"⏺️ Recording interactions to `{self.recorder.path}`")
+
     @commands.command()
     @commands.is_owner()
     async def sync(
@@ -198,7 +381,9 @@ class Developer(commands.Cog, command_attrs=dict(hidden=True)):
         await view.wait()
 
         if view.value:
-            await ctx.send(":wave: - Goodbye.")
+            # drained before saying goodbye, the connection is gone after `close`
+            report = await self.bot.drain()
+            await ctx.send(f":wave: - Goodbye, {report}.")
             await self.bot.close()
 
     @commands.command(name="testpage")
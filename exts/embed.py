@@ -23,8 +23,9 @@ For Custom Embeds
 import aiohttp
 import re
 import json
-import copy
+import weakref
 from io import BytesIO
+from typing import Any, Optional, Tuple
 
 import discord
 from discord.ext import commands
@@ -35,9 +36,27 @@ from termcolor import cprint
 
 from bot import Orbyt
 from config import MYSTBIN_API_KEY
-from .util.views import BaseView, message_jump_button
+from .util.views import BaseView, PersistentView, ViewRestorer, message_jump_button
+from .util.admission import BUSY_MESSAGE, Overloaded
+from .util.broadcast import broadcast
 from .util.constants import CONTRAST_COLOR, EMOJIS, HTTP_URL_REGEX
 from .util.text_format import truncate
+from .util import queries
+from .util.cache import LRUCache
+from .util.embed_history import (
+    SNAPSHOT_SIZE,
+    EmbedHistory,
+    EmbedState,
+    restore,
+    snapshot,
+)
+from .util.embed_limits import EmbedTally, MAX_CHARACTERS, MAX_FIELDS
+from .util.fetch import fetch_json
+from .util.view_state import ViewState
+
+TEMPLATE_CACHE_SIZE = 256  # templates kept in memory across all guilds
+
+BuilderKey = Tuple[Optional[int], int]  # (guild id, user id)
 
 
 class EmbedModal(discord.ui.Modal):
@@ -98,7 +117,15 @@ class EmbedModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
+        removed = len(self.embed.title or "") + len(self.embed.description or "")
+        added = len(self.em_title.value) + len(self.description.value)
+
+        if not self.parent_view.tally.fits(removed=removed, added=added):
+            await interaction.response.send_message(
+                f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
+                ephemeral=True,
+            )
+            return
 
         self.embed.title = self.em_title.value  # or self.embed.title
         self.embed.description = self.description.value  # or self.embed.description
@@ -109,20 +136,15 @@ class EmbedModal(discord.ui.Modal):
         if self.color.value:
             self.embed.color = discord.Color.from_str(self.color.value)
 
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
-            await interaction.response.send_message(
-                f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
-                ephemeral=True,
-            )
-            return
-
-        self.parent_view.update_counters()
+        self.parent_view.tally.update(removed=removed, added=added)
+        await self.parent_view.commit()
         await interaction.response.edit_message(embed=self.embed, view=self.parent_view)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -166,27 +188,31 @@ class AuthorModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
+        removed = len(self.embed.author.name or "")
+        added = len(self.author_name.value)
 
-        self.embed.set_author(
-            name=self.author_name.value,
-            url=self.url.value,
-            icon_url=self.icon_url.value,
-        )
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
+        if not self.parent_view.tally.fits(removed=removed, added=added):
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
                 ephemeral=True,
             )
             return
 
-        self.parent_view.update_counters()
+        self.embed.set_author(
+            name=self.author_name.value,
+            url=self.url.value,
+            icon_url=self.icon_url.value,
+        )
+
+        self.parent_view.tally.update(removed=removed, added=added)
+        await self.parent_view.commit()
         await interaction.response.edit_message(embed=self.embed, view=self.parent_view)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -223,25 +249,30 @@ class FooterModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
+        removed = len(self.embed.footer.text or "")
+        added = len(self.text.value)
 
-        self.embed.set_footer(
-            text=self.text.value,
-            icon_url=self.icon_url.value,
-        )
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
+        if not self.parent_view.tally.fits(removed=removed, added=added):
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
                 ephemeral=True,
             )
             return
-        self.parent_view.update_counters()
+
+        self.embed.set_footer(
+            text=self.text.value,
+            icon_url=self.icon_url.value,
+        )
+
+        self.parent_view.tally.update(removed=removed, added=added)
+        await self.parent_view.commit()
         await interaction.response.edit_message(embed=self.embed, view=self.parent_view)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -269,30 +300,22 @@ class URLModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
-
         if not self.embed.title:
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed must have a title.", ephemeral=True
             )
             return
 
-        self.embed.url = self.url.value
+        self.embed.url = self.url.value  # not counted towards the limit
 
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
-            await interaction.response.send_message(
-                f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
-                ephemeral=True,
-            )
-            return
-
-        self.parent_view.update_counters()
+        await self.parent_view.commit()
         await interaction.response.edit_message(embed=self.embed, view=self.parent_view)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -341,8 +364,6 @@ class AddFieldModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
-
         inline_set = {
             "true": True,
             "t": True,
@@ -362,28 +383,31 @@ class AddFieldModal(discord.ui.Modal):
             int(self.index.value) - 1 if self.index.value else len(self.embed.fields)
         )
 
-        self.embed.insert_field_at(
-            index,
-            name=self.fl_name.value,
-            value=self.value.value,
-            inline=inline,
-        )
-
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
+        added = len(self.fl_name.value) + len(self.value.value)
 
+        if not self.parent_view.tally.fits(added=added, fields=1):
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
                 ephemeral=True,
             )
             return
 
-        self.parent_view.update_counters()
+        self.embed.insert_field_at(
+            index,
+            name=self.fl_name.value,
+            value=self.value.value,
+            inline=inline,
+        )
+
+        self.parent_view.tally.update(added=added, fields=1)
+        await self.parent_view.commit()
         await interaction.response.edit_message(embed=self.embed, view=self.parent_view)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -399,16 +423,24 @@ class AddFieldModal(discord.ui.Modal):
             raise error
 
 
-class DeleteFieldDropdown(discord.ui.Select):
+class BuilderPart:
+    """Gives the selects and modals of an embed builder its current embed"""
+
+    parent_view: "EmbedBuilderView"
+
+    @property
+    def embed(self) -> discord.Embed:
+        # read when used, undo and redo replace the builder's embed
+        return self.parent_view.embed
+
+
+class DeleteFieldDropdown(BuilderPart, discord.ui.Select):
     def __init__(
         self,
         *,
-        _embed: discord.Embed,
         parent_view: discord.ui.View,
         original_msg: discord.Message,
     ):
-        self.embed = _embed
-
         self.parent_view = parent_view
 
         self.original_msg = original_msg
@@ -426,18 +458,30 @@ class DeleteFieldDropdown(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        self.embed.remove_field(int(self.values[0]))
-        if len(self.embed) == 0:
+        index = int(self.values[0])
+        if index >= len(self.embed.fields):
+            return await interaction.response.edit_message(
+                content=f"{EMOJIS['no']} - That field no longer exists.", view=None
+            )
+
+        field = self.embed.fields[index]
+
+        self.embed.remove_field(index)
+        tally = self.parent_view.tally
+        tally.update(removed=len(field.name) + len(field.value), fields=-1)
+
+        if tally.characters == 0:
             self.embed.description = "Lorem ipsum dolor sit amet."
+            tally.update(added=len(self.embed.description))
 
-        self.parent_view.update_counters()
+        await self.parent_view.commit()
         await self.original_msg.edit(embed=self.embed, view=self.parent_view)
         await interaction.response.edit_message(
             content=f"{EMOJIS['yes']} - Field deleted.", view=None
         )
 
 
-class EditFieldModal(discord.ui.Modal):
+class EditFieldModal(BuilderPart, discord.ui.Modal):
     fl_name = TextInput(
         label="Field Name",
         placeholder="The name of the field",
@@ -470,13 +514,10 @@ class EditFieldModal(discord.ui.Modal):
     def __init__(
         self,
         *,
-        _embed: discord.Embed,
         parent_view: discord.ui.View,
         field_index: int,
         original_msg: discord.Message,
     ) -> None:
-        self.embed = _embed
-
         self.parent_view = parent_view
         self._old_index = int(field_index)
 
@@ -492,8 +533,6 @@ class EditFieldModal(discord.ui.Modal):
         super().__init__(title=f"Editing Field {field_index+1}", timeout=None)
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        embed_copy = copy.deepcopy(self.embed)
-
         inline_set = {
             "true": True,
             "t": True,
@@ -517,21 +556,27 @@ class EditFieldModal(discord.ui.Modal):
         if inline is None:
             raise ValueError("Inline value must be Boolean!")
 
-        self.embed.remove_field(self._old_index)
-        self.embed.insert_field_at(
-            index, name=self.fl_name.value, value=self.value.value, inline=inline
-        )
+        if self._old_index >= len(self.embed.fields):
+            raise IndexError("The field no longer exists.")
 
-        if len(self.embed) > 6000:
-            self.parent_view.embed = embed_copy
+        old_field = self.embed.fields[self._old_index]
+        removed = len(old_field.name) + len(old_field.value)
+        added = len(self.fl_name.value) + len(self.value.value)
 
+        if not self.parent_view.tally.fits(removed=removed, added=added):
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed too long; Exceeded 6000 characters.",
                 ephemeral=True,
             )
             return
 
-        self.parent_view.update_counters()
+        self.embed.remove_field(self._old_index)
+        self.embed.insert_field_at(
+            index, name=self.fl_name.value, value=self.value.value, inline=inline
+        )
+
+        self.parent_view.tally.update(removed=removed, added=added)
+        await self.parent_view.commit()
         await self.original_msg.edit(embed=self.embed, view=self.parent_view)
 
         await interaction.response.edit_message(
@@ -541,6 +586,8 @@ class EditFieldModal(discord.ui.Modal):
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -557,15 +604,13 @@ class EditFieldModal(discord.ui.Modal):
             raise error
 
 
-class EditFieldDropdown(discord.ui.Select):
+class EditFieldDropdown(BuilderPart, discord.ui.Select):
     def __init__(
         self,
         *,
-        _embed: discord.Embed,
         parent_view: discord.ui.View,
         original_msg: discord.Message,
     ):
-        self.embed = _embed
         self.parent_view = parent_view
         self.original_msg = original_msg
 
@@ -574,7 +619,7 @@ class EditFieldDropdown(discord.ui.Select):
                 label=truncate(f"{i+1}. {field.name}", 100),
                 value=str(i),
             )
-            for i, field in enumerate(_embed.fields)
+            for i, field in enumerate(self.embed.fields)
         ]
 
         super().__init__(
@@ -582,10 +627,15 @@ class EditFieldDropdown(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
+        index = int(self.values[0])
+        if index >= len(self.embed.fields):
+            return await interaction.response.edit_message(
+                content=f"{EMOJIS['no']} - That field no longer exists.", view=None
+            )
+
         await interaction.response.send_modal(
             EditFieldModal(
-                _embed=self.embed,
-                field_index=int(self.values[0]),
+                field_index=index,
                 original_msg=self.original_msg,
                 parent_view=self.parent_view,
             )
@@ -593,13 +643,14 @@ class EditFieldDropdown(discord.ui.Select):
         await interaction.edit_original_response(view=None, content="Editing Field...")
 
 
-class SendToChannelSelect(discord.ui.ChannelSelect):
-    def __init__(self, *, _embed: discord.Embed, bot: Orbyt):
-        self.embed = _embed
+class SendToChannelSelect(BuilderPart, discord.ui.ChannelSelect):
+    def __init__(self, *, parent_view: discord.ui.View, bot: Orbyt):
+        self.parent_view = parent_view
         self.bot = bot
 
         super().__init__(
-            placeholder="Select a channel.",
+            placeholder="Select up to 25 channels.",
+            max_values=25,
             channel_types=[
                 ChannelType.text,
                 ChannelType.news,
@@ -610,35 +661,83 @@ class SendToChannelSelect(discord.ui.ChannelSelect):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        # check if user has access to send messages to channel
-        channel_id = self.values[0].id
-
-        channel = self.bot.get_channel(channel_id)
+        # check if user has access to send messages to each channel
+        channels = []
+        denied = []
+        unreachable = []
+        for value in self.values:
+            # threads and channels aren't always cached
+            channel = value.resolve()
+            if channel is None:
+                try:
+                    channel = await value.fetch()
+                except discord.HTTPException:
+                    unreachable.append(value)
+                    continue
+
+            user_perms = channel.permissions_for(interaction.user)
 
-        user_perms = channel.permissions_for(interaction.user)
+            if user_perms.send_messages and user_perms.embed_links:
+                channels.append(channel)
+            else:
+                denied.append(channel)
 
         try:
-            if user_perms.send_messages and user_perms.embed_links:
-                msg = await channel.send(embed=self.embed)
+            await self.bot.admission.admit()
+        except Overloaded:
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
 
-                confirmed_view = BaseView(timeout=180, target=interaction).add_item(
-                    message_jump_button(msg.jump_url)
-                )
-                await interaction.response.edit_message(
-                    content=f"{EMOJIS['yes']} - Embed sent to {channel.mention}.",
-                    view=confirmed_view,
+        await interaction.response.edit_message(
+            content=f"{EMOJIS['typing']} - Sending the embed to {len(channels)} channel(s)...",
+            view=None,
+        )
+
+        async def report_progress(done: int, total: int):
+            try:
+                await interaction.edit_original_response(
+                    content=f"{EMOJIS['typing']} - Sent the embed to {done}/{total} channel(s)...",
                 )
-            else:
-                await interaction.response.edit_message(
-                    content=f"{EMOJIS['no']} - You have permission to send embeds in {channel.mention}.",
-                    view=None,
+            except discord.HTTPException:
+                pass
+
+        results = await broadcast(
+            channels,
+            lambda channel: channel.send(embed=self.embed),
+            on_progress=report_progress,
+        )
+
+        sent = [result for result in results if result.ok]
+        lines = [
+            f"{EMOJIS['yes']} - Embed sent to {len(sent)}/{len(self.values)} channel(s)."
+        ]
+        lines += [
+            f"{EMOJIS['no']} - {result.target.mention}: {truncate(result.error, 100)}"
+            for result in results
+            if not result.ok
+        ]
+        lines += [
+            f"{EMOJIS['no']} - {channel.mention}: You don't have permission to send embeds here."
+            for channel in denied
+        ]
+        lines += [
+            f"{EMOJIS['no']} - {value.mention}: I can't access this channel."
+            for value in unreachable
+        ]
+
+        confirmed_view = BaseView(timeout=180, target=interaction)
+        for result in sent:
+            confirmed_view.add_item(
+                message_jump_button(
+                    result.message.jump_url,
+                    truncate(f"to #{result.target.name}", 75),
                 )
-        except discord.HTTPException:
-            await interaction.response.edit_message(
-                f"{EMOJIS['no']} - Couldn't send the embed in {channel.mention}.",
-                view=None,
             )
 
+        await interaction.edit_original_response(
+            content=truncate("\n".join(lines), 2000),
+            view=confirmed_view,
+        )
+
 
 class SendViaWebhookModal(discord.ui.Modal):
     def __init__(self, *, _embed: discord.Embed):
@@ -664,6 +763,12 @@ class SendViaWebhookModal(discord.ui.Modal):
         placeholder="Avatar of the Webhook (optional)",
         required=False,
     )
+    wh_wait = discord.ui.TextInput(
+        label="Jump link?",
+        placeholder="Yes/No | Y/N (default: Yes) - No sends faster, without a link",
+        required=False,
+        max_length=3,
+    )
 
     async def on_submit(self, interaction: discord.Interaction):
         mtch = re.fullmatch(
@@ -678,16 +783,23 @@ class SendViaWebhookModal(discord.ui.Modal):
             )
             return
 
+        webhooks = interaction.client.webhooks
+        send_kwargs = dict(
+            username=self.wh_name.value or MISSING,
+            avatar_url=self.wh_avatar.value or MISSING,
+            embed=self.embed,
+        )
+
+        if self.wh_wait.value.lower() in ("no", "n"):
+            webhooks.send_later(self.wh_url.value, **send_kwargs)
+
+            return await interaction.response.send_message(
+                f"{EMOJIS['yes']} - Embed queued [via webhook]({self.wh_url.value}).",
+                ephemeral=True,
+            )
+
         try:
-            async with aiohttp.ClientSession() as session:
-                webhook = discord.Webhook.from_url(self.wh_url.value, session=session)
-
-                msg = await webhook.send(
-                    username=self.wh_name.value or MISSING,
-                    avatar_url=self.wh_avatar.value or MISSING,
-                    embed=self.embed,
-                    wait=True,
-                )
+            msg = await webhooks.send(self.wh_url.value, wait=True, **send_kwargs)
 
             await interaction.response.send_message(
                 f"{EMOJIS['yes']} - Embed sent [via webhook]({self.wh_url.value}).",
@@ -718,25 +830,27 @@ class ImportJSONModal(discord.ui.Modal):
         style=discord.TextStyle.paragraph,
     )
 
-    async def get_mystb_file(self, paste_id: str) -> str:
+    async def get_mystb_file(
+        self, session: aiohttp.ClientSession, paste_id: str
+    ) -> str:
         headers = {
             "Authorization": "Bearer " + MYSTBIN_API_KEY,
         }
-        async with aiohttp.ClientSession() as session:
-            sesh = await session.get(
-                f"https://api.mystb.in/paste/{paste_id}", headers=headers
+        status_table = {
+            401: "Unauthorised",
+            404: "Not Found",
+            422: "Unprocessable Entity",
+        }
+        try:
+            data = await fetch_json(
+                session, f"https://api.mystb.in/paste/{paste_id}", headers=headers
+            )
+        except aiohttp.ClientResponseError as exc:
+            raise ValueError(
+                f"Unable to fetch from mystb.in, API Returned {exc.status}: {status_table.get(exc.status, exc.message)}"
             )
-            status_table = {
-                401: "Unauthorised",
-                404: "Not Found",
-                422: "Unprocessable Entity",
-            }
-            if sesh.status != 200:
-                raise ValueError(
-                    f"Unable to fetch from mystb.in, API Returned {sesh.status}: {status_table[sesh.status]}"
-                )
 
-        json_str = json.loads(await sesh.content.read())["files"][0]["content"]
+        json_str = data["files"][0]["content"]
         return json_str
 
     async def on_submit(self, interaction: discord.Interaction):
@@ -752,7 +866,8 @@ class ImportJSONModal(discord.ui.Modal):
                 )
 
             json_value = await self.get_mystb_file(
-                self.json_or_mystbin.value.lstrip("https://mystb.in/")
+                interaction.client.session,
+                self.json_or_mystbin.value.lstrip("https://mystb.in/"),
             )
 
         to_dict = json.loads(
@@ -761,12 +876,14 @@ class ImportJSONModal(discord.ui.Modal):
             parse_float=lambda x: float(x),
         )
         embed = discord.Embed.from_dict(to_dict)
+        tally = EmbedTally(embed)
 
-        if len(embed) <= 0 or len(embed) > 6000:
+        if tally.characters <= 0:
             raise ValueError("Embed length is not 0-6000 characters long.")
 
         self.parent_view.embed = embed
-        self.parent_view.update_counters()
+        self.parent_view.tally = tally
+        await self.parent_view.commit()
 
         await interaction.edit_original_response(embed=embed, view=self.parent_view)
         await interaction.followup.send(
@@ -777,6 +894,8 @@ class ImportJSONModal(discord.ui.Modal):
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
     ) -> None:
+        await self.parent_view.discard(error)
+
         if isinstance(error, ValueError) or isinstance(
             error, discord.errors.HTTPException
         ):
@@ -792,16 +911,87 @@ class ImportJSONModal(discord.ui.Modal):
             raise error
 
 
-class EmbedBuilderView(BaseView):
-    def __init__(self, *, timeout: int, target: discord.Interaction):
-        self.bot = target.client
-        super().__init__(timeout=timeout, target=target)
+class EmbedBuilderView(PersistentView):
+    kind = "embed_builder"
 
-        self.embed = discord.Embed()
+    def __init__(
+        self,
+        *,
+        timeout: int,
+        target: Optional[discord.Interaction] = None,
+        embed: Optional[discord.Embed] = None,
+        tally: Optional[EmbedTally] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(timeout=timeout, target=target, **kwargs)
+        self.bot = self.client
+
+        self.embed = embed or discord.Embed()
+        self.history = EmbedHistory(self.embed)
+        self.tally = tally or EmbedTally(self.embed)
+
+    def approximate_size(self) -> int:
+        # snapshots share their strings, so the characters count about once
+        return (
+            super().approximate_size()
+            + self.tally.characters
+            + SNAPSHOT_SIZE * len(self.history)
+        )
 
     def update_counters(self):
-        self.character_counter.label = f"{len(self.embed)}/6000 Characters"
-        self.field_counter.label = f"{len(self.embed.fields)}/25 Fields"
+        self.character_counter.label = (
+            f"{self.tally.characters}/{MAX_CHARACTERS} Characters"
+        )
+        self.field_counter.label = f"{self.tally.fields}/{MAX_FIELDS} Fields"
+
+        self.undo_btn.disabled = not self.history.can_undo
+        self.redo_btn.disabled = not self.history.can_redo
+
+    def state(self) -> ViewState:
+        # the undo history stays with the live view
+        return {"e": self.history.current}
+
+    @classmethod
+    async def from_state(
+        cls, interaction: discord.Interaction, state: ViewState, **kwargs: Any
+    ) -> "EmbedBuilderView":
+        view = cls(timeout=600, embed=restore(state["e"]), **kwargs)
+        view.update_counters()
+
+        cog = interaction.client.get_cog("Embed")
+        if cog is not None:
+            cog.builders[interaction.guild_id, view.author_id] = view
+
+        return view
+
+    async def commit(self):
+        """Record the current embed as a step that can be undone"""
+        self.history.push(self.embed)
+        self.update_counters()
+        await self.save()
+
+    def rollback(self):
+        """Throw away edits made since the last commit"""
+        self.embed = self.history.restore()
+        self.tally.reset(self.embed)
+        self.update_counters()
+
+    async def discard(self, error: Exception):
+        """Throw away an edit that failed with `error`"""
+        if isinstance(error, discord.HTTPException):
+            # Discord rejected an edit that was already committed
+            self.history.drop()
+            self.rollback()
+            return await self.save()
+
+        self.rollback()
+
+    async def show_embed(self, interaction: discord.Interaction):
+        # an empty embed can't be sent, so the help embed stands in for it
+        await interaction.response.edit_message(
+            embed=self.embed if self.embed else Embed.generate_help_embed(),
+            view=self,
+        )
 
     @discord.ui.button(
         label="Edit:", style=discord.ButtonStyle.gray, disabled=True, row=0
@@ -857,7 +1047,7 @@ class EmbedBuilderView(BaseView):
     async def add_field(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed.fields) == 25:
+        if self.tally.fields >= MAX_FIELDS:
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed reached maximum of 25 fields.",
                 ephemeral=True,
@@ -874,15 +1064,13 @@ class EmbedBuilderView(BaseView):
     async def delete_field(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed.fields) == 0:
+        if self.tally.fields == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - There are no fields to delete.", ephemeral=True
             )
         view = BaseView(timeout=180, target=interaction)
         view.add_item(
-            DeleteFieldDropdown(
-                _embed=self.embed, original_msg=interaction.message, parent_view=self
-            ),
+            DeleteFieldDropdown(original_msg=interaction.message, parent_view=self),
         )
         await interaction.response.send_message(
             f"{EMOJIS['white_minus']} - Choose a field to delete:",
@@ -896,7 +1084,7 @@ class EmbedBuilderView(BaseView):
     async def edit_field(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed.fields) == 0:
+        if self.tally.fields == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - There are no fields to edit.", ephemeral=True
             )
@@ -904,7 +1092,6 @@ class EmbedBuilderView(BaseView):
         view = BaseView(timeout=180, target=interaction)
         view.add_item(
             EditFieldDropdown(
-                _embed=self.embed,
                 parent_view=self,
                 original_msg=interaction.message,
             ),
@@ -925,15 +1112,15 @@ class EmbedBuilderView(BaseView):
     async def send_to_channel(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed) == 0:
+        if self.tally.characters == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed is empty!", ephemeral=True
             )
 
         view = BaseView(timeout=180, target=interaction)
-        view.add_item(SendToChannelSelect(_embed=self.embed, bot=self.bot))
+        view.add_item(SendToChannelSelect(parent_view=self, bot=self.bot))
         await interaction.response.send_message(
-            f"{EMOJIS['channel_text']} - Choose a channel to send the embed to:",
+            f"{EMOJIS['channel_text']} - Choose the channels to send the embed to:",
             view=view,
             ephemeral=True,
         )
@@ -942,7 +1129,7 @@ class EmbedBuilderView(BaseView):
     async def send_via_webhook(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed) == 0:
+        if self.tally.characters == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed is empty!", ephemeral=True
             )
@@ -953,7 +1140,7 @@ class EmbedBuilderView(BaseView):
     async def send_to_dm(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed) == 0:
+        if self.tally.characters == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed is empty!", ephemeral=True
             )
@@ -992,13 +1179,19 @@ class EmbedBuilderView(BaseView):
             value=f"**Export JSON**: Export the embed to discord-valid JSON format.\n"
             f"**Import JSON**: Import the embed from discord-valid JSON format.",
         )
+        em2.add_field(
+            name="Templates",
+            inline=False,
+            value="`/embed save <name>`: Save this embed as a template of the server.\n"
+            "`/embed load <name>`: Open a new builder from a saved template.",
+        )
         await interaction.response.send_message(embeds=[em1, em2], ephemeral=True)
 
     @discord.ui.button(label="Export JSON", style=discord.ButtonStyle.gray, row=3)
     async def export_json(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if len(self.embed) == 0:
+        if self.tally.characters == 0:
             return await interaction.response.send_message(
                 f"{EMOJIS['no']} - Embed is empty!", ephemeral=True
             )
@@ -1025,6 +1218,38 @@ class EmbedBuilderView(BaseView):
         await interaction.response.defer()
         await self.stop(interaction)
 
+    @discord.ui.button(
+        label="Undo", style=discord.ButtonStyle.gray, disabled=True, row=4
+    )
+    async def undo_btn(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        embed = self.history.undo()
+        if embed is None:
+            return await interaction.response.defer()
+
+        self.embed = embed
+        self.tally.reset(embed)
+        self.update_counters()
+        await self.save()
+        await self.show_embed(interaction)
+
+    @discord.ui.button(
+        label="Redo", style=discord.ButtonStyle.gray, disabled=True, row=4
+    )
+    async def redo_btn(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        embed = self.history.redo()
+        if embed is None:
+            return await interaction.response.defer()
+
+        self.embed = embed
+        self.tally.reset(embed)
+        self.update_counters()
+        await self.save()
+        await self.show_embed(interaction)
+
     @discord.ui.button(
         label="0/6000 Characters",
         disabled=True,
@@ -1052,6 +1277,30 @@ class Embed(commands.Cog):
     def __init__(self, bot: Orbyt):
         self.bot = bot
 
+        # (guild id, user id) -> their latest builder there, for /embed save
+        self.builders: "weakref.WeakValueDictionary[BuilderKey, EmbedBuilderView]" = (
+            weakref.WeakValueDictionary()
+        )
+        # (guild id, name) -> (embed state, characters, fields)
+        self.templates: LRUCache[
+            Tuple[int, str], Tuple[EmbedState, int, int]
+        ] = LRUCache(TEMPLATE_CACHE_SIZE)
+
+    async def cog_load(self) -> None:
+        self.bot.invalidations.subscribe("embed_templates", self.templates)
+
+        # answers presses on builders whose view is gone, e.g. after a restart
+        self.restorer = ViewRestorer(EmbedBuilderView)
+        self.bot.add_view(self.restorer)
+
+    async def cog_unload(self) -> None:
+        self.restorer.stop()
+        self.bot.invalidations.unsubscribe("embed_templates")
+
+    embed = app_commands.Group(
+        name="embed", description="Save and load embed templates of the server"
+    )
+
     @staticmethod
     def generate_help_embed() -> discord.Embed:
         emb = discord.Embed(
@@ -1090,10 +1339,111 @@ class Embed(commands.Cog):
         interaction: discord.Interaction,
     ):
         """Interactive Embed builder"""
+        view = EmbedBuilderView(timeout=600, target=interaction)
+        self.builders[interaction.guild_id, interaction.user.id] = view
+
         await interaction.response.send_message(
             embed=self.generate_help_embed(),
-            view=EmbedBuilderView(timeout=600, target=interaction),
+            view=view,
         )
+        await view.save()
+
+    @embed.command(name="save", extras={"ephemeral": True})
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def embed_save(
+        self, interaction: discord.Interaction, name: app_commands.Range[str, 1, 50]
+    ):
+        """Save the embed of your open embed builder as a template
+
+        Parameters
+        -----------
+        name : str
+            The name to save the template as
+        """
+        view = self.builders.get((interaction.guild_id, interaction.user.id))
+
+        if view is None or view.is_finished():
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - You don't have an open embed builder in this server, use `/embed-builder` first.",
+                ephemeral=True,
+            )
+
+        if view.tally.characters == 0:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Embed is empty!", ephemeral=True
+            )
+
+        name = name.lower()
+        state = snapshot(view.embed)
+        now_timestamp = round(discord.utils.utcnow().timestamp())
+
+        async with self.bot.pool.acquire() as c:
+            async with c.transaction():
+                await c.execute(
+                    queries.TEMPLATE_UPSERT,
+                    interaction.guild.id,
+                    name,
+                    json.dumps(state, separators=(",", ":")),
+                    view.tally.characters,
+                    view.tally.fields,
+                    interaction.user.id,
+                    now_timestamp,
+                )
+                await self.bot.invalidations.publish(
+                    c, "embed_templates", (interaction.guild.id, name)
+                )
+
+        # after the commit, a load in flight may have read the old row
+        self.templates.pop((interaction.guild.id, name))
+
+        await interaction.response.send_message(
+            f"{EMOJIS['yes']} - Saved template `{name}`", ephemeral=True
+        )
+
+    @embed.command(name="load")
+    async def embed_load(self, interaction: discord.Interaction, name: str):
+        """Open an embed builder from a saved template
+
+        Parameters
+        -----------
+        name : str
+            The name of the template to load
+        """
+        key = (interaction.guild.id, name.lower())
+        template = self.templates.get(key)
+        generation = self.templates.generation
+
+        if template is None:
+            async with self.bot.pool.acquire() as c:
+                data = await c.fetchone(
+                    queries.TEMPLATE_BY_NAME,
+                    *key,
+                )
+
+            if not data:
+                return await interaction.response.send_message(
+                    f"{EMOJIS['no']} - Template `{name}` not found", ephemeral=True
+                )
+
+            # validated when saved, so only the counts are read back
+            template = (json.loads(data[0]), data[1], data[2])
+            if self.templates.generation == generation:
+                self.templates.put(key, template)
+
+        state, characters, fields = template
+        embed = restore(state)
+
+        view = EmbedBuilderView(
+            timeout=600,
+            target=interaction,
+            embed=embed,
+            tally=EmbedTally(characters=characters, fields=fields),
+        )
+        view.update_counters()
+        self.builders[interaction.guild_id, interaction.user.id] = view
+
+        await interaction.response.send_message(embed=embed, view=view)
+        await view.save()
 
 
 async def setup(bot: Orbyt):
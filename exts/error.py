@@ -25,6 +25,8 @@ from discord import app_commands
 from discord.ext import commands
 
 from bot import Orbyt
+from .util.admission import BUSY_MESSAGE, Overloaded
+from .util.concurrency import ConcurrencyLimited, release
 from .util.constants import EMOJIS
 
 
@@ -54,14 +56,17 @@ class GlobalError(commands.Cog):
         elif isinstance(error, commands.NotOwner):
             await ctx.send(f"{EMOJIS['no']} - Only developers can use this command.")
         else:
+            self.bot.error_log.record(error, f"command {ctx.command}")
             await ctx.send(
                 f"⚠️ - Unexpected error, report to developers: ```py\n{str(error)}\n```"
             )
-            raise error
 
     async def on_app_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ):
+        # a check after a concurrency limit failed, the callback never ran
+        release(interaction)
+
         if isinstance(error, app_commands.CommandOnCooldown):
             await interaction.response.send_message(
                 f"⏰ - Command is on cooldown!\n```py\n{str(error)}\n```",
@@ -90,6 +95,16 @@ class GlobalError(commands.Cog):
                 f"{EMOJIS['no']} - You are missing required roles!\n```py\n{str(error)}\n```",
             )
 
+        elif isinstance(error, Overloaded):
+            await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+
+        elif isinstance(error, ConcurrencyLimited):
+            await interaction.response.send_message(
+                "⏳ - Too many people are using this command right now, "
+                "please try again in a moment.",
+                ephemeral=True,
+            )
+
         elif isinstance(error, app_commands.CheckFailure):
             await interaction.response.send_message(
                 f"{EMOJIS['no']} - Check failed! (Suggested to report to developers)\n```py\n{str(error)}\n```",
@@ -97,11 +112,16 @@ class GlobalError(commands.Cog):
             )
 
         else:
+            # counted before answering, which fails if the handler responded
+            command = interaction.command
+            self.bot.error_log.record(
+                error,
+                f"/{command.qualified_name}" if command else str(interaction.type),
+            )
             await interaction.response.send_message(
                 f"⚠️ - Unknown Error, please report to developers:\n```py\n{str(error)}\n```",
                 ephemeral=True,
             )
-            raise error
 
 
 async def setup(bot: Orbyt):
@@ -30,6 +30,9 @@ from discord.ext import commands
 from discord import app_commands
 from PIL import Image, ImageDraw, ImageFont
 
+from .util.admission import expensive
+from .util.concurrency import max_concurrency
+from .util.scheduler import Priority
 from .util.constants import EMOJIS
 from .util.views import BaseView
 from .util.text_format import truncate
@@ -125,6 +128,9 @@ class SendCardConfirm(BaseView):
 
         super().__init__(timeout=timeout, target=target)
 
+    def approximate_size(self) -> int:
+        return super().approximate_size() + self.card_img.getbuffer().nbytes
+
     @discord.ui.button(
         label="Send to User",
         style=discord.ButtonStyle.green,
@@ -182,8 +188,10 @@ class Festive(commands.Cog):
         name="card", description="Send festive cards to users in the server!"
     )
 
-    @card.command(name="christmas")
+    @card.command(name="christmas", extras={"ephemeral": True})
     @app_commands.checks.dynamic_cooldown(image_cooldown)
+    @max_concurrency(4, per_guild=2)
+    @expensive()
     async def christmas(
         self,
         interaction: discord.Interaction,
@@ -220,7 +228,7 @@ class Festive(commands.Cog):
             color or "Blue",
         )
 
-        card = await self.bot.loop.run_in_executor(None, gen_card)
+        card = await self.bot.scheduler.run(Priority.BACKGROUND, gen_card)
 
         view = SendCardConfirm(
             card_img=card,
@@ -31,6 +31,7 @@ from discord.ext import commands
 from bot import Orbyt
 from .util.constants import EMOJIS
 from .util.views import BaseView
+from .util.fetch import fetch_json
 
 
 class Trivia:
@@ -113,21 +114,22 @@ class TriviaInit(BaseView):
 
     async def resolve_trivia_questions(
         self,
+        session: aiohttp.ClientSession,
         category: int,
         difficulty: Literal["easy", "medium", "hard", ""],
         amount: int,
     ):
-        async with aiohttp.ClientSession() as session:
-            data = await session.get(
-                f"https://opentdb.com/api.php",
-                params={
-                    "amount": amount,
-                    "category": category,
-                    "difficulty": difficulty,
-                },
-            )
-            if data["response_code"] != 0:
-                return None
+        data = await fetch_json(
+            session,
+            "https://opentdb.com/api.php",
+            params={
+                "amount": amount,
+                "category": category,
+                "difficulty": difficulty,
+            },
+        )
+        if data["response_code"] != 0:
+            return None
 
         resolved = []
         for que in data["results"]:
@@ -155,8 +157,9 @@ class Games(commands.GroupCog, name="games"):
         self.bot = bot
 
     async def resolve_trivia_categories(self):
-        async with aiohttp.ClientSession() as session:
-            data = await session.get("https://opentdb.com/api_category.php")
+        data = await fetch_json(
+            self.bot.session, "https://opentdb.com/api_category.php"
+        )
 
         categories = data["trivia_categories"]
 
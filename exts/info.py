@@ -19,6 +19,7 @@
 """
 Information Related Commands
 """
+import math
 import time
 from typing import Optional
 
@@ -28,6 +29,7 @@ from discord.ext import commands
 
 from bot import Orbyt
 from .util.constants import EMOJIS, SECONDARY_COLOR
+from .util.cluster import fetch_cluster_stats
 
 
 class Info(commands.Cog):
@@ -55,8 +57,34 @@ class Info(commands.Cog):
             + f"\n{EMOJIS['network']} **Round Trip Latency:** {round((after - before) * 1000)}ms"
         )
 
+        if self.bot.cluster is not None:
+            embed.add_field(name="Clusters", value=await self.cluster_summary())
+
         await interaction.edit_original_response(embed=embed)
 
+    async def cluster_summary(self) -> str:
+        """One line per cluster from their last heartbeats"""
+        lines = []
+        guilds = 0
+        for stats in await fetch_cluster_stats(self.bot.pool):
+            current = stats.cluster_id == self.bot.cluster.cluster_id
+            if not (stats.alive or current):
+                lines.append(f"{EMOJIS['dnd']} {stats.shards}: unresponsive")
+                continue
+
+            latency = self.bot.latency if current else stats.latency
+            count = len(self.bot.guilds) if current else stats.guilds
+            guilds += count
+            lines.append(
+                f"{EMOJIS['online']} {stats.shards}: "
+                + (f"{round(latency * 1000)}ms" if math.isfinite(latency) else "N/A")
+                + f", {count} guilds"
+                + (" **(this)**" if current else "")
+            )
+
+        lines.append(f"**Total:** {guilds} guilds")
+        return "\n".join(lines)[:1024]
+
     info = app_commands.Group(name="info", description="Information of Discord Objects")
 
     @info.command(name="server")
@@ -20,23 +20,72 @@
 A Extension to help with tags
 """
 
-from typing import List
+import io
+import logging
+import tempfile
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from datetime import datetime
 
 import discord
 from sqlite3 import Row
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import TextInput, Modal
 
 
 from bot import Orbyt
 from .util.text_format import truncate
 from .util.constants import EMOJIS, SECONDARY_COLOR, CONTRAST_COLOR
+from .util.admission import expensive
+from .util.concurrency import max_concurrency
 from .util.paginator import CustomPaginator
+from .util.storage import TagStore
+from .util.tag_io import (
+    MAX_IMPORT_SIZE,
+    export_tags,
+    import_tags,
+    iter_csv,
+    iter_json_array,
+)
+from .util.views import PersistentView, ViewRestorer
+from .util.view_state import ViewState
 
+USAGE_FLUSH_INTERVAL = 60  # seconds between write-behind flushes of tag usage
+
+log = logging.getLogger("orbyt.tags")
+
+
+# what a listing of tags shows, `(kind, argument)`
+Source = Tuple[str, Any]
+
+
+async def fetch_listing(store: TagStore, guild_id: int, source: Source) -> List[Row]:
+    """Runs the query behind a listing of tags
+
+    Parameters
+    -----------
+    store: :class:`TagStore`
+        The store to query
+    guild_id: :class:`int`
+        The ID of the guild
+    source: Tuple[:class:`str`, Any]
+        One of `("list", None)`, `("search", query)`, `("author", user_id)`
+        or `("top", None)`
+    """
+    kind, arg = source
+
+    if kind == "search":
+        return await store.search(guild_id, arg)
+    if kind == "author":
+        return await store.by_author(guild_id, arg)
+    if kind == "top":
+        return await store.top(guild_id)
+    return await store.list(guild_id)
+
+
+class TagPages(PersistentView, CustomPaginator[int, Orbyt]):
+    kind = "tag_pages"
 
-class TagPages(CustomPaginator[int, Orbyt]):
     def __init__(
         self,
         *,
@@ -46,8 +95,11 @@ class TagPages(CustomPaginator[int, Orbyt]):
         target,
         timeout=180,
         title: str = "Tags",
+        source: Source = ("list", None),
+        **kwargs: Any,
     ) -> None:
         self.title = title
+        self.source = source
 
         super().__init__(
             entries=entries,
@@ -55,7 +107,43 @@ class TagPages(CustomPaginator[int, Orbyt]):
             clamp_pages=clamp_pages,
             target=target,
             timeout=timeout,
+            **kwargs,
+        )
+
+    def state(self) -> ViewState:
+        # the listing is queried again on restore, only where it was is kept
+        return {
+            "p": self._current_page_index,
+            "t": self.title,
+            "s": self.source[0],
+            "q": self.source[1],
+        }
+
+    @classmethod
+    async def from_state(
+        cls, interaction: discord.Interaction, state: ViewState, **kwargs: Any
+    ) -> Optional["TagPages"]:
+        source = (state["s"], state["q"])
+        entries = await fetch_listing(
+            interaction.client.tags, interaction.guild.id, source
         )
+        if not entries:
+            return None
+
+        view = cls(
+            entries=entries,
+            target=None,
+            timeout=60,
+            title=state["t"],
+            source=source,
+            **kwargs,
+        )
+        view._skip_to_page(min(state["p"], view.max_page - 1))
+
+        return view
+
+    async def on_page_change(self) -> None:
+        await self.save()
 
     async def format_page(self, entries: List[Row]) -> discord.Embed:
         embed = discord.Embed(
@@ -74,6 +162,28 @@ class TagPages(CustomPaginator[int, Orbyt]):
         return embed
 
 
+class TopTagPages(TagPages):
+    kind = "top_tag_pages"
+
+    async def format_page(self, entries: List[Row]) -> discord.Embed:
+        offset = (self.current_page - 1) * self.per_page
+
+        embed = discord.Embed(
+            title=self.title,
+            color=SECONDARY_COLOR,
+            description="\n".join(
+                [
+                    f"**{offset+i+1}.** {discord.utils.escape_markdown(entry[0])} - {entry[2]} uses (ID: {entry[1]})"
+                    for i, entry in enumerate(entries)
+                ]
+            ),
+        )
+
+        embed.set_footer(text=f"Page {self.current_page}/{self.total_pages}")
+
+        return embed
+
+
 class AddTag(Modal):
     """Add a tag"""
 
@@ -97,42 +207,34 @@ class AddTag(Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT content FROM tags WHERE name = LOWER($1) AND guild = $2",
-                self.name.value,
-                interaction.guild.id,
-            )
-
-            if data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - Tag `{self.name.value}` already exists",
-                    ephemeral=True,
-                )
-
-            now_timestamp = round(discord.utils.utcnow().timestamp())
+        now_timestamp = round(discord.utils.utcnow().timestamp())
+
+        created = await self.bot.tags.create(
+            interaction.guild.id,
+            self.name.value,
+            self.content.value,
+            interaction.user.id,
+            now_timestamp,
+        )
 
-            await c.execute(
-                "INSERT INTO tags (name, content, guild, author, created_at) VALUES (LOWER($1), $2, $3, $4, $5)",
-                self.name.value,
-                self.content.value,
-                interaction.guild.id,
-                interaction.user.id,
-                now_timestamp,
+        if not created:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Tag `{self.name.value}` already exists",
+                ephemeral=True,
             )
 
-            em = discord.Embed(
-                description=f"{discord.utils.escape_markdown(self.content.value)}",
-                color=SECONDARY_COLOR,
-            )
-            em.add_field(
-                name="Tag created at:",
-                value=f"<t:{now_timestamp}:F> (<t:{now_timestamp}:R>)",
-            )
+        em = discord.Embed(
+            description=f"{discord.utils.escape_markdown(self.content.value)}",
+            color=SECONDARY_COLOR,
+        )
+        em.add_field(
+            name="Tag created at:",
+            value=f"<t:{now_timestamp}:F> (<t:{now_timestamp}:R>)",
+        )
 
-            await interaction.response.send_message(
-                f"{EMOJIS['yes']} - Tag `{self.name.value}` added", embed=em
-            )
+        await interaction.response.send_message(
+            f"{EMOJIS['yes']} - Tag `{self.name.value}` added", embed=em
+        )
 
 
 class EditTag(Modal):
@@ -141,12 +243,10 @@ class EditTag(Modal):
     def __init__(
         self,
         bot: Orbyt,
-        query: str,
         _name: str,
         author_bypass: bool,
     ) -> None:
         self.bot = bot
-        self.query = query
 
         self._name = _name
         self.author_bypass = author_bypass
@@ -162,49 +262,106 @@ class EditTag(Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        async with self.bot.pool.acquire() as c:
-            if self.author_bypass:  # True
-                await c.execute(
-                    self.query,
-                    self.new_content.value,
-                    self._name,
-                    interaction.guild.id,
-                )
-            else:
-                await c.execute(
-                    self.query,
-                    self.new_content.value,
-                    self._name,
-                    interaction.guild.id,
-                    interaction.user.id,
-                )
+        await self.bot.tags.set_content(
+            interaction.guild.id,
+            self._name,
+            self.new_content.value,
+            # None lets moderators edit tags of others
+            author=None if self.author_bypass else interaction.user.id,
+        )
 
-            embed = discord.Embed(
-                description=discord.utils.escape_markdown(self.new_content.value),
-                color=CONTRAST_COLOR,
-            )
+        embed = discord.Embed(
+            description=discord.utils.escape_markdown(self.new_content.value),
+            color=CONTRAST_COLOR,
+        )
 
-            await interaction.response.send_message(
-                content=f"{EMOJIS['yes']} - Tag `{self._name}` edited {'[ Moderator Permissions ]' if self.author_bypass else ''}",
-                embed=embed,
-            )
+        await interaction.response.send_message(
+            content=f"{EMOJIS['yes']} - Tag `{self._name}` edited {'[ Moderator Permissions ]' if self.author_bypass else ''}",
+            embed=embed,
+        )
 
 
 class Tags(commands.GroupCog, name="tag"):
     def __init__(self, bot: Orbyt):
         self.bot = bot
 
-    def bypass_query(self, interaction: discord.Interaction):
-        author_bypass = (
+        # tag id -> [guild, uses, last_used], written behind by `flush_usage`
+        self._usage: Dict[int, List[int]] = {}
+
+    async def cog_load(self) -> None:
+        self.flush_usage_loop.start()
+
+        # answers presses on listings whose view is gone, e.g. after a restart
+        self.restorers = [ViewRestorer(TagPages), ViewRestorer(TopTagPages)]
+        for restorer in self.restorers:
+            self.bot.add_view(restorer)
+
+    async def cog_unload(self) -> None:
+        for restorer in self.restorers:
+            restorer.stop()
+
+        self.flush_usage_loop.cancel()
+        await self.flush_usage()
+
+    def record_usage(self, tag_id: int, guild_id: int) -> None:
+        """Count a use of a tag in memory, to be flushed later
+
+        Parameters
+        -----------
+        tag_id: :class:`int`
+            The ID of the tag that was used
+        guild_id: :class:`int`
+            The ID of the guild the tag belongs to
+        """
+        now_timestamp = round(discord.utils.utcnow().timestamp())
+
+        entry = self._usage.get(tag_id)
+        if entry is None:
+            self._usage[tag_id] = [guild_id, 1, now_timestamp]
+        else:
+            entry[1] += 1
+            entry[2] = now_timestamp
+
+    async def flush_usage(self) -> int:
+        """Write all buffered tag usage to the store at once
+
+        Returns
+        --------
+        :class:`int`
+            The number of tags whose usage was written
+        """
+        if not self._usage:
+            return 0
+
+        pending, self._usage = self._usage, {}
+
+        try:
+            await self.bot.tags.add_usage(pending)
+        except Exception:
+            # keep the counts for the next flush instead of losing them
+            for tag_id, (guild, uses, last_used) in pending.items():
+                entry = self._usage.setdefault(tag_id, [guild, 0, last_used])
+                entry[1] += uses
+                entry[2] = max(entry[2], last_used)
+            raise
+
+        return len(pending)
+
+    @tasks.loop(seconds=USAGE_FLUSH_INTERVAL)
+    async def flush_usage_loop(self) -> None:
+        try:
+            await self.flush_usage()
+        except Exception:
+            log.exception("Flushing tag usage failed, retrying")
+
+    def author_bypass(self, interaction: discord.Interaction) -> bool:
+        """Whether the user can manage tags of others"""
+        return (
             interaction.user.guild_permissions.manage_guild
             or interaction.user.guild_permissions.manage_messages
             or interaction.user.id == self.bot.owner_id
         )
 
-        finished_query = "AND author = $3" if not author_bypass else ""
-
-        return [author_bypass, finished_query]
-
     @app_commands.command(name="add")
     async def tag_add(self, interaction: discord.Interaction):
         """Add a tag to the server (Run in Modal)"""
@@ -226,23 +383,19 @@ class Tags(commands.GroupCog, name="tag"):
             Whether to display the content of the tag without markdown
         """
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT content FROM tags WHERE name = LOWER($1) AND guild = $2",
-                name,
-                interaction.guild.id,
+        data = await self.bot.tags.view(interaction.guild.id, name)
+
+        # tag exists?
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
             )
 
-            # tag exists?
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
-                )
+        tag_id, content = data
+        self.record_usage(tag_id, interaction.guild.id)
 
         if raw:
-            content = discord.utils.escape_markdown(data[0])
-        else:
-            content = data[0]
+            content = discord.utils.escape_markdown(content)
 
         await interaction.response.send_message(
             content=discord.utils.escape_mentions(content)
@@ -259,35 +412,29 @@ class Tags(commands.GroupCog, name="tag"):
         """
 
         # check if user has manage_guild or manage_messages permssion or is bot owner
-        bypass = self.bypass_query(interaction)
-        author_bypass = bypass[0]
-
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT content, author FROM tags WHERE name = LOWER($1) AND guild = $2",
-                name,
-                interaction.guild.id,
-            )
+        author_bypass = self.author_bypass(interaction)
 
-            # if tag exists
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
-                )
+        data = await self.bot.tags.info(interaction.guild.id, name)
 
-            # check if user can delete tag + return
-            if not author_bypass and (data[1] != interaction.user.id):
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - You can only remove your own tags",
-                    ephemeral=True,
-                )
+        # if tag exists
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
+            )
 
-        query = f"DELETE FROM tags WHERE name = LOWER($1) AND guild = $2 {bypass[1]}"
+        # check if user can delete tag + return
+        if not author_bypass and (data.author != interaction.user.id):
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - You can only remove your own tags",
+                ephemeral=True,
+            )
 
-        if author_bypass:  # if not author but mod
-            await c.execute(query, name, interaction.guild.id)
-        else:  # if author
-            await c.execute(query, name, interaction.guild.id, interaction.user.id)
+        await self.bot.tags.delete(
+            interaction.guild.id,
+            name,
+            # if not author but mod, any author
+            author=None if author_bypass else interaction.user.id,
+        )
 
         await interaction.response.send_message(
             f"{EMOJIS['yes']} - Tag `{name}` removed {'[ Moderator Permission ]' if author_bypass else ''}",
@@ -297,27 +444,24 @@ class Tags(commands.GroupCog, name="tag"):
     async def tag_list(self, interaction: discord.Interaction):
         """View all tags of the server"""
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchall(
-                "SELECT name, id FROM tags WHERE guild = $1",
-                interaction.guild.id,
-            )
+        data = await self.bot.tags.list(interaction.guild.id)
 
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - No tags found", ephemeral=True
-                )
-
-            view = TagPages(
-                clamp_pages=True,
-                timeout=60,
-                entries=data,
-                target=interaction,
-                title=f"Tags in {interaction.guild.name}",
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - No tags found", ephemeral=True
             )
 
-            embed = await view.embed()
-            await interaction.response.send_message(embed=embed, view=view)
+        view = TagPages(
+            clamp_pages=True,
+            timeout=60,
+            entries=data,
+            target=interaction,
+            title=f"Tags in {interaction.guild.name}",
+        )
+
+        embed = await view.embed()
+        await interaction.response.send_message(embed=embed, view=view)
+        await view.save()
 
     @app_commands.command(name="edit")
     async def tag_edit(self, interaction: discord.Interaction, name: str):
@@ -329,32 +473,24 @@ class Tags(commands.GroupCog, name="tag"):
             The name of the tag to edit
         """
 
-        bypass = self.bypass_query(interaction)
-        author_bypass = bypass[0]
-
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT content, author FROM tags WHERE name = LOWER($1) AND guild = $2",
-                name,
-                interaction.guild.id,
-            )
+        author_bypass = self.author_bypass(interaction)
 
-            # tag exists?
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
-                )
+        data = await self.bot.tags.info(interaction.guild.id, name)
 
-            # check for tag owner or mod perms
-            if not author_bypass and (data[1] != interaction.user.id):
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - You don't have permission to edit this tag",
-                    ephemeral=True,
-                )
+        # tag exists?
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
+            )
 
-        query = f"UPDATE tags SET content = $1 WHERE name = LOWER($2) AND guild = $3 {bypass[1]}"
+        # check for tag owner or mod perms
+        if not author_bypass and (data.author != interaction.user.id):
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - You don't have permission to edit this tag",
+                ephemeral=True,
+            )
 
-        modal = EditTag(self.bot, query, name, author_bypass)
+        modal = EditTag(self.bot, name, author_bypass)
 
         await interaction.response.send_modal(modal)
 
@@ -368,29 +504,26 @@ class Tags(commands.GroupCog, name="tag"):
             The query by which to search for
         """
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchall(
-                "SELECT name, id FROM tags WHERE name LIKE $1 AND guild = $2 ORDER BY name ASC LIMIT 25",
-                f"%{query}%",
-                interaction.guild.id,
-            )
-
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - No tags found matching `{query}`",
-                    ephemeral=True,
-                )
+        data = await self.bot.tags.search(interaction.guild.id, query)
 
-            view = TagPages(
-                clamp_pages=True,
-                timeout=60,
-                entries=data,
-                target=interaction,
-                title=f"Tags matching {query}",
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - No tags found matching `{query}`",
+                ephemeral=True,
             )
-            emb = await view.embed()
 
-            await interaction.response.send_message(embed=emb, view=view)
+        view = TagPages(
+            clamp_pages=True,
+            timeout=60,
+            entries=data,
+            target=interaction,
+            title=f"Tags matching {query}",
+            source=("search", query),
+        )
+        emb = await view.embed()
+
+        await interaction.response.send_message(embed=emb, view=view)
+        await view.save()
 
     @app_commands.command(name="info")
     async def tag_info(self, interaction: discord.Interaction, name: str):
@@ -402,51 +535,45 @@ class Tags(commands.GroupCog, name="tag"):
             The name of the tag to view information about
         """
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT author, created_at FROM tags WHERE name = LOWER($1) AND guild = $2",
-                name,
-                interaction.guild.id,
-            )
+        data = await self.bot.tags.info(interaction.guild.id, name)
 
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
-                )
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - Tag `{name}` not found", ephemeral=True
+            )
 
-            _created_at = datetime.fromtimestamp(data[1])
+        _created_at = datetime.fromtimestamp(data.created_at)
 
-            embed = (
-                discord.Embed(title=f"Tag: `{name}` Information", color=SECONDARY_COLOR)
-                .add_field(
-                    name="Author",
-                    value=f"<@{data[0]}>",
-                )
-                .add_field(
-                    name="Created At",
-                    value=f"{discord.utils.format_dt(_created_at, 'F')} ({discord.utils.format_dt(_created_at, 'R')})",
-                )
+        embed = (
+            discord.Embed(title=f"Tag: `{name}` Information", color=SECONDARY_COLOR)
+            .add_field(
+                name="Author",
+                value=f"<@{data.author}>",
             )
+            .add_field(
+                name="Created At",
+                value=f"{discord.utils.format_dt(_created_at, 'F')} ({discord.utils.format_dt(_created_at, 'R')})",
+            )
+        )
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="random")
     async def tag_random(self, interaction: discord.Interaction):
         """View a random tag from the server"""
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchone(
-                "SELECT name, content FROM tags WHERE guild = $1 ORDER BY RANDOM() LIMIT 1",
-                interaction.guild.id,
+        data = await self.bot.tags.random(interaction.guild.id)
+
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - No tags found", ephemeral=True
             )
 
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - No tags found", ephemeral=True
-                )
+        name, content, tag_id = data
+        self.record_usage(tag_id, interaction.guild.id)
 
-            _content = f"{EMOJIS['dictionary']} - `{discord.utils.escape_mentions(data[0])}`\n\n{data[1]}"
+        _content = f"{EMOJIS['dictionary']} - `{discord.utils.escape_mentions(name)}`\n\n{content}"
 
-            await interaction.response.send_message(content=truncate(_content, 2000))
+        await interaction.response.send_message(content=truncate(_content, 2000))
 
     @app_commands.command(name="by-user")
     async def tag_user(self, interaction: discord.Interaction, user: discord.User):
@@ -458,28 +585,166 @@ class Tags(commands.GroupCog, name="tag"):
             The user to view the tags of
         """
 
-        async with self.bot.pool.acquire() as c:
-            data = await c.fetchall(
-                "SELECT name, id FROM tags WHERE guild = $1 AND author = $2",
-                interaction.guild.id,
-                user.id,
+        data = await self.bot.tags.by_author(interaction.guild.id, user.id)
+
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - No tags found from @{str(user)}",
+                ephemeral=True,
             )
 
-            if not data:
-                return await interaction.response.send_message(
-                    f"{EMOJIS['no']} - No tags found from @{str(user)}",
+        view = TagPages(
+            clamp_pages=True,
+            timeout=60,
+            entries=data,
+            target=interaction,
+            title=f"Tags from @{str(user)}",
+            source=("author", user.id),
+        )
+        emb = await view.embed()
+        await interaction.response.send_message(embed=emb, view=view)
+        await view.save()
+
+    @app_commands.command(name="top")
+    async def tag_top(self, interaction: discord.Interaction):
+        """View the most used tags of the server"""
+
+        data = await self.bot.tags.top(interaction.guild.id)
+
+        if not data:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - No tags have been used yet", ephemeral=True
+            )
+
+        view = TopTagPages(
+            clamp_pages=True,
+            timeout=60,
+            entries=data,
+            target=interaction,
+            title=f"Top Tags in {interaction.guild.name}",
+            source=("top", None),
+        )
+        emb = await view.embed()
+        await interaction.response.send_message(embed=emb, view=view)
+        await view.save()
+
+    @app_commands.command(name="export")
+    @max_concurrency(4, per_guild=1)
+    @expensive()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def tag_export(
+        self,
+        interaction: discord.Interaction,
+        format: Literal["JSON", "CSV"] = "JSON",
+    ):
+        """Export all tags of the server to a file
+
+        Parameters
+        -----------
+        format : Literal["JSON", "CSV"]
+            The format of the file (default: JSON)
+        """
+
+        await interaction.response.defer(thinking=True, ephemeral=True)
+
+        fmt = format.lower()
+
+        with tempfile.TemporaryFile() as fp:
+            count = await export_tags(self.bot.tags, interaction.guild.id, fp, fmt)
+
+            if not count:
+                return await interaction.followup.send(
+                    f"{EMOJIS['no']} - No tags found", ephemeral=True
+                )
+
+            size = fp.seek(0, io.SEEK_END)
+            fp.seek(0)
+
+            if size > interaction.guild.filesize_limit:
+                return await interaction.followup.send(
+                    f"{EMOJIS['no']} - The export is too large to upload ({size // 1024 // 1024}MB)",
                     ephemeral=True,
                 )
 
-            view = TagPages(
-                clamp_pages=True,
-                timeout=60,
-                entries=data,
-                target=interaction,
-                title=f"Tags from @{str(user)}",
+            await interaction.followup.send(
+                f"{EMOJIS['yes']} - Exported `{count}` tags",
+                file=discord.File(fp, filename=f"tags.{fmt}"),
+                ephemeral=True,
+            )
+
+    @app_commands.command(name="import")
+    @max_concurrency(2, per_guild=1)
+    @expensive()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def tag_import(
+        self,
+        interaction: discord.Interaction,
+        file: discord.Attachment,
+        conflict: Literal["Skip", "Overwrite", "Rename"] = "Skip",
+    ):
+        """Import tags from a JSON or CSV file made by /tag export
+
+        Parameters
+        -----------
+        file : discord.Attachment
+            The .json or .csv file to import
+        conflict : Literal["Skip", "Overwrite", "Rename"]
+            What to do with tags that already exist (default: Skip)
+        """
+        too_large = (
+            f"{EMOJIS['no']} - The file is too large, "
+            f"the limit is {MAX_IMPORT_SIZE // (1024 * 1024)} MB"
+        )
+        if file.size > MAX_IMPORT_SIZE:
+            return await interaction.response.send_message(too_large, ephemeral=True)
+
+        await interaction.response.defer(thinking=True)
+
+        with tempfile.TemporaryFile() as fp:
+            async with self.bot.session.get(file.url) as resp:
+                if resp.status != 200:
+                    return await interaction.followup.send(
+                        f"{EMOJIS['no']} - Couldn't download the file",
+                    )
+
+                size = 0
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    if size > MAX_IMPORT_SIZE:
+                        return await interaction.followup.send(too_large)
+                    fp.write(chunk)
+
+            fp.seek(0)
+            stream = io.TextIOWrapper(fp, encoding="utf-8", newline="")
+
+            if file.filename.lower().endswith(".csv"):
+                records = iter_csv(stream)
+            else:
+                records = iter_json_array(stream)
+
+            result = await import_tags(
+                self.bot.tags,
+                interaction.guild.id,
+                interaction.user.id,
+                records,
+                conflict=conflict.lower(),
+            )
+
+        summary = (
+            f"**Added:** {result.inserted} ({result.renamed} renamed)\n"
+            f"**Overwritten:** {result.overwritten}\n"
+            f"**Skipped:** {result.skipped}\n"
+            f"**Invalid:** {result.invalid}"
+        )
+
+        if result.error:
+            return await interaction.followup.send(
+                f"{EMOJIS['no']} - Import stopped early: `{result.error}`\n{summary}"
             )
-            emb = await view.embed()
-            await interaction.response.send_message(embed=emb, view=view)
+
+        await interaction.followup.send(
+            f"{EMOJIS['yes']} - Imported tags from `{file.filename}`\n{summary}"
+        )
 
 
 async def setup(bot: Orbyt):
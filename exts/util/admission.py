@@ -0,0 +1,196 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Admission control of expensive commands, driven by how far the bot lags behind
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import discord
+from discord import app_commands
+from discord.ext import tasks
+
+from .scheduler import Priority, Scheduler
+
+SAMPLE_INTERVAL = 0.25  # seconds between load samples
+MAX_LOOP_LAG = 0.2  # seconds the event loop may run late
+MAX_EXECUTOR_BACKLOG = 8  # jobs waiting for a thread of the default executor
+MAX_DB_BACKLOG = 32  # statements and acquires waiting on the database
+QUEUE_TIMEOUT = 1.0  # seconds an expensive command waits for the load to drop
+
+BUSY_MESSAGE = "⏳ - I'm busy right now, please try again in a moment."
+
+log = logging.getLogger("orbyt.admission")
+
+
+class Overloaded(app_commands.CheckFailure):
+    """An expensive command was turned away because the bot is overloaded"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Overloaded: {reason}")
+        self.reason = reason
+
+
+def executor_backlog(
+    loop: asyncio.AbstractEventLoop, scheduler: Optional[Scheduler] = None
+) -> int:
+    """Jobs waiting for a thread of the scheduler, or the loop's default executor"""
+    if scheduler is not None:
+        return sum(scheduler.queued(priority) for priority in Priority)
+
+    executor = getattr(loop, "_default_executor", None)
+    queue = getattr(executor, "_work_queue", None)
+    return queue.qsize() if queue is not None else 0
+
+
+def db_backlog(pool) -> int:
+    """Callers waiting for a connection of an :class:`asqlite.Pool` and
+    statements queued on its connections"""
+    waiting = len(getattr(getattr(pool, "_queue", None), "_getters", ()))
+    queued = sum(
+        worker._worker_queue.qsize() for worker in getattr(pool, "_workers", ())
+    )
+    return waiting + queued
+
+
+class AdmissionController:
+    """
+    Samples the load of the bot and holds back expensive commands while it
+    is past a threshold, so cheap ones keep being answered quickly.
+
+    An expensive command waits up to `queue_timeout` seconds for the load to
+    drop, and is refused with :class:`Overloaded` otherwise.
+
+    Parameters
+    -----------
+    pool
+        The database pool
+    scheduler: Optional[:class:`Scheduler`]
+        Whose thread pools to watch, instead of the default executor
+    max_loop_lag: :class:`float`
+        Seconds the event loop may run late
+    max_executor_backlog: :class:`int`
+        Jobs that may wait for a thread of the default executor
+    max_db_backlog: :class:`int`
+        Statements and acquires that may wait on the database
+    queue_timeout: :class:`float`
+        Seconds an expensive command waits for the load to drop
+    """
+
+    def __init__(
+        self,
+        pool,
+        scheduler: Optional[Scheduler] = None,
+        *,
+        max_loop_lag: float = MAX_LOOP_LAG,
+        max_executor_backlog: int = MAX_EXECUTOR_BACKLOG,
+        max_db_backlog: int = MAX_DB_BACKLOG,
+        queue_timeout: float = QUEUE_TIMEOUT,
+    ):
+        self.pool = pool
+        self.scheduler = scheduler
+        self.max_loop_lag = max_loop_lag
+        self.max_executor_backlog = max_executor_backlog
+        self.max_db_backlog = max_db_backlog
+        self.queue_timeout = queue_timeout
+
+        self.loop_lag = 0.0
+        self.executor_backlog = 0
+        self.db_backlog = 0
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+        self._last_sample: Optional[float] = None
+        self._calm = asyncio.Event()
+        self._calm.set()
+
+    def start(self) -> None:
+        self.sample.start()
+
+    def stop(self) -> None:
+        self.sample.cancel()
+        self._calm.set()  # let waiting commands through
+
+    @property
+    def overload(self) -> Optional[str]:
+        """What is past its threshold, `None` if nothing is"""
+        if self.loop_lag > self.max_loop_lag:
+            return f"event loop {self.loop_lag * 1000:.0f}ms behind"
+        if self.executor_backlog > self.max_executor_backlog:
+            return f"{self.executor_backlog} jobs waiting for a thread"
+        if self.db_backlog > self.max_db_backlog:
+            return f"{self.db_backlog} statements waiting on the database"
+        return None
+
+    @tasks.loop(seconds=SAMPLE_INTERVAL)
+    async def sample(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        now = loop.time()
+        if self._last_sample is not None:
+            # how much later than planned this iteration ran
+            lag = max(now - self._last_sample - SAMPLE_INTERVAL, 0.0)
+            self.loop_lag = 0.5 * self.loop_lag + 0.5 * lag
+        self._last_sample = now
+
+        self.executor_backlog = executor_backlog(loop, self.scheduler)
+        self.db_backlog = db_backlog(self.pool)
+
+        overload = self.overload
+        if overload is None:
+            self._calm.set()
+        elif self._calm.is_set():
+            self._calm.clear()
+            log.warning("Holding back expensive commands, %s", overload)
+
+    async def admit(self) -> None:
+        """
+        Waits until an expensive command may run.
+
+        Raises
+        -------
+        :class:`Overloaded`
+            The load didn't drop within `queue_timeout` seconds
+        """
+        if not self._calm.is_set():
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._calm.wait(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise Overloaded(self.overload or "still catching up") from None
+
+        self.admitted += 1
+
+
+def expensive():
+    """
+    A check that holds back a command while the bot is overloaded.
+
+    See :class:`AdmissionController`.
+    """
+
+    async def predicate(interaction: discord.Interaction) -> bool:
+        await interaction.client.admission.admit()
+        return True
+
+    return app_commands.check(predicate)
@@ -0,0 +1,182 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Automatic deferral of interactions whose handler is slow to respond
+"""
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+import discord
+
+AUTO_DEFER_AFTER = 2.0  # seconds a handler has to respond, of Discord's 3
+UNKNOWN_INTERACTION = 10062  # error code of a response past the deadline
+
+log = logging.getLogger("orbyt.auto_defer")
+
+# interactions that can be deferred, autocompletes can't
+_DEFERRABLE = (
+    discord.InteractionType.application_command,
+    discord.InteractionType.component,
+    discord.InteractionType.modal_submit,
+)
+
+
+def _replies_ephemeral(interaction: discord.Interaction) -> bool:
+    # commands answering privately are marked with extras={"ephemeral": True}
+    command = interaction.command
+    return command is not None and bool(command.extras.get("ephemeral"))
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()  # raised to the handler, if it still responds
+
+
+class AutoDeferredResponse(discord.InteractionResponse):
+    """
+    Stands in for the response of an interaction that was deferred for its
+    handler, turning the handler's responses into what's allowed after it.
+
+    :meth:`send_message` sends a followup, :meth:`edit_message` edits the
+    original response and :meth:`defer` does nothing. The calls wait until
+    the deferral went through.
+
+    The first followup of a command replaces its thinking message and keeps
+    that message's visibility. When the handler asks for the other one, the
+    thinking message is deleted first so the followup is sent as asked.
+    """
+
+    __slots__ = ("_deferring", "_ephemeral", "_thinking")
+
+    def __init__(
+        self,
+        parent: discord.Interaction,
+        deferring: asyncio.Task,
+        *,
+        ephemeral: bool = False,
+    ):
+        super().__init__(parent)
+        self._deferring = deferring
+        self._ephemeral = ephemeral
+        self._thinking = True
+
+    def is_done(self) -> bool:
+        return True
+
+    async def defer(self, **kwargs: Any) -> None:
+        await asyncio.shield(self._deferring)
+
+    async def send_message(
+        self,
+        content: Optional[Any] = None,
+        *,
+        delete_after: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        await asyncio.shield(self._deferring)
+
+        thinking = self._thinking and (
+            self.type is discord.InteractionResponseType.deferred_channel_message
+        )
+        self._thinking = False
+        if thinking and kwargs.get("ephemeral", False) != self._ephemeral:
+            await self._parent.delete_original_response()
+
+        msg = await self._parent.followup.send(content, wait=True, **kwargs)
+        if delete_after is not None:
+            await msg.delete(delay=delete_after)
+
+    async def edit_message(
+        self,
+        *,
+        delete_after: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        await asyncio.shield(self._deferring)
+
+        msg = await self._parent.edit_original_response(**kwargs)
+        if delete_after is not None:
+            await msg.delete(delay=delete_after)
+
+    async def send_modal(self, modal: discord.ui.Modal) -> None:
+        raise discord.InteractionResponded(self._parent)
+
+
+class AutoDefer:
+    """
+    Defers every interaction its handler hasn't responded to within
+    `budget` seconds, so slow handlers don't miss Discord's deadline.
+
+    Add :meth:`on_interaction` as a listener. A deferred handler's later
+    responses go through :class:`AutoDeferredResponse`. Commands are deferred
+    publicly, unless they are marked with `extras={"ephemeral": True}`.
+
+    Parameters
+    -----------
+    budget: :class:`float`
+        Seconds until an interaction is deferred
+    """
+
+    def __init__(self, budget: float = AUTO_DEFER_AFTER):
+        self.budget = budget
+
+        self.deferred = 0
+        # interactions that were past the deadline already when deferred
+        self.missed = 0
+
+    async def on_interaction(self, interaction: discord.Interaction) -> None:
+        if interaction.type not in _DEFERRABLE:
+            return
+
+        asyncio.get_running_loop().call_later(self.budget, self._expire, interaction)
+
+    def _expire(self, interaction: discord.Interaction) -> None:
+        response = interaction.response
+        if response.is_done():
+            return
+
+        ephemeral = _replies_ephemeral(interaction)
+        deferring = asyncio.create_task(self._defer(interaction, response, ephemeral))
+        deferring.add_done_callback(_retrieve)
+        interaction._cs_response = AutoDeferredResponse(
+            interaction, deferring, ephemeral=ephemeral
+        )
+
+    async def _defer(
+        self,
+        interaction: discord.Interaction,
+        response: discord.InteractionResponse,
+        ephemeral: bool,
+    ) -> None:
+        try:
+            await response.defer(ephemeral=ephemeral)
+        except discord.HTTPException as exc:
+            # the handler responded meanwhile, or it's too late
+            interaction._cs_response = response
+
+            if exc.code == UNKNOWN_INTERACTION:
+                self.missed += 1
+                log.warning(
+                    "Interaction %s missed its deadline", interaction.id, exc_info=exc
+                )
+            raise
+        else:
+            self.deferred += 1
+            interaction._cs_response._response_type = response.type
@@ -0,0 +1,150 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Concurrent sends to many channels with per-bucket scheduling
+"""
+
+import time
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+import discord
+
+T = TypeVar("T")
+
+BROADCAST_CONCURRENCY = 5  # requests in flight at once, across all buckets
+PROGRESS_INTERVAL = 1.5  # seconds between progress reports
+
+
+class BroadcastResult(Generic[T]):
+    """The outcome of sending to one target"""
+
+    def __init__(
+        self,
+        target: T,
+        message: Optional[discord.Message] = None,
+        error: Optional[str] = None,
+    ):
+        self.target: T = target
+        self.message: Optional[discord.Message] = message
+        self.error: Optional[str] = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def channel_bucket(channel: Any) -> Hashable:
+    """
+    The rate limit bucket of a message send to `channel`.
+
+    `POST /channels/{channel.id}/messages` is limited per channel id,
+    its major parameter.
+    """
+    return channel.id
+
+
+async def broadcast(
+    targets: Iterable[T],
+    send: Callable[[T], Awaitable[discord.Message]],
+    *,
+    bucket: Callable[[T], Hashable] = channel_bucket,
+    concurrency: int = BROADCAST_CONCURRENCY,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> List[BroadcastResult[T]]:
+    """
+    Calls `send` for each target concurrently.
+
+    Targets sharing a rate limit bucket are sent one after another, so only
+    one request per bucket is in flight and the client's own rate limit
+    handling never has to queue them. At most `concurrency` requests are in
+    flight overall to stay clear of the global rate limit. `send` is the only
+    place that touches the HTTP layer, so it can be swapped for a fake.
+
+    Parameters
+    -----------
+    targets: :class:`Iterable`
+        What to send to, usually channels
+    send
+        Coroutine function doing the request for one target
+    bucket
+        Gets the rate limit bucket of a target
+    concurrency: :class:`int`
+        The maximum number of requests in flight
+    on_progress
+        Awaited with `(done, total)` at most every :data:`PROGRESS_INTERVAL`
+        seconds, and once more when everything is done
+
+    Returns
+    --------
+    List[:class:`BroadcastResult`]
+        A result per target, in the order of `targets`
+    """
+    targets = list(targets)
+    total = len(targets)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket_locks: Dict[Hashable, asyncio.Lock] = {}
+
+    done = 0
+    last_report = time.monotonic()
+
+    async def run(target: T) -> BroadcastResult[T]:
+        nonlocal done, last_report
+
+        lock = bucket_locks.setdefault(bucket(target), asyncio.Lock())
+
+        async with lock, semaphore:
+            try:
+                result = BroadcastResult(target, message=await send(target))
+            except Exception as exc:
+                # connection errors and timeouts fail only their own target
+                text = exc.text if isinstance(exc, discord.HTTPException) else None
+                error = text or str(exc) or type(exc).__name__
+                result = BroadcastResult(target, error=error)
+
+        done += 1
+        now = time.monotonic()
+        if (
+            on_progress is not None
+            and done < total
+            and now - last_report >= PROGRESS_INTERVAL
+        ):
+            last_report = now
+            await on_progress(done, total)
+
+        return result
+
+    results = await asyncio.gather(*(run(target) for target in targets))
+
+    if on_progress is not None:
+        await on_progress(total, total)
+
+    return list(results)
@@ -0,0 +1,73 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+In-memory caches
+"""
+
+from collections import OrderedDict
+from typing import Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A mapping that forgets its least recently used entries past `max_size`.
+
+    Parameters
+    -----------
+    max_size: :class:`int`
+        The maximum number of entries to keep
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+
+        # bumped by every removal, a reader compares it before caching a row
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[K, V]]:
+        """The entries, least recently used first, without touching their order"""
+        return list(self._data.items())
+
+    def pop(self, key: K) -> Optional[V]:
+        self.generation += 1
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
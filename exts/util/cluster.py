@@ -0,0 +1,258 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Running the bot's shards across several supervised processes
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import aiohttp
+import discord
+
+from . import queries
+
+CLUSTER_HEARTBEAT = 15  # seconds between stat writes of a cluster
+CLUSTER_STAGGER = 5  # seconds between worker starts, shards identify one at a time
+RESTART_BACKOFF = 5  # seconds before the first restart, doubled per quick crash
+MAX_RESTART_BACKOFF = 300
+STABLE_UPTIME = 60  # seconds a worker must live for its backoff to reset
+
+log = logging.getLogger("orbyt.cluster")
+
+
+class ClusterInfo(NamedTuple):
+    """The shards one process runs"""
+
+    cluster_id: int
+    cluster_count: int
+    shard_ids: List[int]
+    shard_count: int
+
+    @property
+    def label(self) -> str:
+        first, last = self.shard_ids[0], self.shard_ids[-1]
+        shards = str(first) if first == last else f"{first}-{last}"
+        return f"#{self.cluster_id} (shards {shards})"
+
+
+class ClusterStats(NamedTuple):
+    """The last heartbeat of a cluster, as stored in `cluster_stats`"""
+
+    cluster_id: int
+    pid: int
+    shards: str
+    guilds: int
+    latency: float
+    started_at: int
+    updated_at: int
+
+    @property
+    def alive(self) -> bool:
+        now = round(discord.utils.utcnow().timestamp())
+        return now - self.updated_at <= CLUSTER_HEARTBEAT * 3
+
+
+def split_shards(shard_count: int, cluster_count: int) -> List[ClusterInfo]:
+    """
+    Splits `shard_count` shards into contiguous runs, one per cluster.
+
+    Raises
+    -------
+    :class:`ValueError`
+        There would be a cluster without shards
+    """
+    if not 0 < cluster_count <= shard_count:
+        raise ValueError(
+            f"Cannot split {shard_count} shard(s) across {cluster_count} cluster(s)."
+        )
+
+    per_cluster, extra = divmod(shard_count, cluster_count)
+    clusters, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = per_cluster + (cluster_id < extra)
+        clusters.append(
+            ClusterInfo(
+                cluster_id,
+                cluster_count,
+                list(range(start, start + size)),
+                shard_count,
+            )
+        )
+        start += size
+
+    return clusters
+
+
+async def fetch_shard_count(token: str) -> int:
+    """The shard count Discord recommends for the bot of `token`"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"},
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+
+    return data["shards"]
+
+
+async def write_heartbeat(bot, started_at: int) -> None:
+    """Stores the current stats of `bot`'s cluster in `cluster_stats`"""
+    cluster: ClusterInfo = bot.cluster
+    async with bot.pool.acquire() as c:
+        await c.execute(
+            queries.CLUSTER_HEARTBEAT,
+            cluster.cluster_id,
+            os.getpid(),
+            cluster.label,
+            len(bot.guilds),
+            bot.latency,
+            started_at,
+            round(discord.utils.utcnow().timestamp()),
+        )
+
+
+async def fetch_cluster_stats(pool) -> List[ClusterStats]:
+    """The last heartbeat of every cluster, ordered by id"""
+    async with pool.acquire() as c:
+        rows = await c.fetchall(queries.CLUSTER_STATS)
+    return [ClusterStats(*row) for row in rows]
+
+
+class _Worker:
+    def __init__(self, info: ClusterInfo):
+        self.info = info
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at: float = 0.0
+        self.backoff: float = RESTART_BACKOFF
+        self.restart_at: Optional[float] = None
+
+
+class ClusterLauncher:
+    """
+    Starts one process per cluster and restarts the ones that crash.
+
+    A worker that exits with code 0 was shut down on purpose and is left down.
+    Quick successive crashes back off exponentially up to
+    :data:`MAX_RESTART_BACKOFF`.
+
+    Parameters
+    -----------
+    clusters: List[:class:`ClusterInfo`]
+        The clusters to run, e.g. from :func:`split_shards`
+    target: Callable[[:class:`ClusterInfo`], None]
+        A module level function that runs a cluster, called in the worker process
+    """
+
+    def __init__(
+        self, clusters: List[ClusterInfo], target: Callable[[ClusterInfo], None]
+    ):
+        self.target = target
+        self.workers: Dict[int, _Worker] = {
+            info.cluster_id: _Worker(info) for info in clusters
+        }
+        # fresh interpreters, nothing of the launcher's state is inherited
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stopping = False
+
+    def _spawn(self, worker: _Worker) -> None:
+        worker.process = self._ctx.Process(
+            target=self.target,
+            args=(worker.info,),
+            name=f"orbyt-cluster-{worker.info.cluster_id}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+
+        log.info("Started cluster %s as pid %s", worker.info.label, worker.process.pid)
+
+    def _check(self, worker: _Worker) -> None:
+        now = time.monotonic()
+
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                self._spawn(worker)
+            return
+
+        if worker.process is None or worker.process.is_alive():
+            return
+
+        code = worker.process.exitcode
+        if code == 0:
+            log.info("Cluster %s shut down", worker.info.label)
+            worker.process = None
+            return
+
+        if now - worker.started_at >= STABLE_UPTIME:
+            worker.backoff = RESTART_BACKOFF
+
+        log.warning(
+            "Cluster %s exited with code %s, restarting in %ss",
+            worker.info.label,
+            code,
+            worker.backoff,
+        )
+        worker.restart_at = now + worker.backoff
+        worker.backoff = min(worker.backoff * 2, MAX_RESTART_BACKOFF)
+
+    def run(self) -> None:
+        """Starts every cluster and supervises them until all have shut down"""
+        try:
+            for i, worker in enumerate(self.workers.values()):
+                if i:
+                    time.sleep(CLUSTER_STAGGER)
+                self._spawn(worker)
+
+            while any(
+                w.process is not None or w.restart_at is not None
+                for w in self.workers.values()
+            ):
+                for worker in self.workers.values():
+                    self._check(worker)
+                time.sleep(1)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 30) -> None:
+        """Asks every worker to exit, killing those that don't in `timeout`"""
+        if self._stopping:
+            return
+        self._stopping = True
+
+        alive = [
+            w.process
+            for w in self.workers.values()
+            if w.process is not None and w.process.is_alive()
+        ]
+        for process in alive:
+            process.terminate()
+
+        deadline = time.monotonic() + timeout
+        for process in alive:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
@@ -0,0 +1,291 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Limits on how many runs of an app command can be in progress at once
+"""
+
+import time
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine, Dict, List, Optional, TypeVar
+
+import discord
+from discord import app_commands
+
+from .admission import QUEUE_TIMEOUT
+from .auto_defer import AUTO_DEFER_AFTER
+
+MAX_WAITING = 8  # runs that may wait for a slot, past it they're refused
+# seconds a run waits for a slot, after admission control may have waited too,
+# together they stay below the auto-defer budget
+WAIT_TIMEOUT = AUTO_DEFER_AFTER - QUEUE_TIMEOUT - 0.25
+
+# key of the slot a check took in `interaction.extras`
+_SLOT = "concurrency_slot"
+
+CallbackT = TypeVar("CallbackT", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+
+class ConcurrencyLimited(app_commands.CheckFailure):
+    """A run of a command was refused because too many are in progress"""
+
+    def __init__(self, name: str):
+        super().__init__(f"Too many runs of {name} in progress")
+        self.name = name
+
+
+class _Gate:
+    """A semaphore that refuses callers past a number of waiting ones"""
+
+    __slots__ = ("semaphore", "running", "waiting")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.running = 0
+        self.waiting = 0
+
+    @property
+    def idle(self) -> bool:
+        return not (self.running or self.waiting)
+
+
+class Slot:
+    """A run's place in the gates of a :class:`ConcurrencyLimit`"""
+
+    __slots__ = ("limit", "guild_id", "gates")
+
+    def __init__(self, limit: "ConcurrencyLimit", guild_id: Optional[int]):
+        self.limit = limit
+        self.guild_id = guild_id
+        self.gates: List[_Gate] = []
+
+    def release(self) -> None:
+        """Frees the slot, only the first call does anything"""
+        gates, self.gates = self.gates, []
+        for gate in gates:
+            self.limit._leave(gate)
+        self.limit._drop_idle(self.guild_id)
+
+
+class ConcurrencyLimit:
+    """
+    Caps the runs in progress of a command, in total and per guild.
+
+    A run past a cap waits in a queue of at most `max_waiting` runs for up to
+    `timeout` seconds, and is refused with :class:`ConcurrencyLimited` if the
+    queue is full or it isn't its turn in time.
+
+    Parameters
+    -----------
+    name: :class:`str`
+        The name the limit is reported under
+    limit: :class:`int`
+        The runs in progress across all guilds
+    per_guild: Optional[:class:`int`]
+        The runs in progress in one guild
+    max_waiting: :class:`int`
+        The runs that may wait for each cap
+    timeout: :class:`float`
+        Seconds a run waits for its turn
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        *,
+        per_guild: Optional[int] = None,
+        max_waiting: int = MAX_WAITING,
+        timeout: float = WAIT_TIMEOUT,
+    ):
+        self.name = name
+        self.limit = limit
+        self.per_guild = per_guild
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+
+        self._global = _Gate(limit)
+        # guild id -> its gate, dropped once idle
+        self._guilds: Dict[int, _Gate] = {}
+
+        self.runs = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def running(self) -> int:
+        return self._global.running
+
+    @property
+    def waiting(self) -> int:
+        return self._global.waiting + sum(g.waiting for g in self._guilds.values())
+
+    @property
+    def average_wait(self) -> float:
+        """Average time a run waited for its turn, in seconds"""
+        return self.total_wait / self.runs if self.runs else 0.0
+
+    async def _enter(self, gate: _Gate, deadline: float) -> None:
+        if not gate.semaphore.locked():
+            await gate.semaphore.acquire()  # a free slot, taken without waiting
+        elif gate.waiting >= self.max_waiting:
+            raise ConcurrencyLimited(self.name)
+        else:
+            gate.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    gate.semaphore.acquire(), max(deadline - time.perf_counter(), 0)
+                )
+            except asyncio.TimeoutError:
+                raise ConcurrencyLimited(self.name) from None
+            finally:
+                gate.waiting -= 1
+
+        gate.running += 1
+
+    def _leave(self, gate: _Gate) -> None:
+        gate.running -= 1
+        gate.semaphore.release()
+
+    def _drop_idle(self, guild_id: Optional[int]) -> None:
+        gate = self._guilds.get(guild_id)
+        if gate is not None and gate.idle:
+            del self._guilds[guild_id]
+
+    async def acquire(self, guild_id: Optional[int]) -> Slot:
+        """
+        Waits for a slot, in `guild_id` if given.
+
+        Raises
+        -------
+        :class:`ConcurrencyLimited`
+            The queue was full, or it wasn't the run's turn in time
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+
+        gates = [self._global]
+        if self.per_guild is not None and guild_id is not None:
+            guild = self._guilds.get(guild_id)
+            if guild is None:
+                guild = self._guilds[guild_id] = _Gate(self.per_guild)
+            # the guild's slot first, so a busy guild doesn't hold global ones
+            gates.insert(0, guild)
+
+        slot = Slot(self, guild_id)
+        try:
+            for gate in gates:
+                await self._enter(gate, deadline)
+                slot.gates.append(gate)
+        except BaseException as exc:
+            slot.release()
+            if isinstance(exc, ConcurrencyLimited):
+                self.rejected += 1
+            raise
+
+        waited = time.perf_counter() - start
+        self.runs += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+        return slot
+
+    async def run(self, guild_id: Optional[int], coro: Coroutine[Any, Any, Any]) -> Any:
+        """Runs `coro` once there's a slot for it, in `guild_id` if given"""
+        try:
+            slot = await self.acquire(guild_id)
+        except BaseException:
+            coro.close()
+            raise
+
+        try:
+            return await coro
+        finally:
+            slot.release()
+
+
+# name -> limit, of every command with one
+LIMITS: Dict[str, ConcurrencyLimit] = {}
+
+
+def release(interaction: discord.Interaction) -> None:
+    """Frees the slot a :func:`max_concurrency` check took for `interaction`"""
+    slot = interaction.extras.pop(_SLOT, None)
+    if slot is not None:
+        slot.release()
+
+
+def max_concurrency(
+    limit: int,
+    *,
+    per_guild: Optional[int] = None,
+    max_waiting: int = MAX_WAITING,
+    timeout: float = WAIT_TIMEOUT,
+) -> Callable[[CallbackT], CallbackT]:
+    """
+    Caps the runs in progress of an app command, see :class:`ConcurrencyLimit`.
+
+    Adds a check that waits for a slot, which is freed once the callback
+    returns. Checks run bottom up, so put it below a cooldown: a refused run
+    then doesn't use up the cooldown. When a later check fails the slot is
+    freed by :func:`release` in the error handler.
+
+    Parameters
+    -----------
+    limit: :class:`int`
+        The runs in progress across all guilds
+    per_guild: Optional[:class:`int`]
+        The runs in progress in one guild
+    max_waiting: :class:`int`
+        The runs that may wait for each cap
+    timeout: :class:`float`
+        Seconds a run waits for its turn
+    """
+
+    def decorator(func: CallbackT) -> CallbackT:
+        gate = ConcurrencyLimit(
+            func.__qualname__,
+            limit,
+            per_guild=per_guild,
+            max_waiting=max_waiting,
+            timeout=timeout,
+        )
+        LIMITS[gate.name] = gate
+
+        async def predicate(interaction: discord.Interaction) -> bool:
+            interaction.extras[_SLOT] = await gate.acquire(interaction.guild_id)
+            return True
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            interaction = next(
+                arg for arg in args if isinstance(arg, discord.Interaction)
+            )
+            # called without its checks, the callback waits for its slot itself
+            if _SLOT not in interaction.extras:
+                interaction.extras[_SLOT] = await gate.acquire(interaction.guild_id)
+
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                release(interaction)
+
+        return app_commands.check(predicate)(wrapper)  # type: ignore
+
+    return decorator
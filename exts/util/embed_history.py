@@ -0,0 +1,125 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Bounded undo/redo history for the embed builder
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import discord
+
+HISTORY_SIZE = 25  # undo steps kept per builder
+SNAPSHOT_SIZE = 512  # rough bytes of a snapshot, without the strings it shares
+
+EmbedState = Dict[str, Any]
+
+
+def snapshot(embed: discord.Embed) -> EmbedState:
+    """
+    Captures the state of an embed without copying its contents.
+
+    The builder replaces the author, footer, image and field dicts of an
+    embed instead of editing them, so snapshots share them (and every string)
+    with the embed and with each other. Only the field list is copied.
+    """
+    state = embed.to_dict()
+
+    if "fields" in state:
+        state["fields"] = list(state["fields"])
+
+    return state
+
+
+def restore(state: EmbedState) -> discord.Embed:
+    """Builds a new embed from a :func:`snapshot`, leaving the snapshot intact"""
+    state = dict(state)
+
+    if "fields" in state:
+        state["fields"] = list(state["fields"])
+
+    return discord.Embed.from_dict(state)
+
+
+class EmbedHistory:
+    """
+    Undo/redo history of an embed, as snapshots sharing unchanged parts.
+
+    Parameters
+    -----------
+    embed: :class:`discord.Embed`
+        The initial state
+    max_size: :class:`int`
+        The maximum number of states that can be undone
+    """
+
+    def __init__(self, embed: discord.Embed, max_size: int = HISTORY_SIZE):
+        self._current: EmbedState = snapshot(embed)
+        self._undo: Deque[EmbedState] = deque(maxlen=max_size)
+        self._redo: List[EmbedState] = []
+
+    def __len__(self) -> int:
+        """The number of states kept, the current one included"""
+        return 1 + len(self._undo) + len(self._redo)
+
+    @property
+    def current(self) -> EmbedState:
+        """The latest recorded state"""
+        return self._current
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def push(self, embed: discord.Embed) -> None:
+        """Records `embed` as the latest state, clearing anything to redo"""
+        self._undo.append(self._current)
+        self._current = snapshot(embed)
+        self._redo.clear()
+
+    def drop(self) -> None:
+        """Forgets the latest state, without making it redoable"""
+        if self._undo:
+            self._current = self._undo.pop()
+
+    def restore(self) -> discord.Embed:
+        """Gets the latest recorded state, discarding uncommitted edits"""
+        return restore(self._current)
+
+    def undo(self) -> Optional[discord.Embed]:
+        """Steps back one state, returns `None` if there is nothing to undo"""
+        if not self._undo:
+            return None
+
+        self._redo.append(self._current)
+        self._current = self._undo.pop()
+        return restore(self._current)
+
+    def redo(self) -> Optional[discord.Embed]:
+        """Steps forward one state, returns `None` if there is nothing to redo"""
+        if not self._redo:
+            return None
+
+        self._undo.append(self._current)
+        self._current = self._redo.pop()
+        return restore(self._current)
@@ -0,0 +1,125 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Discord's embed limits and a running tally to check edits against them
+"""
+
+from typing import Optional, Tuple
+
+import discord
+
+MAX_TITLE = 256
+MAX_DESCRIPTION = 4096
+MAX_FIELDS = 25
+MAX_FIELD_NAME = 256
+MAX_FIELD_VALUE = 1024
+MAX_FOOTER_TEXT = 2048
+MAX_AUTHOR_NAME = 256
+MAX_CHARACTERS = 6000
+
+
+class EmbedLimitError(ValueError):
+    """An embed or one of its components is over Discord's limits"""
+
+
+def _check(component: str, value: Optional[str], limit: int) -> int:
+    length = len(value or "")
+    if length > limit:
+        raise EmbedLimitError(f"{component} is longer than {limit} characters.")
+    return length
+
+
+def measure(embed: discord.Embed) -> Tuple[int, int]:
+    """
+    Checks every component of `embed` against Discord's limits.
+
+    Returns
+    --------
+    Tuple[:class:`int`, :class:`int`]
+        The number of characters and fields
+
+    Raises
+    -------
+    :class:`EmbedLimitError`
+        A component, the field count or the total is over its limit
+    """
+    characters = _check("Title", embed.title, MAX_TITLE)
+    characters += _check("Description", embed.description, MAX_DESCRIPTION)
+    characters += _check("Author name", embed.author.name, MAX_AUTHOR_NAME)
+    characters += _check("Footer text", embed.footer.text, MAX_FOOTER_TEXT)
+
+    fields = embed.fields
+    if len(fields) > MAX_FIELDS:
+        raise EmbedLimitError(f"Embed has more than {MAX_FIELDS} fields.")
+
+    for i, field in enumerate(fields, start=1):
+        characters += _check(f"Field {i} name", field.name, MAX_FIELD_NAME)
+        characters += _check(f"Field {i} value", field.value, MAX_FIELD_VALUE)
+
+    if characters > MAX_CHARACTERS:
+        raise EmbedLimitError(f"Embed too long; Exceeded {MAX_CHARACTERS} characters.")
+
+    return characters, len(fields)
+
+
+class EmbedTally:
+    """
+    Running count of an embed's characters and fields.
+
+    It is measured once, then kept up to date with the length of each
+    component before and after an edit, instead of walking the whole embed.
+
+    Parameters
+    -----------
+    embed: Optional[:class:`discord.Embed`]
+        The embed to measure, see :func:`measure`
+    characters: :class:`int`
+        The known character count, when no embed is given
+    fields: :class:`int`
+        The known field count, when no embed is given
+    """
+
+    def __init__(
+        self,
+        embed: Optional[discord.Embed] = None,
+        *,
+        characters: int = 0,
+        fields: int = 0,
+    ):
+        self.characters: int = characters
+        self.fields: int = fields
+
+        if embed is not None:
+            self.reset(embed)
+
+    def reset(self, embed: discord.Embed) -> None:
+        """Measures `embed` from scratch"""
+        self.characters, self.fields = measure(embed)
+
+    def fits(self, *, removed: int = 0, added: int = 0, fields: int = 0) -> bool:
+        """Whether an edit keeps the embed within the total and field limits"""
+        return (
+            self.characters - removed + added <= MAX_CHARACTERS
+            and self.fields + fields <= MAX_FIELDS
+        )
+
+    def update(self, *, removed: int = 0, added: int = 0, fields: int = 0) -> None:
+        """Applies an edit that removed and added characters or fields"""
+        self.characters += added - removed
+        self.fields += fields
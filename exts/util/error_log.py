@@ -0,0 +1,185 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Aggregation of unhandled errors by where they were raised
+"""
+
+import time
+import hashlib
+import logging
+import traceback
+from collections import OrderedDict, deque
+from typing import Deque, List, NamedTuple, Optional
+
+RECENT_ERRORS = 200  # failures kept, oldest dropped first
+MAX_FINGERPRINTS = 256  # distinct errors kept, least recently seen dropped first
+LOG_INTERVAL = 60.0  # seconds between log lines of one fingerprint
+
+log = logging.getLogger("orbyt.errors")
+
+
+def unwrap(error: BaseException) -> BaseException:
+    """The error raised by a command or view, out of the errors wrapping it"""
+    while getattr(error, "original", None) is not None:
+        error = error.original  # type: ignore
+    return error
+
+
+def fingerprint(error: BaseException, stack: traceback.StackSummary) -> str:
+    """
+    A short hash of the type of `error` and the frames it was raised through.
+
+    Frames are compared by file, function and source line, not line number,
+    so a fingerprint survives edits elsewhere in the file. The message is left
+    out as it often holds ids.
+    """
+    digest = hashlib.blake2b(type(error).__qualname__.encode(), digest_size=6)
+    for frame in stack:
+        digest.update(f"\0{frame.filename}\0{frame.name}\0{frame.line}".encode())
+    return digest.hexdigest()
+
+
+class Failure(NamedTuple):
+    timestamp: float
+    fingerprint: str
+    where: str
+
+
+class ErrorGroup:
+    """The occurrences of errors with the same fingerprint"""
+
+    def __init__(self, fingerprint: str, error: BaseException, where: str):
+        self.fingerprint = fingerprint
+        self.type: str = type(error).__qualname__
+        self.count: int = 0
+        self.first_seen: float = time.time()
+        self.last_seen: float = self.first_seen
+        self.last_where: str = where
+        self.last_message: str = str(error)
+        # formatted on demand, capturing it doesn't keep the frames alive
+        self.latest: Optional[traceback.TracebackException] = None
+
+        # occurrences since the last log line of this group, and when that was
+        self.unlogged: int = 0
+        self.logged_at: float = 0.0
+
+    @property
+    def traceback(self) -> str:
+        """The latest traceback of the group"""
+        return "".join(self.latest.format()) if self.latest is not None else ""
+
+
+class ErrorLog:
+    """
+    Counts unhandled errors by :func:`fingerprint`, keeping the latest
+    traceback of each and the most recent failures in a ring buffer.
+
+    An error is logged with its traceback the first time, afterwards its
+    group logs one summary line at most every `log_interval` seconds,
+    so a failure that repeats quickly can't flood the log.
+
+    Parameters
+    -----------
+    max_recent: :class:`int`
+        The number of recent failures to keep
+    max_fingerprints: :class:`int`
+        The number of distinct errors to keep
+    log_interval: :class:`float`
+        Seconds between log lines of one fingerprint
+    """
+
+    def __init__(
+        self,
+        max_recent: int = RECENT_ERRORS,
+        max_fingerprints: int = MAX_FINGERPRINTS,
+        log_interval: float = LOG_INTERVAL,
+    ):
+        self.max_fingerprints = max_fingerprints
+        self.log_interval = log_interval
+
+        self.recent: Deque[Failure] = deque(maxlen=max_recent)
+        self._groups: "OrderedDict[str, ErrorGroup]" = OrderedDict()
+
+        self.total = 0
+        # log lines left out by rate limiting
+        self.suppressed = 0
+
+    def record(self, error: BaseException, where: str) -> ErrorGroup:
+        """
+        Counts `error`, raised while handling `where`, and logs it
+        unless its group was logged within the interval.
+        """
+        error = unwrap(error)
+        latest = traceback.TracebackException.from_exception(error)
+        key = fingerprint(error, latest.stack)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ErrorGroup(key, error, where)
+            if len(self._groups) > self.max_fingerprints:
+                self._groups.popitem(last=False)
+        else:
+            self._groups.move_to_end(key)
+
+        now = time.time()
+        group.count += 1
+        group.last_seen = now
+        group.last_where = where
+        group.last_message = str(error)
+        group.latest = latest
+        group.unlogged += 1
+
+        self.total += 1
+        self.recent.append(Failure(now, key, where))
+
+        if group.count == 1:
+            log.error(
+                "Unhandled error [%s] in %s",
+                key,
+                where,
+                exc_info=(type(error), error, error.__traceback__),
+            )
+        elif now - group.logged_at >= self.log_interval:
+            log.error(
+                "Unhandled error [%s] %s occurred %d times since, latest in %s: %s",
+                key,
+                group.type,
+                group.unlogged,
+                where,
+                group.last_message,
+            )
+        else:
+            self.suppressed += 1
+            return group
+
+        group.unlogged = 0
+        group.logged_at = now
+        return group
+
+    def get(self, fingerprint: str) -> Optional[ErrorGroup]:
+        return self._groups.get(fingerprint)
+
+    def top(self, count: int = 10) -> List[ErrorGroup]:
+        """The `count` groups that occurred most, most recent first on ties"""
+        return sorted(
+            reversed(self._groups.values()), key=lambda g: g.count, reverse=True
+        )[:count]
+
+    def __len__(self) -> int:
+        return len(self._groups)
@@ -0,0 +1,59 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Outbound HTTP requests of the cogs
+"""
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import aiohttp
+
+from .singleflight import SingleFlight
+
+# identical concurrent fetches share one request
+_fetches: SingleFlight[Tuple[Hashable, ...], Any] = SingleFlight()
+
+
+async def fetch_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Any:
+    """
+    GETs `url` and decodes its JSON body, whatever its content type.
+
+    Concurrent calls with the same `url` and `params` share one request,
+    `headers` aren't compared, they are expected to be the same per URL.
+    Those callers get the same decoded object, so it must not be modified.
+
+    Raises
+    -------
+    :class:`aiohttp.ClientResponseError`
+        The response status was not 2xx
+    """
+    key = (url, tuple(sorted((params or {}).items())))
+
+    async def fetch() -> Any:
+        async with session.get(url, params=params, headers=headers) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    return await _fetches.do(key, fetch)
@@ -0,0 +1,157 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Health and readiness endpoints of the bot process, for an orchestrator
+"""
+
+import math
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from aiohttp import web
+
+from . import queries
+
+HEALTH_HOST = "127.0.0.1"  # only the orchestrator on the same host asks
+DB_TIMEOUT = 2.0  # seconds the database has to answer a health check
+MAX_HEALTHY_LOOP_LAG = 1.0  # seconds the event loop may fall behind
+
+log = logging.getLogger("orbyt.health")
+
+
+def _ms(seconds: float) -> Optional[float]:
+    # a shard that hasn't heartbeated yet has an infinite latency, not JSON
+    return round(seconds * 1000, 1) if math.isfinite(seconds) else None
+
+
+class HealthServer:
+    """
+    A small HTTP server answering `/healthz` and `/readyz` with JSON.
+
+    `/healthz` is the liveness check: the event loop keeps up and the
+    database answers a query within :data:`DB_TIMEOUT` seconds.
+    `/readyz` tells whether the bot should get traffic: every shard is
+    connected and ready, every extension is loaded and it isn't shutting
+    down. Both answer with status 503 when failing, and include the
+    latency of every shard.
+
+    Parameters
+    -----------
+    bot: :class:`Orbyt`
+        The bot to check
+    port: :class:`int`
+        The port to listen on
+    extensions: Iterable[:class:`str`]
+        The extensions that must be loaded for the bot to be ready
+    host: :class:`str`
+        The address to listen on
+    """
+
+    def __init__(
+        self,
+        bot,
+        port: int,
+        *,
+        extensions: Iterable[str] = (),
+        host: str = HEALTH_HOST,
+    ):
+        self.bot = bot
+        self.port = port
+        self.host = host
+        self.extensions = list(extensions)
+
+        self.app = web.Application()
+        self.app.router.add_get("/healthz", self.healthz)
+        self.app.router.add_get("/readyz", self.readyz)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        log.info("Serving health checks on http://%s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _shards(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            str(shard_id): {
+                "connected": not shard.is_closed(),
+                "latency_ms": _ms(shard.latency),
+            }
+            for shard_id, shard in sorted(self.bot.shards.items())
+        }
+
+    async def _ping_db(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def ping():
+            async with self.bot.pool.acquire() as c:
+                await c.fetchone(queries.HEALTH_PING)
+
+        try:
+            await asyncio.wait_for(ping(), DB_TIMEOUT)
+        except Exception as exc:
+            return {"ok": False, "error": str(exc) or type(exc).__name__}
+
+        return {"ok": True, "latency_ms": _ms(loop.time() - start)}
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        admission = getattr(self.bot, "admission", None)
+        loop_lag = admission.loop_lag if admission is not None else 0.0
+        db = await self._ping_db()
+
+        ok = db["ok"] and loop_lag <= MAX_HEALTHY_LOOP_LAG
+        return web.json_response(
+            {
+                "ok": ok,
+                "loop_lag_ms": _ms(loop_lag),
+                "db": db,
+                "shards": self._shards(),
+            },
+            status=200 if ok else 503,
+        )
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        shards = self._shards()
+        missing: List[str] = [
+            ext for ext in self.extensions if ext not in self.bot.extensions
+        ]
+        draining = self.bot.draining
+
+        ready = (
+            self.bot.is_ready()
+            and all(shard["connected"] for shard in shards.values())
+            and not missing
+            and not draining
+        )
+        return web.json_response(
+            {
+                "ready": ready,
+                "draining": draining,
+                "missing_extensions": missing,
+                "shards": shards,
+            },
+            status=200 if ready else 503,
+        )
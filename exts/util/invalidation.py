@@ -0,0 +1,161 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Cache invalidation between processes sharing the database
+"""
+
+import os
+import json
+import logging
+import time
+from typing import Any, Dict, Hashable, Iterable
+
+import discord
+from discord.ext import tasks
+
+from .cache import LRUCache
+from . import queries
+
+INVALIDATION_POLL = 1  # seconds, how stale another process's cache can get
+INVALIDATION_RETENTION = 300  # seconds a published invalidation is kept
+PRUNE_EVERY = 60  # polls between deletions of expired invalidations
+
+log = logging.getLogger("orbyt.invalidation")
+
+
+def _as_key(value: Any) -> Hashable:
+    # JSON turns tuple keys into lists
+    if isinstance(value, list):
+        return tuple(_as_key(v) for v in value)
+    return value
+
+
+class InvalidationBus:
+    """
+    Publishes cache invalidations to a change-log table that every process polls.
+
+    A write that makes a cached entry stale calls :meth:`publish` in its
+    transaction and drops its own entry once that committed. Other processes
+    drop the entry within :data:`INVALIDATION_POLL` seconds. A process that
+    could not poll for longer than :data:`INVALIDATION_RETENTION` may have
+    missed entries, so it clears its subscribed caches entirely.
+
+    Parameters
+    -----------
+    pool
+        The database pool
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.origin = os.getpid()
+        self.caches: Dict[str, LRUCache] = {}
+
+        self._last_id = 0
+        self._last_poll = 0.0
+        self._polls = 0
+
+    def subscribe(self, name: str, cache: LRUCache) -> None:
+        """Drop entries of `cache` whenever `name` invalidations come in"""
+        self.caches[name] = cache
+
+    def unsubscribe(self, name: str) -> None:
+        self.caches.pop(name, None)
+
+    async def start(self) -> None:
+        """Skips the existing backlog and starts polling"""
+        async with self.pool.acquire() as c:
+            row = await c.fetchone(queries.INVALIDATION_LAST_ID)
+        self._last_id = row[0] or 0
+        self._last_poll = time.monotonic()
+
+        self.poll.start()
+
+    def stop(self) -> None:
+        self.poll.cancel()
+
+    async def publish(self, c, name: str, key: Hashable) -> None:
+        """
+        Invalidates `key` of the `name` cache in every other process.
+
+        The local entry is left alone, a reader could cache the old row again
+        before the transaction commits. Drop it after the commit.
+
+        Parameters
+        -----------
+        c
+            The connection of the write that made the entry stale
+        name: :class:`str`
+            The name the cache was subscribed with
+        key: :class:`Hashable`
+            The key to drop, tuples of JSON types are supported
+        """
+        await self.publish_many(c, name, [key])
+
+    async def publish_many(self, c, name: str, keys: Iterable[Hashable]) -> None:
+        """Multiple keys version of :meth:`publish`"""
+        keys = list(keys)
+        if not keys:
+            return
+
+        now_timestamp = round(discord.utils.utcnow().timestamp())
+        await c.executemany(
+            queries.INVALIDATION_PUBLISH,
+            [(self.origin, name, json.dumps(key), now_timestamp) for key in keys],
+        )
+
+    def _clear_all(self) -> None:
+        for cache in self.caches.values():
+            cache.clear()
+
+    @tasks.loop(seconds=INVALIDATION_POLL)
+    async def poll(self) -> None:
+        try:
+            async with self.pool.acquire() as c:
+                rows = await c.fetchall(
+                    queries.INVALIDATION_POLL,
+                    self._last_id,
+                )
+
+                self._polls += 1
+                if self._polls % PRUNE_EVERY == 0:
+                    await c.execute(
+                        queries.INVALIDATION_PRUNE,
+                        round(discord.utils.utcnow().timestamp())
+                        - INVALIDATION_RETENTION,
+                    )
+        except Exception:
+            log.exception("Polling cache invalidations failed, retrying")
+            return
+
+        now = time.monotonic()
+        if now - self._last_poll > INVALIDATION_RETENTION:
+            log.warning("Cache invalidations may have been missed, clearing caches")
+            self._clear_all()
+        self._last_poll = now
+
+        for row_id, origin, name, key in rows:
+            self._last_id = row_id
+
+            if origin == self.origin:
+                continue
+
+            cache = self.caches.get(name)
+            if cache is not None:
+                cache.pop(_as_key(json.loads(key)))
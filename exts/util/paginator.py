@@ -30,6 +30,8 @@ from .views import BaseView
 from bot import Orbyt
 
 T = TypeVar("T")
+
+ENTRY_SIZE = 160  # rough bytes of an entry row and its place in the pages
 BotT = TypeVar("BotT", bound="Orbyt")
 
 
@@ -63,8 +65,7 @@ class SendToPage(discord.ui.Modal):
 
         self.paginator._skip_to_page(int(self.to_page.value) - 1)
 
-        embed = await self.paginator.embed()
-        return await interaction.response.edit_message(embed=embed, view=self.paginator)
+        return await self.paginator._show_page(interaction)
 
 
 class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
@@ -114,6 +115,9 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
         ]
         self.page_counter.label = f"{self.current_page}/{self.total_pages}"
 
+    def approximate_size(self) -> int:
+        return super().approximate_size() + ENTRY_SIZE * len(self.entries)
+
     @property
     def max_page(self) -> int:
         """The max page count."""
@@ -166,6 +170,16 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
         self._current_page_index = _index
         self._update_counter()
 
+    async def on_page_change(self) -> None:
+        """Called after the page changed, before it is shown"""
+        pass
+
+    async def _show_page(self, interaction: discord.Interaction):
+        await self.on_page_change()
+
+        embed = await self.embed()
+        return await interaction.response.edit_message(embed=embed, view=self)
+
     @discord.ui.button(
         emoji=EMOJIS["double_arrow_left"], style=discord.ButtonStyle.blurple
     )
@@ -176,8 +190,7 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
 
         self._skip_to_page(0)
 
-        embed = await self.embed()
-        return await interaction.response.edit_message(embed=embed, view=self)
+        return await self._show_page(interaction)
 
     @discord.ui.button(emoji=EMOJIS["arrow_left"], style=discord.ButtonStyle.gray)
     async def previous_page(
@@ -187,8 +200,7 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
 
         self._switch_page(-1)
 
-        embed = await self.embed()
-        return await interaction.response.edit_message(embed=embed, view=self)
+        return await self._show_page(interaction)
 
     @discord.ui.button(
         label="Page/Pages", style=discord.ButtonStyle.gray, disabled=True
@@ -207,8 +219,7 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
 
         self._switch_page(1)
 
-        embed = await self.embed()
-        return await interaction.response.edit_message(embed=embed, view=self)
+        return await self._show_page(interaction)
 
     @discord.ui.button(
         emoji=EMOJIS["double_arrow_right"], style=discord.ButtonStyle.blurple
@@ -220,8 +231,7 @@ class CustomPaginator(Generic[T, BotT], BaseView, abc.ABC):
 
         self._skip_to_page(self.max_page - 1)
 
-        embed = await self.embed()
-        return await interaction.response.edit_message(embed=embed, view=self)
+        return await self._show_page(interaction)
 
     @discord.ui.button(emoji=EMOJIS["white_x"], style=discord.ButtonStyle.red, row=1)
     async def _stop(
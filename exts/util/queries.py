@@ -0,0 +1,236 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Every SQL statement the bot runs, by name.
+
+Queries marked hot run on user-facing paths and must be answered by an
+index `SEARCH`, never a table `SCAN`. `python -m benchmarks.check_queries`
+checks that with `EXPLAIN QUERY PLAN` against the schema.
+"""
+
+import re
+from typing import Dict, List, NamedTuple
+
+
+class Query(NamedTuple):
+    name: str
+    sql: str
+    hot: bool
+
+
+QUERIES: Dict[str, Query] = {}
+
+_PARAM_REGEX = re.compile(r"\$(\d+)")
+
+
+def query(name: str, sql: str, *, hot: bool = True) -> str:
+    """Registers `sql` under `name` and returns it"""
+    if name in QUERIES:
+        raise ValueError(f"Query {name!r} is already registered.")
+
+    QUERIES[name] = Query(name, sql, hot)
+    return sql
+
+
+def param_count(sql: str) -> int:
+    """The number of `$n` parameters `sql` takes"""
+    return max((int(n) for n in _PARAM_REGEX.findall(sql)), default=0)
+
+
+## ----- Tags ----- ##
+
+TAG_ID_BY_NAME = query(
+    "tag_id_by_name",
+    "SELECT id FROM tags WHERE name = LOWER($1) AND guild = $2",
+)
+TAG_CONTENT_BY_NAME = query(
+    "tag_content_by_name",
+    "SELECT id, content_hash FROM tags WHERE name = LOWER($1) AND guild = $2",
+)
+TAG_INFO_BY_NAME = query(
+    "tag_info_by_name",
+    "SELECT id, author, created_at FROM tags WHERE name = LOWER($1) AND guild = $2",
+)
+TAG_INSERT = query(
+    "tag_insert",
+    "INSERT INTO tags (name, content_hash, guild, author, created_at) VALUES (LOWER($1), $2, $3, $4, $5)",
+)
+TAG_SET_CONTENT = query(
+    "tag_set_content",
+    "UPDATE tags SET content_hash = $1 WHERE name = LOWER($2) AND guild = $3",
+)
+TAG_SET_CONTENT_BY_AUTHOR = query(
+    "tag_set_content_by_author",
+    "UPDATE tags SET content_hash = $1 WHERE name = LOWER($2) AND guild = $3 AND author = $4",
+)
+TAG_DELETE = query(
+    "tag_delete",
+    "DELETE FROM tags WHERE name = LOWER($1) AND guild = $2",
+)
+TAG_DELETE_BY_AUTHOR = query(
+    "tag_delete_by_author",
+    "DELETE FROM tags WHERE name = LOWER($1) AND guild = $2 AND author = $3",
+)
+TAG_LIST = query(
+    "tag_list",
+    "SELECT name, id FROM tags WHERE guild = $1",
+)
+TAG_SEARCH = query(
+    "tag_search",
+    "SELECT name, id FROM tags WHERE name LIKE $1 AND guild = $2 ORDER BY name ASC LIMIT 25",
+)
+TAG_RANDOM = query(
+    "tag_random",
+    "SELECT name, content_hash, id FROM tags WHERE guild = $1 ORDER BY RANDOM() LIMIT 1",
+)
+TAG_LIST_BY_AUTHOR = query(
+    "tag_list_by_author",
+    "SELECT name, id FROM tags WHERE guild = $1 AND author = $2",
+)
+TAG_TOP = query(
+    "tag_top",
+    "SELECT tags.name, tags.id, tag_usage.uses FROM tag_usage "
+    "INNER JOIN tags ON tags.id = tag_usage.tag_id "
+    "WHERE tag_usage.guild = $1 ORDER BY tag_usage.uses DESC LIMIT 100",
+)
+TAG_USAGE_FLUSH = query(
+    "tag_usage_flush",
+    "INSERT INTO tag_usage (tag_id, guild, uses, last_used) "
+    "SELECT $1, $2, $3, $4 WHERE EXISTS (SELECT 1 FROM tags WHERE id = $1) "
+    "ON CONFLICT (tag_id) DO UPDATE SET "
+    "uses = uses + excluded.uses, last_used = MAX(last_used, excluded.last_used)",
+)
+
+## ----- Tag import / export ----- ##
+
+TAG_NAMES = query(
+    "tag_names",
+    "SELECT name FROM tags WHERE guild = $1",
+)
+TAG_IMPORT_INSERT = query(
+    "tag_import_insert",
+    "INSERT INTO tags (name, content_hash, guild, author, created_at) VALUES ($1, $2, $3, $4, $5)",
+)
+TAG_IMPORT_OVERWRITE = query(
+    "tag_import_overwrite",
+    "UPDATE tags SET content_hash = $1 WHERE name = $2 AND guild = $3",
+)
+TAG_EXPORT = query(
+    "tag_export",
+    "SELECT tags.name, tag_contents.data, tag_contents.compressed, tags.author, tags.created_at "
+    "FROM tags INNER JOIN tag_contents ON tag_contents.hash = tags.content_hash "
+    "WHERE tags.guild = $1 ORDER BY tags.name",
+)
+
+## ----- Tag contents ----- ##
+
+CONTENT_INSERT = query(
+    "content_insert",
+    "INSERT OR IGNORE INTO tag_contents (hash, data, compressed) VALUES ($1, $2, $3)",
+)
+CONTENT_BY_HASH = query(
+    "content_by_hash",
+    "SELECT data, compressed FROM tag_contents WHERE hash = $1",
+)
+
+## ----- Embed templates ----- ##
+
+TEMPLATE_UPSERT = query(
+    "template_upsert",
+    "INSERT INTO embed_templates (guild, name, data, characters, fields, author, created_at) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7) ON CONFLICT (guild, name) DO UPDATE SET "
+    "data = excluded.data, characters = excluded.characters, fields = excluded.fields, "
+    "author = excluded.author, created_at = excluded.created_at",
+)
+TEMPLATE_BY_NAME = query(
+    "template_by_name",
+    "SELECT data, characters, fields FROM embed_templates WHERE guild = $1 AND name = $2",
+)
+
+## ----- Clusters ----- ##
+
+CLUSTER_HEARTBEAT = query(
+    "cluster_heartbeat",
+    "INSERT OR REPLACE INTO cluster_stats "
+    "(cluster_id, pid, shards, guilds, latency, started_at, updated_at) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7)",
+)
+CLUSTER_STATS = query(
+    "cluster_stats",
+    "SELECT cluster_id, pid, shards, guilds, latency, started_at, updated_at "
+    "FROM cluster_stats ORDER BY cluster_id",
+    hot=False,  # one row per cluster
+)
+CLUSTER_REMOVE = query(
+    "cluster_remove",
+    "DELETE FROM cluster_stats WHERE cluster_id = $1",
+)
+
+## ----- Cache invalidation ----- ##
+
+INVALIDATION_LAST_ID = query(
+    "invalidation_last_id",
+    "SELECT MAX(id) FROM cache_invalidations",
+)
+INVALIDATION_PUBLISH = query(
+    "invalidation_publish",
+    "INSERT INTO cache_invalidations (origin, cache, key, created_at) VALUES ($1, $2, $3, $4)",
+)
+INVALIDATION_POLL = query(
+    "invalidation_poll",
+    "SELECT id, origin, cache, key FROM cache_invalidations WHERE id > $1 ORDER BY id",
+)
+INVALIDATION_PRUNE = query(
+    "invalidation_prune",
+    "DELETE FROM cache_invalidations WHERE created_at < $1",
+    hot=False,  # once a minute, over a few minutes of rows
+)
+
+## ----- View states ----- ##
+
+VIEW_STATE_GET = query(
+    "view_state_get",
+    "SELECT data FROM view_states WHERE key = $1 AND kind = $2 AND expires_at > $3",
+)
+VIEW_STATE_PUT = query(
+    "view_state_put",
+    "INSERT INTO view_states (key, kind, data, expires_at) VALUES ($1, $2, $3, $4) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    "kind = excluded.kind, data = excluded.data, expires_at = excluded.expires_at",
+)
+VIEW_STATE_DELETE = query(
+    "view_state_delete",
+    "DELETE FROM view_states WHERE key = $1",
+)
+VIEW_STATE_PRUNE = query(
+    "view_state_prune",
+    "DELETE FROM view_states WHERE expires_at <= $1",
+)
+
+## ----- Health ----- ##
+
+HEALTH_PING = query(
+    "health_ping",
+    "SELECT 1",
+    hot=False,  # a few times a minute, by the orchestrator
+)
+
+
+def hot_queries() -> List[Query]:
+    return [q for q in QUERIES.values() if q.hot]
@@ -0,0 +1,221 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Opt-in recording of anonymized interactions for offline replay
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import discord
+
+RECORDING_VERSION = 1
+FLUSH_EVERY = 100  # records buffered before they are written out
+
+# option types that nest further options
+_SUB_COMMAND = discord.AppCommandOptionType.subcommand.value
+_SUB_COMMAND_GROUP = discord.AppCommandOptionType.subcommand_group.value
+_STRING = discord.AppCommandOptionType.string.value
+_SNOWFLAKES = {
+    discord.AppCommandOptionType.user.value,
+    discord.AppCommandOptionType.channel.value,
+    discord.AppCommandOptionType.role.value,
+    discord.AppCommandOptionType.mentionable.value,
+    discord.AppCommandOptionType.attachment.value,
+}
+
+
+class Anonymizer:
+    """
+    Replaces ids and free text with salted digests.
+
+    The salt is random and never written out, so the same id maps to the
+    same pseudonym within one recording only.
+    """
+
+    def __init__(self):
+        self._salt = os.urandom(16)
+
+    def _digest(self, value: str, size: int) -> bytes:
+        return hashlib.blake2b(
+            value.encode("utf-8"), key=self._salt, digest_size=size
+        ).digest()
+
+    def id(self, value: Optional[int]) -> Optional[int]:
+        if value is None:
+            return None
+        return int.from_bytes(self._digest(str(value), 6), "big")
+
+    def text(self, value: str) -> str:
+        """A token of the same length, equal for equal texts"""
+        if not value:
+            return value
+
+        token = self._digest(value, 8).hex()
+        return (token * (len(value) // len(token) + 1))[: len(value)]
+
+
+def _flatten_options(
+    options: List[dict], anon: Anonymizer, path: List[str], choices: Set[str]
+) -> Dict[str, Any]:
+    flat = {}
+    for option in options:
+        kind = option["type"]
+
+        if kind in (_SUB_COMMAND, _SUB_COMMAND_GROUP):
+            path.append(option["name"])
+            flat.update(
+                _flatten_options(option.get("options", []), anon, path, choices)
+            )
+            continue
+
+        value = option.get("value")
+        if kind == _STRING and option["name"] not in choices:
+            value = anon.text(value)
+        elif kind in _SNOWFLAKES:
+            value = anon.id(int(value))
+
+        flat[option["name"]] = [kind, value]
+
+    return flat
+
+
+def anonymize(interaction: discord.Interaction, anon: Anonymizer) -> dict:
+    """
+    The compact, anonymized form of an interaction's payload.
+
+    Keys: `k` type, `c` command or custom id, `o` options as
+    `{name: [type, value]}`, `u` user, `g` guild, `ch` channel.
+    Strings picked from a parameter's choices are kept as they are not
+    user text. Modal text is kept as its length only.
+    """
+    data: Dict[str, Any] = interaction.data or {}
+    record: Dict[str, Any] = {
+        "k": interaction.type.value,
+        "u": anon.id(interaction.user.id),
+        "g": anon.id(interaction.guild_id),
+        "ch": anon.id(interaction.channel_id),
+    }
+
+    if interaction.type in (
+        discord.InteractionType.application_command,
+        discord.InteractionType.autocomplete,
+    ):
+        command = interaction.command
+        choices = {
+            param.display_name
+            for param in getattr(command, "parameters", [])
+            if param.choices
+        }
+
+        path = [data.get("name", "")]
+        record["o"] = _flatten_options(data.get("options", []), anon, path, choices)
+        record["c"] = " ".join(path)
+
+    elif interaction.type is discord.InteractionType.component:
+        record["c"] = anon.text(data.get("custom_id", ""))
+        record["ct"] = data.get("component_type")
+        record["n"] = len(data.get("values", []))
+
+    elif interaction.type is discord.InteractionType.modal_submit:
+        record["c"] = anon.text(data.get("custom_id", ""))
+        record["o"] = {
+            str(i): [_STRING, len(component.get("value", ""))]
+            for i, row in enumerate(data.get("components", []))
+            for component in row.get("components", [])
+        }
+
+    return record
+
+
+class InteractionRecorder:
+    """
+    Appends every interaction the bot receives to a JSON lines file.
+
+    The first line of a recording session is a header with the version and
+    start time, records carry `t`, their offset in seconds from that start.
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The file to append to
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+        self._anon = Anonymizer()
+        self._buffer: List[str] = []
+        self._start = time.monotonic()
+        self._fp: IO[str] = open(path, "a", encoding="utf-8")
+
+        self._write(
+            {
+                "v": RECORDING_VERSION,
+                "started": round(discord.utils.utcnow().timestamp()),
+            }
+        )
+
+    def _write(self, record: dict) -> None:
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+
+        if len(self._buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._fp.write("\n".join(self._buffer) + "\n")
+            self._fp.flush()
+            self._buffer.clear()
+
+    async def on_interaction(self, interaction: discord.Interaction) -> None:
+        record = anonymize(interaction, self._anon)
+        record["t"] = round(time.monotonic() - self._start, 3)
+
+        self._write(record)
+        self.count += 1
+
+    def close(self) -> None:
+        self.flush()
+        self._fp.close()
+
+
+def read_recording(fp: IO[str]) -> Iterator[Tuple[float, dict]]:
+    """
+    Yields `(offset, record)` pairs of a recording file.
+
+    Offsets continue across the sessions appended to the same file.
+    """
+    base = last = 0.0
+    for line in fp:
+        if not line.strip():
+            continue
+
+        record = json.loads(line)
+        if "v" in record:
+            # a new session, continue where the previous one ended
+            base = last
+            continue
+
+        last = base + record["t"]
+        yield last, record
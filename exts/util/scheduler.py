@@ -0,0 +1,250 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Priority classes for the bot's heavy work: thread pools and database writes
+"""
+
+import enum
+import heapq
+import asyncio
+import itertools
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+class Priority(enum.IntEnum):
+    """How urgent a job is, lower goes first"""
+
+    INTERACTIVE = 0  # someone is waiting for the reply
+    BACKGROUND = 1  # periodic upkeep and heavy replies, like renders
+    BULK = 2  # imports and other large batches
+
+
+# threads of each priority's pool
+EXECUTOR_WORKERS: Dict[Priority, int] = {
+    Priority.INTERACTIVE: 4,
+    Priority.BACKGROUND: 2,
+    Priority.BULK: 1,
+}
+
+
+class DrainResult(NamedTuple):
+    jobs: int
+    writes: int
+    cut_jobs: int
+    cut_writes: int
+
+
+class JobStats:
+    """Jobs and database writes of one priority"""
+
+    def __init__(self):
+        self.jobs: int = 0
+        self.writes: int = 0
+        self.total_write_wait: float = 0.0
+
+    @property
+    def average_write_wait(self) -> float:
+        """Average time a write waited for its turn, in seconds"""
+        return self.total_write_wait / self.writes if self.writes else 0.0
+
+
+class WriterGate:
+    """
+    Orders the database writes of the process by priority.
+
+    Interactive writes go ahead right away, SQLite serializes them as it
+    would anyway. Others go one at a time, the most urgent waiting one
+    next, and only while no interactive write is in progress.
+    """
+
+    def __init__(self):
+        self._held = False
+        self._order = itertools.count()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+        self._interactive = 0
+        self._quiet = asyncio.Event()
+        self._quiet.set()
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority: Priority) -> None:
+        if priority is Priority.INTERACTIVE:
+            self._interactive += 1
+            self._quiet.clear()
+            return
+
+        if self._held:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # handed over right as it was cancelled, pass it on
+                    self._hand_over()
+                raise
+        else:
+            self._held = True
+
+        try:
+            await self._quiet.wait()
+        except asyncio.CancelledError:
+            self._hand_over()
+            raise
+
+    def release(self, priority: Priority) -> None:
+        if priority is Priority.INTERACTIVE:
+            self._interactive -= 1
+            if not self._interactive:
+                self._quiet.set()
+        else:
+            self._hand_over()
+
+    def _hand_over(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self._held = False
+
+
+class Scheduler:
+    """
+    Runs blocking jobs and database writes by :class:`Priority`.
+
+    Every priority has its own thread pool, so a backlog of bulk or background
+    jobs never holds up an interactive one. Writes go through a
+    :class:`WriterGate`, so a bulk import only writes while no interactive
+    write is in progress and no background one is waiting.
+
+    Parameters
+    -----------
+    workers: Dict[:class:`Priority`, :class:`int`]
+        Threads of each priority's pool
+    """
+
+    def __init__(self, workers: Dict[Priority, int] = EXECUTOR_WORKERS):
+        self.executors = {
+            priority: ThreadPoolExecutor(
+                workers[priority], thread_name_prefix=f"orbyt-{priority.name.lower()}"
+            )
+            for priority in Priority
+        }
+        self.writers = WriterGate()
+        self.stats = {priority: JobStats() for priority in Priority}
+
+        # jobs and writes in progress or waiting, and those done so far
+        self.running_jobs = 0
+        self.running_writes = 0
+        self._finished_jobs = 0
+        self._finished_writes = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def _started(self) -> None:
+        self._idle.clear()
+
+    def _finished(self) -> None:
+        if not (self.running_jobs or self.running_writes):
+            self._idle.set()
+
+    def queued(self, priority: Priority) -> int:
+        """Jobs of `priority` waiting for a thread"""
+        return self.executors[priority]._work_queue.qsize()
+
+    async def run(
+        self, priority: Priority, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Runs `func` in the thread pool of `priority`"""
+        self.stats[priority].jobs += 1
+        self.running_jobs += 1
+        self._started()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executors[priority], functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            self.running_jobs -= 1
+            self._finished_jobs += 1
+            self._finished()
+
+    @asynccontextmanager
+    async def writer(self, priority: Priority) -> AsyncIterator[None]:
+        """Holds the database writer slot, given out by `priority`"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.running_writes += 1
+        self._started()
+
+        try:
+            await self.writers.acquire(priority)
+            stats = self.stats[priority]
+            stats.writes += 1
+            stats.total_write_wait += loop.time() - start
+
+            try:
+                yield
+            finally:
+                self.writers.release(priority)
+        finally:
+            self.running_writes -= 1
+            self._finished_writes += 1
+            self._finished()
+
+    async def drain(self, timeout: float) -> DrainResult:
+        """
+        Waits up to `timeout` seconds for the jobs and writes in flight,
+        including any started meanwhile, to finish.
+        """
+        jobs, writes = self._finished_jobs, self._finished_writes
+        try:
+            await asyncio.wait_for(self._idle.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+
+        return DrainResult(
+            self._finished_jobs - jobs,
+            self._finished_writes - writes,
+            self.running_jobs,
+            self.running_writes,
+        )
+
+    def shutdown(self) -> None:
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
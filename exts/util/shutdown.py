@@ -0,0 +1,120 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Orderly shutdown: refusing new interactions and draining the work in flight
+"""
+
+import asyncio
+import logging
+
+import discord
+from discord import app_commands
+
+DRAIN_TIMEOUT = 10.0  # seconds the work in flight gets to finish on shutdown
+SHUTDOWN_MESSAGE = "🔄 - I'm restarting, please try again in a moment."
+
+log = logging.getLogger("orbyt.shutdown")
+
+
+async def refuse_while_draining(interaction: discord.Interaction) -> bool:
+    """
+    Answers `interaction` with :data:`SHUTDOWN_MESSAGE` if the bot is shutting
+    down, returns whether it did so the caller can drop the interaction.
+    """
+    if not getattr(interaction.client, "draining", False):
+        return False
+
+    if interaction.type is not discord.InteractionType.autocomplete:
+        try:
+            await interaction.response.send_message(SHUTDOWN_MESSAGE, ephemeral=True)
+        except discord.HTTPException:
+            pass  # the connection is going away anyway
+    return True
+
+
+class DrainingTree(app_commands.CommandTree):
+    """A command tree that refuses interactions while the bot shuts down"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return not await refuse_while_draining(interaction)
+
+
+class ShutdownReport:
+    """What was drained on shutdown, and what was cut off at the deadline"""
+
+    def __init__(self):
+        self.jobs: int = 0
+        self.writes: int = 0
+        self.webhook_sends: int = 0
+        self.tag_uses: int = 0
+
+        self.cut_jobs: int = 0
+        self.cut_writes: int = 0
+        self.cut_webhook_sends: int = 0
+
+        self.seconds: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        """Whether everything in flight finished before the deadline"""
+        return not (self.cut_jobs or self.cut_writes or self.cut_webhook_sends)
+
+    def __str__(self) -> str:
+        text = (
+            f"drained {self.jobs} jobs, {self.writes} database writes and "
+            f"{self.webhook_sends} webhook sends, flushed {self.tag_uses} tag uses "
+            f"in {self.seconds:.1f}s"
+        )
+        if not self.complete:
+            text += (
+                f", cut off {self.cut_jobs} jobs, {self.cut_writes} writes and "
+                f"{self.cut_webhook_sends} webhook sends"
+            )
+        return text
+
+
+async def drain(bot, timeout: float = DRAIN_TIMEOUT) -> ShutdownReport:
+    """
+    Waits up to `timeout` seconds for the jobs, database writes and webhook
+    sends in flight, then flushes buffered tag usage.
+
+    The bot should be refusing new interactions already.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    report = ShutdownReport()
+
+    drained = await bot.scheduler.drain(timeout)
+    report.jobs, report.writes = drained.jobs, drained.writes
+    report.cut_jobs, report.cut_writes = drained.cut_jobs, drained.cut_writes
+
+    report.webhook_sends, report.cut_webhook_sends = await bot.webhooks.drain(
+        timeout - (loop.time() - start)
+    )
+
+    # write-behind tag usage must reach the database before the pool goes
+    tags = bot.get_cog("tag")
+    if tags is not None:
+        report.tag_uses = await tags.flush_usage()
+
+    report.seconds = loop.time() - start
+    log.log(
+        logging.INFO if report.complete else logging.WARNING, "Shutdown: %s", report
+    )
+    return report
@@ -0,0 +1,99 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Sharing one in-flight call between concurrent identical requests
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Abandoned(Exception):
+    """The caller making a shared call was cancelled"""
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Runs at most one call per key at a time, later callers await the same one.
+
+    Nothing is kept once a call finishes, the next caller starts a fresh one,
+    so this only collapses bursts and never serves stale results. The first
+    caller makes the call itself, without a task of its own. If it is
+    cancelled, a waiting caller makes the call again instead of being
+    cancelled along with it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[K, "asyncio.Future[V]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """
+        Awaits `func()`, or the call already in flight for `key`.
+
+        Parameters
+        -----------
+        key: :class:`Hashable`
+            What identifies identical calls, e.g. their arguments
+        func
+            Makes the call, only invoked when none is in flight
+
+        Raises
+        -------
+        :class:`Exception`
+            Whatever the shared call raised, to every caller
+        """
+        while (future := self._calls.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except _Abandoned:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            self._fail(future, _Abandoned())
+            raise
+        except Exception as exc:
+            self._fail(future, exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def forget(self, key: K) -> None:
+        """Lets the next caller of `key` start a new call, e.g. after a write"""
+        self._calls.pop(key, None)
+
+    @staticmethod
+    def _fail(future: "asyncio.Future[V]", exc: BaseException) -> None:
+        future.set_exception(exc)
+        # marks it retrieved, there may be nobody waiting
+        future.exception()
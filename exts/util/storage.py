@@ -0,0 +1,572 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Storage backends of the bot's tables
+"""
+
+import abc
+import bisect
+import random
+import itertools
+from contextlib import nullcontext
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .cache import LRUCache
+from .scheduler import Priority, Scheduler
+from .singleflight import SingleFlight
+from .tag_content import (
+    content_cache,
+    decode_content,
+    fetch_content,
+    store_content,
+    store_contents,
+)
+from . import queries
+
+STORAGE_BACKENDS = ("sqlite", "memory")
+
+LOOKUP_CACHE_SIZE = 1024  # tag names kept resolved across all guilds
+SEARCH_LIMIT = 25
+TOP_LIMIT = 100
+
+
+def fold_name(name: str) -> str:
+    """Lowers a tag name like SQLite's ASCII-only `LOWER`"""
+    return name.encode("utf-8").lower().decode("utf-8")
+
+
+def lookup_key(guild_id: int, name: str) -> Tuple[int, str]:
+    """The key of a tag name in caches and invalidations"""
+    return guild_id, fold_name(name)
+
+
+class TagInfo(NamedTuple):
+    id: int
+    author: int
+    created_at: int
+
+
+class TagStore(abc.ABC):
+    """
+    Where tags, their bodies and their usage are kept.
+
+    Names are matched case-insensitively with :func:`fold_name`. Listings
+    return `(name, id)` rows, which is what :class:`TagPages` shows.
+    """
+
+    @abc.abstractmethod
+    async def view(self, guild_id: int, name: str) -> Optional[Tuple[int, str]]:
+        """The `(id, content)` of a tag, or `None` if it doesn't exist"""
+
+    @abc.abstractmethod
+    async def info(self, guild_id: int, name: str) -> Optional[TagInfo]:
+        """The metadata of a tag, or `None` if it doesn't exist"""
+
+    @abc.abstractmethod
+    async def create(
+        self, guild_id: int, name: str, content: str, author: int, created_at: int
+    ) -> bool:
+        """Adds a tag, returns `False` if the name is taken"""
+
+    @abc.abstractmethod
+    async def set_content(
+        self, guild_id: int, name: str, content: str, *, author: Optional[int] = None
+    ) -> None:
+        """Replaces the body of a tag, only if `author` wrote it when given"""
+
+    @abc.abstractmethod
+    async def delete(
+        self, guild_id: int, name: str, *, author: Optional[int] = None
+    ) -> None:
+        """Removes a tag, only if `author` wrote it when given"""
+
+    @abc.abstractmethod
+    async def list(self, guild_id: int) -> List[Tuple[str, int]]:
+        """Every tag of a guild"""
+
+    @abc.abstractmethod
+    async def search(self, guild_id: int, query: str) -> List[Tuple[str, int]]:
+        """The first :data:`SEARCH_LIMIT` tags by name containing `query`"""
+
+    @abc.abstractmethod
+    async def random(self, guild_id: int) -> Optional[Tuple[str, str, int]]:
+        """The `(name, content, id)` of a random tag of a guild"""
+
+    @abc.abstractmethod
+    async def by_author(self, guild_id: int, author: int) -> List[Tuple[str, int]]:
+        """Every tag of a guild written by `author`"""
+
+    @abc.abstractmethod
+    async def top(self, guild_id: int) -> List[Tuple[str, int, int]]:
+        """The :data:`TOP_LIMIT` most used tags as `(name, id, uses)`"""
+
+    @abc.abstractmethod
+    async def add_usage(self, usage: Dict[int, Tuple[int, int, int]]) -> None:
+        """
+        Adds up counted uses, `tag id -> (guild, uses, last_used)`,
+        skipping tags removed since
+        """
+
+    @abc.abstractmethod
+    async def names(self, guild_id: int) -> Set[str]:
+        """The names of every tag of a guild"""
+
+    @abc.abstractmethod
+    async def write_batch(
+        self,
+        inserts: List[Tuple[str, str, int, int, int]],
+        updates: List[Tuple[str, str, int]],
+    ) -> None:
+        """
+        Writes imported tags at once.
+
+        Parameters
+        -----------
+        inserts
+            New tags as `(name, content, guild, author, created_at)`,
+            names already folded and free
+        updates
+            Overwritten tags as `(content, name, guild)`
+        """
+
+    @abc.abstractmethod
+    def export(
+        self, guild_id: int, chunk_size: int
+    ) -> AsyncIterator[Tuple[str, str, int, int]]:
+        """
+        Yields `(name, content, author, created_at)` of every tag by name,
+        reading `chunk_size` at a time
+        """
+
+
+class SqliteTagStore(TagStore):
+    """
+    Tags in the SQLite database, bodies deduplicated in `tag_contents`.
+
+    Resolved names are cached and dropped through `invalidations`,
+    so every process sharing the database sees edits.
+
+    Parameters
+    -----------
+    pool
+        The database pool
+    invalidations: Optional[:class:`InvalidationBus`]
+        Where to publish edited and removed tags
+    scheduler: Optional[:class:`Scheduler`]
+        Orders the writes by priority, imports after edits
+    """
+
+    def __init__(self, pool, invalidations=None, scheduler: Optional[Scheduler] = None):
+        self.pool = pool
+        self.invalidations = invalidations
+        self.scheduler = scheduler
+
+        # (guild id, folded name) -> (tag id, content hash)
+        self.lookups: LRUCache[Tuple[int, str], Tuple[int, bytes]] = LRUCache(
+            LOOKUP_CACHE_SIZE
+        )
+        if invalidations is not None:
+            invalidations.subscribe("tags", self.lookups)
+
+        # a burst of views of one tag shares one lookup
+        self._views: SingleFlight[
+            Tuple[int, str], Optional[Tuple[int, str]]
+        ] = SingleFlight()
+
+    def _writing(self, priority: Priority):
+        # the writer slot is taken before a connection, so none is held waiting
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.writer(priority)
+
+    async def _invalidate(self, c, keys: List[Tuple[int, str]]) -> None:
+        if self.invalidations is not None:
+            await self.invalidations.publish_many(c, "tags", keys)
+
+    def _drop(self, keys: List[Tuple[int, str]]) -> None:
+        # only after the commit, before it a reader would still see the old row
+        for key in keys:
+            self._views.forget(key)
+            self.lookups.pop(key)
+
+    async def view(self, guild_id: int, name: str) -> Optional[Tuple[int, str]]:
+        key = lookup_key(guild_id, name)
+
+        # both cached, no connection needed
+        data = self.lookups.get(key)
+        if data is not None:
+            content = content_cache.get(data[1])
+            if content is not None:
+                return data[0], content
+
+        return await self._views.do(key, lambda: self._view(key))
+
+    async def _view(self, key: Tuple[int, str]) -> Optional[Tuple[int, str]]:
+        guild_id, name = key
+        data = self.lookups.get(key)
+        generation = self.lookups.generation
+
+        async with self.pool.acquire() as c:
+            if data is None:
+                row = await c.fetchone(queries.TAG_CONTENT_BY_NAME, name, guild_id)
+                if not row:
+                    return None
+
+                data = (row[0], row[1])
+                # an invalidation since the read means the row may be old
+                if self.lookups.generation == generation:
+                    self.lookups.put(key, data)
+
+            content = await fetch_content(c, data[1])
+
+        if content is None:
+            # the tag was changed or deleted since its lookup was cached
+            self.lookups.pop(key)
+            return None
+        return data[0], content
+
+    async def info(self, guild_id: int, name: str) -> Optional[TagInfo]:
+        async with self.pool.acquire() as c:
+            row = await c.fetchone(queries.TAG_INFO_BY_NAME, name, guild_id)
+        return TagInfo(*row) if row else None
+
+    async def create(
+        self, guild_id: int, name: str, content: str, author: int, created_at: int
+    ) -> bool:
+        async with self._writing(Priority.INTERACTIVE):
+            async with self.pool.acquire() as c:
+                if await c.fetchone(queries.TAG_ID_BY_NAME, name, guild_id):
+                    return False
+
+                async with c.transaction():
+                    content_hash = await store_content(c, content)
+                    await c.execute(
+                        queries.TAG_INSERT,
+                        name,
+                        content_hash,
+                        guild_id,
+                        author,
+                        created_at,
+                    )
+
+        return True
+
+    async def set_content(
+        self, guild_id: int, name: str, content: str, *, author: Optional[int] = None
+    ) -> None:
+        async with self._writing(Priority.INTERACTIVE):
+            async with self.pool.acquire() as c:
+                async with c.transaction():
+                    # a body stored for no tag would never be dropped
+                    row = await c.fetchone(queries.TAG_INFO_BY_NAME, name, guild_id)
+                    if not row or (author is not None and row[1] != author):
+                        return
+
+                    content_hash = await store_content(c, content)
+
+                    if author is None:
+                        await c.execute(
+                            queries.TAG_SET_CONTENT, content_hash, name, guild_id
+                        )
+                    else:
+                        await c.execute(
+                            queries.TAG_SET_CONTENT_BY_AUTHOR,
+                            content_hash,
+                            name,
+                            guild_id,
+                            author,
+                        )
+
+                    await self._invalidate(c, [lookup_key(guild_id, name)])
+
+            self._drop([lookup_key(guild_id, name)])
+
+    async def delete(
+        self, guild_id: int, name: str, *, author: Optional[int] = None
+    ) -> None:
+        async with self._writing(Priority.INTERACTIVE):
+            async with self.pool.acquire() as c:
+                async with c.transaction():
+                    if author is None:
+                        await c.execute(queries.TAG_DELETE, name, guild_id)
+                    else:
+                        await c.execute(
+                            queries.TAG_DELETE_BY_AUTHOR, name, guild_id, author
+                        )
+
+                    await self._invalidate(c, [lookup_key(guild_id, name)])
+
+            self._drop([lookup_key(guild_id, name)])
+
+    async def list(self, guild_id: int) -> List[Tuple[str, int]]:
+        async with self.pool.acquire() as c:
+            return await c.fetchall(queries.TAG_LIST, guild_id)
+
+    async def search(self, guild_id: int, query: str) -> List[Tuple[str, int]]:
+        async with self.pool.acquire() as c:
+            return await c.fetchall(queries.TAG_SEARCH, f"%{query}%", guild_id)
+
+    async def random(self, guild_id: int) -> Optional[Tuple[str, str, int]]:
+        async with self.pool.acquire() as c:
+            row = await c.fetchone(queries.TAG_RANDOM, guild_id)
+            if not row:
+                return None
+
+            content = await fetch_content(c, row[1])
+
+        return (row[0], content, row[2]) if content is not None else None
+
+    async def by_author(self, guild_id: int, author: int) -> List[Tuple[str, int]]:
+        async with self.pool.acquire() as c:
+            return await c.fetchall(queries.TAG_LIST_BY_AUTHOR, guild_id, author)
+
+    async def top(self, guild_id: int) -> List[Tuple[str, int, int]]:
+        async with self.pool.acquire() as c:
+            return await c.fetchall(queries.TAG_TOP, guild_id)
+
+    async def add_usage(self, usage: Dict[int, Tuple[int, int, int]]) -> None:
+        async with self._writing(Priority.BACKGROUND):
+            async with self.pool.acquire() as c:
+                async with c.transaction():
+                    await c.executemany(
+                        queries.TAG_USAGE_FLUSH,
+                        [(tag_id, *entry) for tag_id, entry in usage.items()],
+                    )
+
+    async def names(self, guild_id: int) -> Set[str]:
+        async with self.pool.acquire() as c:
+            rows = await c.fetchall(queries.TAG_NAMES, guild_id)
+        return {row[0] for row in rows}
+
+    async def write_batch(
+        self,
+        inserts: List[Tuple[str, str, int, int, int]],
+        updates: List[Tuple[str, str, int]],
+    ) -> None:
+        # rows carry the body itself, stored here and swapped for its hash
+        async with self._writing(Priority.BULK):
+            async with self.pool.acquire() as c:
+                async with c.transaction():
+                    hashes = await store_contents(c, [row[1] for row in inserts])
+                    hashes += await store_contents(c, [row[0] for row in updates])
+
+                    if inserts:
+                        await c.executemany(
+                            queries.TAG_IMPORT_INSERT,
+                            [
+                                (row[0], digest, *row[2:])
+                                for row, digest in zip(inserts, hashes)
+                            ],
+                        )
+                    if updates:
+                        await c.executemany(
+                            queries.TAG_IMPORT_OVERWRITE,
+                            [
+                                (digest, *row[1:])
+                                for row, digest in zip(updates, hashes[len(inserts) :])
+                            ],
+                        )
+                        await self._invalidate(c, [(row[2], row[1]) for row in updates])
+
+            self._drop([(row[2], row[1]) for row in updates])
+
+    async def export(
+        self, guild_id: int, chunk_size: int
+    ) -> AsyncIterator[Tuple[str, str, int, int]]:
+        async with self.pool.acquire() as c:
+            async with c.execute(queries.TAG_EXPORT, guild_id) as cursor:
+                while rows := await cursor.fetchmany(chunk_size):
+                    for row in rows:
+                        yield row[0], decode_content(row[1], row[2]), row[3], row[4]
+
+
+class _MemoryTag:
+    __slots__ = ("id", "guild", "name", "content", "author", "created_at")
+
+    def __init__(
+        self,
+        id: int,
+        guild: int,
+        name: str,
+        content: str,
+        author: int,
+        created_at: int,
+    ):
+        self.id = id
+        self.guild = guild
+        self.name = name
+        self.content = content
+        self.author = author
+        self.created_at = created_at
+
+
+class MemoryTagStore(TagStore):
+    """
+    Tags in dicts of this process, gone when it exits.
+
+    For load tests and throwaway debug runs, a single process only.
+    Each guild's names are kept sorted, so listings and searches come out
+    in name order without sorting on every call.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._tags: Dict[int, _MemoryTag] = {}
+        # (guild id, folded name) -> tag
+        self._by_name: Dict[Tuple[int, str], _MemoryTag] = {}
+        # guild id -> sorted names
+        self._names: Dict[int, List[str]] = {}
+        # tag id -> [guild, uses, last_used]
+        self._usage: Dict[int, List[int]] = {}
+
+    def _get(
+        self, guild_id: int, name: str, author: Optional[int] = None
+    ) -> Optional[_MemoryTag]:
+        tag = self._by_name.get(lookup_key(guild_id, name))
+        if tag is None or (author is not None and tag.author != author):
+            return None
+        return tag
+
+    def _insert(
+        self, guild_id: int, name: str, content: str, author: int, created_at: int
+    ) -> None:
+        tag = _MemoryTag(next(self._ids), guild_id, name, content, author, created_at)
+        self._tags[tag.id] = tag
+        self._by_name[guild_id, name] = tag
+        bisect.insort(self._names.setdefault(guild_id, []), name)
+
+    async def view(self, guild_id: int, name: str) -> Optional[Tuple[int, str]]:
+        tag = self._get(guild_id, name)
+        return (tag.id, tag.content) if tag else None
+
+    async def info(self, guild_id: int, name: str) -> Optional[TagInfo]:
+        tag = self._get(guild_id, name)
+        return TagInfo(tag.id, tag.author, tag.created_at) if tag else None
+
+    async def create(
+        self, guild_id: int, name: str, content: str, author: int, created_at: int
+    ) -> bool:
+        name = fold_name(name)
+        if (guild_id, name) in self._by_name:
+            return False
+
+        self._insert(guild_id, name, content, author, created_at)
+        return True
+
+    async def set_content(
+        self, guild_id: int, name: str, content: str, *, author: Optional[int] = None
+    ) -> None:
+        tag = self._get(guild_id, name, author)
+        if tag is not None:
+            tag.content = content
+
+    async def delete(
+        self, guild_id: int, name: str, *, author: Optional[int] = None
+    ) -> None:
+        tag = self._get(guild_id, name, author)
+        if tag is None:
+            return
+
+        del self._tags[tag.id]
+        del self._by_name[guild_id, tag.name]
+        self._usage.pop(tag.id, None)
+
+        names = self._names[guild_id]
+        del names[bisect.bisect_left(names, tag.name)]
+
+    def _rows(self, guild_id: int, names: List[str]) -> List[Tuple[str, int]]:
+        return [(name, self._by_name[guild_id, name].id) for name in names]
+
+    async def list(self, guild_id: int) -> List[Tuple[str, int]]:
+        return self._rows(guild_id, self._names.get(guild_id, []))
+
+    async def search(self, guild_id: int, query: str) -> List[Tuple[str, int]]:
+        query = fold_name(query)
+        found = []
+        for name in self._names.get(guild_id, []):
+            if query in name:
+                found.append(name)
+                if len(found) == SEARCH_LIMIT:
+                    break
+
+        return self._rows(guild_id, found)
+
+    async def random(self, guild_id: int) -> Optional[Tuple[str, str, int]]:
+        names = self._names.get(guild_id)
+        if not names:
+            return None
+
+        tag = self._by_name[guild_id, random.choice(names)]
+        return tag.name, tag.content, tag.id
+
+    async def by_author(self, guild_id: int, author: int) -> List[Tuple[str, int]]:
+        return [
+            (name, tag.id)
+            for name in self._names.get(guild_id, [])
+            if (tag := self._by_name[guild_id, name]).author == author
+        ]
+
+    async def top(self, guild_id: int) -> List[Tuple[str, int, int]]:
+        used = [
+            (self._tags[tag_id].name, tag_id, entry[1])
+            for tag_id, entry in self._usage.items()
+            if entry[0] == guild_id
+        ]
+        used.sort(key=lambda row: row[2], reverse=True)
+        return used[:TOP_LIMIT]
+
+    async def add_usage(self, usage: Dict[int, Tuple[int, int, int]]) -> None:
+        for tag_id, (guild, uses, last_used) in usage.items():
+            if tag_id not in self._tags:
+                continue
+
+            entry = self._usage.setdefault(tag_id, [guild, 0, last_used])
+            entry[1] += uses
+            entry[2] = max(entry[2], last_used)
+
+    async def names(self, guild_id: int) -> Set[str]:
+        return set(self._names.get(guild_id, []))
+
+    async def write_batch(
+        self,
+        inserts: List[Tuple[str, str, int, int, int]],
+        updates: List[Tuple[str, str, int]],
+    ) -> None:
+        for name, content, guild_id, author, created_at in inserts:
+            self._insert(guild_id, name, content, author, created_at)
+
+        for content, name, guild_id in updates:
+            await self.set_content(guild_id, name, content)
+
+    async def export(
+        self, guild_id: int, chunk_size: int
+    ) -> AsyncIterator[Tuple[str, str, int, int]]:
+        # a copy, the names may change between chunks
+        for name in list(self._names.get(guild_id, [])):
+            tag = self._by_name.get((guild_id, name))
+            if tag is not None:
+                yield tag.name, tag.content, tag.author, tag.created_at
@@ -0,0 +1,140 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Content-addressed, compressed storage of tag bodies
+"""
+
+import zlib
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+from .cache import LRUCache
+from . import queries
+
+COMPRESS_THRESHOLD = 256  # bytes, smaller bodies are stored as-is
+CACHE_SIZE = 1024  # decoded bodies kept in memory
+
+# bodies are immutable once stored, so entries never need invalidating
+content_cache: LRUCache[bytes, str] = LRUCache(CACHE_SIZE)
+
+
+def encode_content(content: str) -> Tuple[bytes, bytes, int]:
+    """
+    Hashes and, above :data:`COMPRESS_THRESHOLD`, compresses a tag body.
+
+    Returns
+    --------
+    Tuple[:class:`bytes`, :class:`bytes`, :class:`int`]
+        `(hash, data, compressed)` as stored in `tag_contents`
+    """
+    raw = content.encode("utf-8")
+    digest = hashlib.sha256(raw).digest()
+
+    if len(raw) > COMPRESS_THRESHOLD:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            return digest, packed, 1
+
+    return digest, raw, 0
+
+
+def decode_content(data: bytes, compressed: int) -> str:
+    """Inverse of :func:`encode_content`"""
+    if compressed:
+        data = zlib.decompress(data)
+    return data.decode("utf-8")
+
+
+async def store_contents(c, contents: Iterable[str]) -> List[bytes]:
+    """
+    Makes sure a blob exists for each body and returns their hashes.
+
+    New blobs start with no references, the triggers on `tags` count them,
+    so call this in the same transaction as the write that references them.
+    """
+    hashes = []
+    blobs = {}
+    for content in contents:
+        digest, data, compressed = encode_content(content)
+        hashes.append(digest)
+        blobs[digest] = (digest, data, compressed)
+
+    await c.executemany(queries.CONTENT_INSERT, list(blobs.values()))
+    return hashes
+
+
+async def store_content(c, content: str) -> bytes:
+    """Single body version of :func:`store_contents`"""
+    return (await store_contents(c, [content]))[0]
+
+
+async def fetch_content(c, digest: bytes) -> Optional[str]:
+    """
+    Gets a decoded body by hash, from :data:`content_cache` when possible.
+
+    `None` if there is no such body, e.g. its tag was deleted meanwhile.
+    """
+    content = content_cache.get(digest)
+    if content is not None:
+        return content
+
+    row = await c.fetchone(queries.CONTENT_BY_HASH, digest)
+    if not row:
+        return None
+
+    content = decode_content(row[0], row[1])
+    content_cache.put(digest, content)
+
+    return content
+
+
+async def migrate_tag_contents(c) -> int:
+    """
+    Moves bodies from the legacy `tags.content` column into `tag_contents`.
+
+    Returns
+    --------
+    :class:`int`
+        The number of migrated tags
+    """
+    # runs against older schemas, so its statements are not in `queries`
+    columns = {row[1] for row in await c.fetchall("PRAGMA table_info(tags)")}
+
+    if "content_hash" not in columns:
+        await c.execute(
+            "ALTER TABLE tags ADD COLUMN content_hash BLOB REFERENCES tag_contents (hash)"
+        )
+
+    if "content" not in columns:
+        return 0
+
+    rows = await c.fetchall(
+        "SELECT id, content FROM tags WHERE content IS NOT NULL AND content_hash IS NULL"
+    )
+    if not rows:
+        return 0
+
+    async with c.transaction():
+        hashes = await store_contents(c, [row[1] for row in rows])
+        await c.executemany(
+            "UPDATE tags SET content_hash = $1, content = NULL WHERE id = $2",
+            [(digest, row[0]) for digest, row in zip(hashes, rows)],
+        )
+
+    return len(rows)
@@ -0,0 +1,316 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Streaming import and export of tags
+"""
+
+import io
+import csv
+import json
+import asyncio
+from typing import IO, Any, Iterable, Iterator, List, Literal, Optional, Set, Tuple
+
+import discord
+
+from .storage import fold_name
+
+TAG_FIELDS = ("name", "content", "author", "created_at")
+
+MAX_NAME_LENGTH = 50
+MAX_CONTENT_LENGTH = 2000
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_CHUNK_SIZE = 500
+IMPORT_YIELD_EVERY = 100  # records validated between yields to the event loop
+
+MAX_IMPORT_SIZE = 8 * 1024 * 1024  # bytes of an imported file
+# characters of one JSON record, a tag escaped as \uXXXX fits in it
+MAX_RECORD_LENGTH = 32 * 1024
+
+_JSON_SEPARATORS = " \t\r\n,"
+
+ConflictPolicy = Literal["skip", "overwrite", "rename"]
+
+
+class ImportResult:
+    """Counts of what happened to each record of an import"""
+
+    def __init__(self):
+        self.inserted: int = 0
+        self.overwritten: int = 0
+        self.renamed: int = 0
+        self.skipped: int = 0
+        self.invalid: int = 0
+        self.error: Optional[str] = None
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.overwritten + self.skipped + self.invalid
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Lazily yields the values of a top-level JSON array, reading `fp` in chunks.
+
+    Parameters
+    -----------
+    fp: :class:`IO[str]`
+        The text stream to read from
+    chunk_size: :class:`int`
+        How many characters to read at a time
+
+    Raises
+    -------
+    :class:`ValueError`
+        The stream is not a well-formed JSON array, or a value is longer
+        than :data:`MAX_RECORD_LENGTH`
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    started = eof = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _JSON_SEPARATORS:
+            pos += 1
+
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("File is not a JSON array of tags.")
+
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # every read would parse the value again from its start
+                if len(buffer) - pos > MAX_RECORD_LENGTH:
+                    raise ValueError("A tag in the file is too large.") from None
+            else:
+                # a value ending exactly at the buffer edge may be cut off
+                if end < len(buffer) or eof:
+                    yield value
+                    pos = end
+                    continue
+
+        elif eof:
+            raise ValueError("Unexpected end of JSON file.")
+
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_csv(fp: IO[str]) -> Iterator[dict]:
+    """Lazily yields the rows of a CSV file with a header row as dicts"""
+    return csv.DictReader(fp)
+
+
+def _as_int(value: Any, default: int) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+
+    return default
+
+
+def validate_tag(
+    record: Any, *, default_author: int, default_created_at: int
+) -> Optional[Tuple[str, str, int, int]]:
+    """
+    Validates an imported record against the limits of the `AddTag` modal.
+
+    Returns
+    --------
+    Optional[Tuple[:class:`str`, :class:`str`, :class:`int`, :class:`int`]]
+        `(name, content, author, created_at)` or `None` if the record is invalid
+    """
+    if not isinstance(record, dict):
+        return None
+
+    name = record.get("name")
+    content = record.get("content")
+
+    if not isinstance(name, str) or not isinstance(content, str):
+        return None
+
+    name = fold_name(name.strip())
+
+    if not name or len(name) > MAX_NAME_LENGTH:
+        return None
+
+    if not content or len(content) > MAX_CONTENT_LENGTH:
+        return None
+
+    return (
+        name,
+        content,
+        _as_int(record.get("author"), default_author),
+        _as_int(record.get("created_at"), default_created_at),
+    )
+
+
+def _free_name(name: str, taken: Set[str]) -> str:
+    suffix = 2
+    while True:
+        tail = f"-{suffix}"
+        candidate = name[: MAX_NAME_LENGTH - len(tail)] + tail
+        if candidate not in taken:
+            return candidate
+        suffix += 1
+
+
+async def import_tags(
+    store,
+    guild_id: int,
+    author_id: int,
+    records: Iterable[Any],
+    *,
+    conflict: ConflictPolicy = "skip",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportResult:
+    """
+    Validates and inserts `records` into a guild's tags in chunked transactions.
+
+    Chunks committed before a malformed record is reached are kept,
+    and the parse error is stored in :attr:`ImportResult.error`.
+
+    Parameters
+    -----------
+    store: :class:`TagStore`
+        Where to write the tags
+    guild_id: :class:`int`
+        The guild to import into
+    author_id: :class:`int`
+        The author to use for records without one
+    records: :class:`Iterable`
+        The parsed records, e.g. from :func:`iter_json_array` or :func:`iter_csv`
+    conflict: :class:`str`
+        What to do with a tag whose name already exists: skip, overwrite or rename
+    chunk_size: :class:`int`
+        How many records to write per transaction
+    """
+    result = ImportResult()
+    now_timestamp = round(discord.utils.utcnow().timestamp())
+
+    taken = await store.names(guild_id)
+
+    inserts: List[tuple] = []
+    updates: List[tuple] = []
+
+    try:
+        for index, record in enumerate(records, 1):
+            if index % IMPORT_YIELD_EVERY == 0:
+                # parsing doesn't await, let other events in meanwhile
+                await asyncio.sleep(0)
+
+            tag = validate_tag(
+                record, default_author=author_id, default_created_at=now_timestamp
+            )
+            if tag is None:
+                result.invalid += 1
+                continue
+
+            name, content, author, created_at = tag
+
+            if name in taken:
+                if conflict == "skip":
+                    result.skipped += 1
+                    continue
+
+                if conflict == "overwrite":
+                    updates.append((content, name, guild_id))
+                    result.overwritten += 1
+                else:
+                    name = _free_name(name, taken)
+                    result.renamed += 1
+
+            if name not in taken:
+                taken.add(name)
+                inserts.append((name, content, guild_id, author, created_at))
+                result.inserted += 1
+
+            if len(inserts) + len(updates) >= chunk_size:
+                await store.write_batch(inserts, updates)
+                inserts, updates = [], []
+
+    except (ValueError, csv.Error) as exc:
+        result.error = str(exc)
+
+    if inserts or updates:
+        await store.write_batch(inserts, updates)
+
+    return result
+
+
+async def export_tags(store, guild_id: int, fp: IO[bytes], fmt: str = "json") -> int:
+    """
+    Writes a guild's tags to `fp` as JSON or CSV, fetching them in chunks.
+
+    Parameters
+    -----------
+    store: :class:`TagStore`
+        Where to read the tags from
+    guild_id: :class:`int`
+        The guild to export
+    fp: :class:`IO[bytes]`
+        A binary stream to write to, rewound when done
+    fmt: :class:`str`
+        Either `json` or `csv`
+
+    Returns
+    --------
+    :class:`int`
+        The number of exported tags
+    """
+    stream = io.TextIOWrapper(fp, encoding="utf-8", newline="")
+    count = 0
+
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(TAG_FIELDS)
+    else:
+        stream.write("[")
+
+    async for row in store.export(guild_id, EXPORT_CHUNK_SIZE):
+        if fmt == "csv":
+            writer.writerow(row)
+        else:
+            stream.write("\n" if count == 0 else ",\n")
+            stream.write(json.dumps(dict(zip(TAG_FIELDS, row))))
+        count += 1
+
+    if fmt != "csv":
+        stream.write("\n]\n")
+
+    stream.flush()
+    stream.detach()
+    fp.seek(0)
+
+    return count
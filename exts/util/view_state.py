@@ -0,0 +1,115 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Expiring storage of the state of persistent views
+"""
+
+import json
+import logging
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+
+import discord
+from discord.ext import tasks
+
+from . import queries
+from .scheduler import Priority, Scheduler
+
+VIEW_STATE_TTL = 24 * 60 * 60  # seconds a view's state is kept after its last change
+PRUNE_INTERVAL = 10 * 60  # seconds between deletions of expired states
+
+log = logging.getLogger("orbyt.view_state")
+
+ViewState = Dict[str, Any]
+
+
+def state_key(message: discord.Message) -> str:
+    """
+    The key of the view state of `message`.
+
+    That's the id of the interaction it answered, known before the response
+    is sent unlike the message id, which is used for other messages.
+    """
+    if message.interaction is not None:
+        return str(message.interaction.id)
+    return str(message.id)
+
+
+class ViewStateStore:
+    """
+    Small JSON states of views by message, in the database so they survive
+    restarts, each expiring :data:`VIEW_STATE_TTL` seconds after it was last saved.
+
+    Parameters
+    -----------
+    pool
+        The database pool
+    scheduler: Optional[:class:`Scheduler`]
+        Orders the writes by priority
+    """
+
+    def __init__(self, pool, scheduler: Optional[Scheduler] = None):
+        self.pool = pool
+        self.scheduler = scheduler
+
+    def _writing(self, priority: Priority):
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.writer(priority)
+
+    def start(self) -> None:
+        self.prune.start()
+
+    def stop(self) -> None:
+        self.prune.cancel()
+
+    async def get(self, key: str, kind: str) -> Optional[ViewState]:
+        """The state saved under `key` by a view of `kind`, if it hasn't expired"""
+        now_timestamp = round(discord.utils.utcnow().timestamp())
+        async with self.pool.acquire() as c:
+            row = await c.fetchone(queries.VIEW_STATE_GET, key, kind, now_timestamp)
+        return json.loads(row[0]) if row else None
+
+    async def put(
+        self, key: str, kind: str, state: ViewState, ttl: int = VIEW_STATE_TTL
+    ) -> None:
+        """Saves `state` under `key`, replacing the previous one and its expiry"""
+        expires_at = round(discord.utils.utcnow().timestamp()) + ttl
+        async with self._writing(Priority.INTERACTIVE), self.pool.acquire() as c:
+            await c.execute(
+                queries.VIEW_STATE_PUT,
+                key,
+                kind,
+                json.dumps(state, separators=(",", ":")),
+                expires_at,
+            )
+
+    async def delete(self, key: str) -> None:
+        async with self._writing(Priority.INTERACTIVE), self.pool.acquire() as c:
+            await c.execute(queries.VIEW_STATE_DELETE, key)
+
+    @tasks.loop(seconds=PRUNE_INTERVAL)
+    async def prune(self) -> None:
+        try:
+            async with self._writing(Priority.BACKGROUND), self.pool.acquire() as c:
+                await c.execute(
+                    queries.VIEW_STATE_PRUNE, round(discord.utils.utcnow().timestamp())
+                )
+        except Exception:
+            log.exception("Pruning expired view states failed, retrying")
@@ -18,16 +18,42 @@
 
 """Boilerplate discord.ui.Views."""
 
-from typing import TypeVar, Optional, Union
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    NamedTuple,
+    Set,
+    TypeVar,
+    Optional,
+    Union,
+)
 import re
+import asyncio
+import logging
+import itertools
+import weakref
 
 import discord
 from discord.ext import commands
 
 from exts.util.constants import EMOJIS, HTTP_URL_REGEX
+from exts.util.shutdown import refuse_while_draining
+from exts.util.view_state import ViewState, state_key
 
 BotT = TypeVar("BotT", bound="commands.Bot")
 
+MAX_VIEWS_PER_USER = 10  # live views of one user, the oldest is evicted past it
+MAX_VIEWS_PER_GUILD = 200  # live views in one guild
+MAX_VIEW_MEMORY = 64 * 1024 * 1024  # approximate bytes of all live views
+
+# rough sizes measured with tracemalloc, for :meth:`BaseView.approximate_size`
+VIEW_SIZE = 1024
+ITEM_SIZE = 512
+
+log = logging.getLogger("orbyt.views")
+
 
 def re_url_match(url: str):
     return re.fullmatch(HTTP_URL_REGEX, url)
@@ -70,6 +96,23 @@ class BaseView(discord.ui.View):
 
         super().__init__(timeout=timeout)
 
+        client = target and (
+            target.client if isinstance(target, discord.Interaction) else target.bot
+        )
+        if client is not None:
+            client.view_registry.track(
+                self, self.author.id, target.guild and target.guild.id
+            )
+
+    def approximate_size(self) -> int:
+        """Roughly how many bytes the view holds, extended by views with data"""
+        return VIEW_SIZE + ITEM_SIZE * len(self.children)
+
+    async def evict(self) -> None:
+        """Stops the view to free it, as if it timed out"""
+        discord.ui.View.stop(self)
+        await self.on_timeout()
+
     async def stop(self, interaction: discord.Interaction):
         for child in self.children:
             child.disabled = True
@@ -81,6 +124,9 @@ class BaseView(discord.ui.View):
     async def interaction_check(
         self, interaction: discord.Interaction[discord.Client]
     ) -> bool:
+        if await refuse_while_draining(interaction):
+            return False
+
         if self.target is None:
             return True
 
@@ -105,6 +151,18 @@ class BaseView(discord.ui.View):
 
         return True
 
+    async def on_error(
+        self,
+        interaction: discord.Interaction,
+        error: Exception,
+        item: discord.ui.Item[Any],
+    ) -> None:
+        error_log = getattr(interaction.client, "error_log", None)
+        if error_log is None:
+            return await super().on_error(interaction, error, item)
+
+        error_log.record(error, f"{type(self).__name__}.{type(item).__name__}")
+
     async def on_timeout(self) -> None:
         for child in self.children:
             child.disabled = True
@@ -172,3 +230,364 @@ class ConfirmView(BaseView):
 
         self.value = False
         await self.stop(interaction)
+
+
+class PersistentView(BaseView):
+    """
+    A view whose state outlives it, saved in the bot's :class:`ViewStateStore`.
+
+    Its items get fixed custom ids made of :attr:`kind` and their callback names.
+    A live instance only exists while the view is in use and is dropped on
+    timeout, leaving its message as it is. The next press on the message, also
+    after a restart, goes to a :class:`ViewRestorer` which rebuilds the view
+    with :meth:`from_state`.
+
+    Subclasses set :attr:`kind`, implement :meth:`state` and :meth:`from_state`,
+    and call :meth:`save` whenever their state changes.
+
+    Parameters
+    -----------
+    timeout: :class:`int`
+        Seconds without use until the live instance is dropped
+    target
+        The interaction a new view answers
+    client
+        The bot, when restoring a view
+    state_key: Optional[:class:`str`]
+        The key of the state, when restoring a view
+    author_id: Optional[:class:`int`]
+        The only user who can use the view, when restoring it
+    """
+
+    kind: ClassVar[str]
+
+    def __init__(
+        self,
+        *,
+        timeout=180,
+        target: Optional[discord.Interaction] = None,
+        client: Optional[discord.Client] = None,
+        state_key: Optional[str] = None,
+        author_id: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(timeout=timeout, target=target, **kwargs)
+
+        self.client = target.client if target is not None else client
+        self.state_key = state_key or (target and str(target.id))
+        self.author_id = author_id or (self.author and self.author.id)
+
+        if target is None and client is not None:  # restored
+            client.view_registry.track(self, self.author_id, None)
+
+        for func in self.__view_children_items__:
+            getattr(self, func.__name__).custom_id = f"{self.kind}:{func.__name__}"
+
+    @classmethod
+    def custom_ids(cls) -> List[str]:
+        return [f"{cls.kind}:{func.__name__}" for func in cls.__view_children_items__]
+
+    def state(self) -> ViewState:
+        """The JSON serializable state :meth:`from_state` rebuilds the view from"""
+        raise NotImplementedError("Must be implemented")
+
+    @classmethod
+    async def from_state(
+        cls, interaction: discord.Interaction, state: ViewState, **kwargs: Any
+    ) -> Optional["PersistentView"]:
+        """
+        Rebuilds a view, `kwargs` are to be passed on to the constructor.
+
+        Returns `None` if it can't be rebuilt anymore.
+        """
+        raise NotImplementedError("Must be implemented")
+
+    async def save(self) -> None:
+        """Saves :meth:`state` along with the author"""
+        if self.state_key is None:  # never sent
+            return
+
+        await self.client.view_states.put(
+            self.state_key, self.kind, dict(self.state(), a=self.author_id)
+        )
+
+    async def stop(self, interaction: discord.Interaction):
+        await super().stop(interaction)
+
+        if self.state_key is not None:
+            await self.client.view_states.delete(self.state_key)
+
+    async def interaction_check(
+        self, interaction: discord.Interaction[discord.Client]
+    ) -> bool:
+        if await refuse_while_draining(interaction):
+            return False
+
+        if self.author_id is not None and self.author_id != interaction.user.id:
+            await interaction.response.send_message(
+                f"{EMOJIS['no']} - Only the author can respond to this",
+                ephemeral=True,
+            )
+            return False
+
+        return True
+
+    async def on_timeout(self) -> None:
+        # the state is kept, a later press restores the view
+        pass
+
+
+class ViewRestorer(discord.ui.View):
+    """
+    Answers presses on messages of a :class:`PersistentView` without a live
+    instance, by restoring one and passing the press on to it.
+
+    Register it once with :meth:`discord.Client.add_view`.
+
+    Parameters
+    -----------
+    view_cls
+        The :class:`PersistentView` subclass to restore
+    """
+
+    def __init__(self, view_cls: type):
+        super().__init__(timeout=None)
+        self.view_cls = view_cls
+
+        for custom_id in view_cls.custom_ids():
+            button = discord.ui.Button(custom_id=custom_id)
+            button.callback = self.restore
+            self.add_item(button)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return not await refuse_while_draining(interaction)
+
+    async def restore(self, interaction: discord.Interaction) -> None:
+        key = state_key(interaction.message)
+        state = await interaction.client.view_states.get(key, self.view_cls.kind)
+
+        view = state and await self.view_cls.from_state(
+            interaction,
+            state,
+            client=interaction.client,
+            state_key=key,
+            author_id=state["a"],
+        )
+        # e.g. a button the restored page doesn't show
+        item = view and discord.utils.get(
+            view.children, custom_id=interaction.data["custom_id"]
+        )
+        if not item:
+            return await interaction.response.send_message(
+                f"{EMOJIS['no']} - This has expired, run the command again",
+                ephemeral=True,
+            )
+
+        if await view.interaction_check(interaction):
+            await item.callback(interaction)
+
+
+class ViewStats(NamedTuple):
+    """Counts of the live views of a :class:`ViewRegistry`"""
+
+    views: int
+    users: int
+    guilds: int
+    memory: int
+    evicted: int
+    kinds: Dict[str, int]
+
+
+class _Entry:
+    __slots__ = ("ref", "user_id", "guild_id", "size")
+
+    def __init__(
+        self, ref: weakref.ref, user_id: Optional[int], guild_id: Optional[int]
+    ):
+        self.ref = ref
+        self.user_id = user_id
+        self.guild_id = guild_id
+        # measured once the view is built, see `ViewRegistry._measure`
+        self.size = 0
+
+
+class ViewRegistry:
+    """
+    Keeps track of the live views of every user and guild.
+
+    A new view past a cap evicts the oldest live view of that user, that guild
+    or, for the memory cap, of anyone. Evicted views are stopped as if they
+    timed out, so their buttons are disabled, while a :class:`PersistentView`
+    is only dropped and restored on its next use.
+
+    Views are held weakly and forgotten once finished.
+
+    Parameters
+    -----------
+    per_user: :class:`int`
+        The maximum number of live views of one user
+    per_guild: :class:`int`
+        The maximum number of live views in one guild
+    max_memory: :class:`int`
+        The maximum approximate bytes of all live views
+    """
+
+    def __init__(
+        self,
+        *,
+        per_user: int = MAX_VIEWS_PER_USER,
+        per_guild: int = MAX_VIEWS_PER_GUILD,
+        max_memory: int = MAX_VIEW_MEMORY,
+    ):
+        self.per_user = per_user
+        self.per_guild = per_guild
+        self.max_memory = max_memory
+        self.evicted = 0
+
+        self._tokens = itertools.count()
+        # token -> entry, and the tokens of each user and guild, oldest first
+        self._views: Dict[int, _Entry] = {}
+        self._by_user: Dict[int, Dict[int, None]] = {}
+        self._by_guild: Dict[int, Dict[int, None]] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        # the summed sizes of the entries, and the newest one, still unmeasured
+        self._memory = 0
+        self._unmeasured: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def _live(self, token: int) -> Optional[discord.ui.View]:
+        entry = self._views.get(token)
+        if entry is None:  # collected, the weakref callback forgot it
+            return None
+
+        view = entry.ref()
+        if view is None or view.is_finished():
+            self._forget(token)
+            return None
+        return view
+
+    def _forget(self, token: int) -> None:
+        entry = self._views.pop(token, None)
+        if entry is None:
+            return
+
+        self._memory -= entry.size
+        if self._unmeasured == token:
+            self._unmeasured = None
+
+        for index, key in (
+            (self._by_user, entry.user_id),
+            (self._by_guild, entry.guild_id),
+        ):
+            tokens = index.get(key)
+            if tokens is not None:
+                tokens.pop(token, None)
+                if not tokens:
+                    del index[key]
+
+    def _evict_oldest(self, tokens: Dict[int, None], keep: int) -> None:
+        # evicts from the oldest until `keep` live views are left
+        for token in list(tokens):
+            if len(tokens) <= keep:
+                return
+
+            view = self._live(token)
+            if view is not None:
+                self._evict(token, view)
+
+    def _evict(self, token: int, view: discord.ui.View) -> None:
+        self._forget(token)
+        self.evicted += 1
+
+        task = asyncio.create_task(view.evict())
+        self._background.add(task)
+        task.add_done_callback(self._finish)
+
+    def _finish(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Evicting a view failed", exc_info=task.exception())
+
+    def track(
+        self, view: BaseView, user_id: Optional[int], guild_id: Optional[int]
+    ) -> None:
+        """
+        Starts tracking `view`, evicting older views past the caps.
+
+        Parameters
+        -----------
+        view: :class:`BaseView`
+            The new view
+        user_id: Optional[:class:`int`]
+            The ID of the user it belongs to
+        guild_id: Optional[:class:`int`]
+            The ID of the guild it is in
+        """
+        self._measure()
+
+        token = next(self._tokens)
+        self._views[token] = _Entry(
+            weakref.ref(view, lambda _: self._forget(token)), user_id, guild_id
+        )
+
+        if user_id is not None:
+            tokens = self._by_user.setdefault(user_id, {})
+            self._evict_oldest(tokens, self.per_user - 1)
+            tokens[token] = None
+
+        if guild_id is not None:
+            tokens = self._by_guild.setdefault(guild_id, {})
+            self._evict_oldest(tokens, self.per_guild - 1)
+            tokens[token] = None
+
+        self._evict_for_memory(token)
+        self._unmeasured = token
+
+    def _measure(self) -> None:
+        # the previous view was still being built when tracked, not anymore
+        token, self._unmeasured = self._unmeasured, None
+        view = token is not None and self._live(token)
+        if view:
+            size = view.approximate_size()
+            self._views[token].size = size
+            self._memory += size
+
+    def _evict_for_memory(self, new_token: int) -> None:
+        # from the oldest, the new view is still being built so it's left alone
+        while self._memory > self.max_memory:
+            token = next(iter(self._views))
+            if token == new_token:
+                return
+
+            view = self._live(token)
+            if view is not None:
+                self._evict(token, view)
+
+    def views(self) -> List[discord.ui.View]:
+        """The live views, oldest first"""
+        return [view for view in map(self._live, list(self._views)) if view is not None]
+
+    def memory(self) -> int:
+        """The approximate bytes of all live views, measured when tracked"""
+        self._measure()
+        return self._memory
+
+    def stats(self) -> ViewStats:
+        views = self.views()
+
+        kinds: Dict[str, int] = {}
+        for view in views:
+            kinds[type(view).__name__] = kinds.get(type(view).__name__, 0) + 1
+
+        return ViewStats(
+            views=len(views),
+            users=len(self._by_user),
+            guilds=len(self._by_guild),
+            memory=self.memory(),
+            evicted=self.evicted,
+            kinds=kinds,
+        )
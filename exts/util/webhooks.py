@@ -0,0 +1,160 @@
+#
+# This file is part of Orbyt. (https://github.com/nxmrqlly/orbyt)
+# Copyright (c) 2023-present Ritam Das
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Cached webhook clients on the bot's shared HTTP session
+"""
+
+import time
+import asyncio
+from typing import Any, Optional, Set, Tuple
+
+import aiohttp
+import discord
+
+from .cache import LRUCache
+
+WEBHOOK_CACHE_SIZE = 256  # webhooks kept across all users
+
+
+class WebhookStats:
+    """Latency and failures of the sends to one webhook"""
+
+    def __init__(self):
+        self.sends: int = 0
+        self.failures: int = 0
+        self.total_latency: float = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def average_latency(self) -> float:
+        """Average time a send took, in seconds"""
+        return self.total_latency / self.sends if self.sends else 0.0
+
+
+class WebhookCache:
+    """
+    Keeps :class:`discord.Webhook` objects for URLs that were sent to before.
+
+    Every webhook shares one :class:`aiohttp.ClientSession`, so repeated sends
+    reuse its pooled connections instead of setting up a new one.
+
+    Parameters
+    -----------
+    session: :class:`aiohttp.ClientSession`
+        The session to send through
+    max_size: :class:`int`
+        The maximum number of webhooks to keep
+    """
+
+    def __init__(
+        self, session: aiohttp.ClientSession, max_size: int = WEBHOOK_CACHE_SIZE
+    ):
+        self.session = session
+        self._webhooks: LRUCache[str, discord.Webhook] = LRUCache(max_size)
+        self._background: Set[asyncio.Task] = set()
+
+        # webhook id -> stats, bounded like the webhooks themselves
+        self.stats: LRUCache[int, WebhookStats] = LRUCache(max_size)
+
+    def get(self, url: str) -> discord.Webhook:
+        """
+        Gets the webhook of `url`, only cached once a send to it worked.
+
+        Raises
+        -------
+        :class:`ValueError`
+            The URL is not a webhook URL
+        """
+        webhook = self._webhooks.get(url)
+        if webhook is None:
+            webhook = discord.Webhook.from_url(url, session=self.session)
+        return webhook
+
+    async def send(
+        self, url: str, *, wait: bool = True, **kwargs: Any
+    ) -> Optional[discord.WebhookMessage]:
+        """
+        Sends through the webhook of `url`, recording latency and failures.
+
+        Parameters
+        -----------
+        url: :class:`str`
+            The webhook URL
+        wait: :class:`bool`
+            Whether Discord should return the message. Without it the request
+            is answered sooner and `None` is returned.
+        kwargs
+            Passed to :meth:`discord.Webhook.send`
+        """
+        webhook = self.get(url)
+        stats = self.stats.get(webhook.id)
+        if stats is None:
+            stats = WebhookStats()
+            self.stats.put(webhook.id, stats)
+
+        start = time.perf_counter()
+        try:
+            msg = await webhook.send(wait=wait, **kwargs)
+        except Exception as exc:
+            # timeouts and connection errors too, `send_later` only has the stats
+            stats.failures += 1
+            text = exc.text if isinstance(exc, discord.HTTPException) else None
+            stats.last_error = text or str(exc) or type(exc).__name__
+
+            if isinstance(exc, (discord.NotFound, discord.Forbidden)):
+                # deleted or wrong token, don't keep it around
+                self._webhooks.pop(url)
+            raise
+        finally:
+            stats.sends += 1
+            stats.total_latency += time.perf_counter() - start
+
+        self._webhooks.put(url, webhook)
+        return msg
+
+    def send_later(self, url: str, **kwargs: Any) -> None:
+        """
+        Fire-and-forget version of :meth:`send` with `wait=False`.
+
+        Failures only show up in :attr:`stats`.
+        """
+        self.get(url)  # fail fast on a bad URL
+
+        task = asyncio.create_task(self.send(url, wait=False, **kwargs))
+        self._background.add(task)
+        task.add_done_callback(self._finish)
+
+    async def drain(self, timeout: float) -> Tuple[int, int]:
+        """
+        Waits up to `timeout` seconds for the sends of :meth:`send_later`
+        in flight, returns how many finished and how many didn't.
+        """
+        if not self._background:
+            return 0, 0
+
+        done, pending = await asyncio.wait(
+            set(self._background), timeout=max(timeout, 0)
+        )
+        return len(done), len(pending)
+
+    def _finish(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+
+        if not task.cancelled():
+            task.exception()  # already recorded in stats
@@ -26,20 +26,88 @@ __license__ = "AGPL v3"
 __version__ = "1.4.4"
 
 import os
+import signal
+import logging
+import asyncio
+import argparse
+import functools
 from asyncio import run
+from typing import Optional
 
 from termcolor import colored
 
 from bot import Orbyt
 from exts.util.constants import ASCII_TITLE
+from exts.util.cluster import (
+    ClusterInfo,
+    ClusterLauncher,
+    fetch_shard_count,
+    split_shards,
+)
+from exts.util.storage import STORAGE_BACKENDS
 
 
-async def _start():
-    async with Orbyt() as bot:
+async def _start(
+    cluster: Optional[ClusterInfo] = None,
+    storage: str = "sqlite",
+    health_port: Optional[int] = None,
+):
+    async with Orbyt(cluster=cluster, storage=storage, health_port=health_port) as bot:
+        if cluster is not None and os.name != "nt":
+            # the launcher stops workers with SIGTERM, close cleanly on it
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.create_task(bot.close())
+            )
+
         await bot.start()
 
 
+def _run_cluster(cluster: ClusterInfo, health_port: Optional[int] = None):
+    # every cluster answers health checks on its own port
+    if health_port is not None:
+        health_port += cluster.cluster_id
+    run(_start(cluster, health_port=health_port))
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run Orbyt.")
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=0,
+        help="Split the shards across this many processes (default: one process)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Total shard count in cluster mode (default: Discord's recommendation)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_BACKENDS,
+        default="sqlite",
+        help="Where to keep tags, memory is lost on exit (default: sqlite)",
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=None,
+        help="Serve /healthz and /readyz on this local port, plus the cluster id "
+        "with --clusters (default: off)",
+    )
+    args = parser.parse_args()
+
+    if args.clusters > 0 and args.storage == "memory":
+        # each process would see only its own tags
+        parser.error("--storage memory can't be used with --clusters")
+
+    return args
+
+
 if __name__ == "__main__":
+    args = _parse_args()
+
     os.system("cls" if os.name == "nt" else "clear")
     print(
         colored(
@@ -48,4 +116,28 @@ if __name__ == "__main__":
         )
     )
 
-    run(_start())
+    if args.clusters > 0:
+        from config import DEBUG, DEBUG_BOT_TOKEN, PROD_TOKEN
+
+        shard_count = args.shards or run(
+            fetch_shard_count(DEBUG_BOT_TOKEN if DEBUG else PROD_TOKEN)
+        )
+        clusters = split_shards(shard_count, min(args.clusters, shard_count))
+
+        print(
+            colored(
+                f"Running {shard_count} shard(s) in {len(clusters)} cluster(s)",
+                "light_blue",
+            )
+        )
+        logging.basicConfig(
+            level=logging.INFO,
+            format="[{asctime}] [{levelname}] - {name}: {message}",
+            datefmt="%H:%M:%S",
+            style="{",
+        )
+        ClusterLauncher(
+            clusters, functools.partial(_run_cluster, health_port=args.health_port)
+        ).run()
+    else:
+        run(_start(storage=args.storage, health_port=args.health_port))